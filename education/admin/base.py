@@ -241,6 +241,7 @@ def education_general_view(request):
         {"title": "Kunlik Dars Qaydi", "subtitle": "LessonLog", "url": reverse('admin:education_lessonlog_changelist'), "icon": "fas fa-clipboard-check"},
         {"title": "Jadval xatolari", "subtitle": "ScheduleError", "url": reverse('admin:education_scheduleerror_changelist'), "icon": "fas fa-exclamation-circle"},
         {"title": "Sessiya davrlari", "subtitle": "SessionPeriod", "url": reverse('admin:education_sessionperiod_changelist'), "icon": "fas fa-calendar-alt"},
+        {"title": "Akademik kalendar", "subtitle": "AcademicCalendarDay", "url": reverse('admin:education_academiccalendarday_changelist'), "icon": "fas fa-calendar-times"},
     ]
 
     context = admin.site.each_context(request)
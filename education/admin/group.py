@@ -1,6 +1,8 @@
 from .base import *
-from education.models import TimeTable, ScheduleError, LessonLog
+from education.models import TimeTable, ScheduleError, LessonLog, ScheduleJob, AcademicCalendarDay, LessonLogWatermark
 from education.services.generator import ScheduleGeneratorService
+from education.services.jobs import submit_job, cancel_job
+from education.services.preview import commit_preview, get_preview_job
 from collections import defaultdict
 from django.shortcuts import render, redirect
 from django.contrib import messages
@@ -79,6 +81,13 @@ class TimeTableAdmin(admin.ModelAdmin):
         custom_urls = [
             # ESKI GENERATSIYA (O'zgartirilmadi)
             path('generate/', self.admin_site.admin_view(self.generate_view), name='education_timetable_generate'),
+            # Generatsiya fon vazifalari: natija/progress, holat (JSON), bekor qilish
+            path('generate/job/<int:job_id>/', self.admin_site.admin_view(self.generate_job_view),
+                 name='education_timetable_generate_job'),
+            path('generate/job/<int:job_id>/status/', self.admin_site.admin_view(self.generate_job_status),
+                 name='education_timetable_generate_job_status'),
+            path('generate/job/<int:job_id>/cancel/', self.admin_site.admin_view(self.generate_job_cancel),
+                 name='education_timetable_generate_job_cancel'),
             # YANGI LOG GENERATSIYA
             path('generate-logs/', self.admin_site.admin_view(self.generate_logs_view), name='education_timetable_generate_logs'),
             # YANGI: JADVAL KO'RISH
@@ -290,102 +299,234 @@ class TimeTableAdmin(admin.ModelAdmin):
 
 
     # --- ESKI GENERATSIYA KODI (O'ZGARISHSIZ) ---
-    def generate_view(self, request):
-        if request.method == 'POST':
-            action = request.POST.get('action')
-            year_id = request.POST.get('academic_year')
-            season = request.POST.get('season')
-            education_form = request.POST.get('education_form', 'kunduzgi')
-
-            s1_raw = request.POST.getlist('shift1_levels')
-            s2_raw = request.POST.getlist('shift2_levels')
-            shift1 = [int(x) for x in s1_raw] if s1_raw else []
-            shift2 = [int(x) for x in s2_raw] if s2_raw else []
-
-            service = ScheduleGeneratorService(year_id, season, shift1, shift2, education_form)
-
-            if action == 'save':
-                service.generate(dry_run=False)
-                self.message_user(request, "Dars jadvali muvaffaqiyatli saqlandi!", messages.SUCCESS)
-                return redirect('admin:education_timetable_changelist')
-
-            schedule_map, errors = service.generate(dry_run=True)
-
-            # --- GURUHLASH LOGIKASI ---
-            grouped_data = {}
-            all_group_ids = set()
-            for item in schedule_map:
-                all_group_ids.update(item['group_ids'])
-
-            groups_map = {g.id: g for g in Group.objects.filter(id__in=all_group_ids).select_related('specialty')}
-
-            for item in schedule_map:
-                c_level = item.get('course_level', 1)
-                for gr_id in item['group_ids']:
-                    if gr_id not in grouped_data:
-                        group = groups_map.get(gr_id)
-                        if not group: continue
-                        grouped_data[gr_id] = {
-                            'group': group,
-                            'course_level': c_level,
-                            'grid': defaultdict(lambda: defaultdict(list))
-                        }
-                    grouped_data[gr_id]['grid'][item['timeslot_id']][item['weekday_id']].append(item)
-
-            final_groups_list = []
-            for g_id, data in grouped_data.items():
-                data['grid'] = {k: dict(v) for k, v in data['grid'].items()}
-                final_groups_list.append(data)
-
-            final_groups_list.sort(key=lambda x: (x['course_level'], x['group'].name))
-
-            raw_streams = service.fetch_streams()
-            total_streams = len(raw_streams)
-            unique_placed = len(set(item['stream'].id for item in schedule_map))
-            success_percent = int((unique_placed / total_streams) * 100) if total_streams > 0 else 0
-
-            context = self.admin_site.each_context(request)
-            context.update({
-                'title': "Jadval Generatsiyasi (Simulyatsiya)",
-                'academic_years': AcademicYear.objects.all(),
-                'selected_year': int(year_id) if year_id else None,
-                'selected_season': season,
-                'selected_education_form': education_form,
-                'selected_shift1': shift1,
-                'selected_shift2': shift2,
-                'preview_mode': True,
-                'grouped_schedules': final_groups_list,
-                'errors': errors,
-                'weekdays': service.weekdays,
-                'timeslots': service.timeslots,
-                'total_streams': total_streams,
-                'success_percent': success_percent,
-                'opts': self.model._meta,
-                'has_view_permission': self.has_view_permission(request),
-                'site_header': self.admin_site.site_header,
-                'site_title': self.admin_site.site_title,
-            })
-            return render(request, "admin/education/timetable/generate.html", context)
+    def _generate_params(self, request):
+        """Generator formasidagi parametrlar (ScheduleJob.params formatida)."""
+        backend = request.POST.get('backend', 'set')
+        if backend not in ScheduleGeneratorService.BACKENDS:
+            backend = 'set'
+        engine = request.POST.get('engine', 'greedy')
+        if engine not in ScheduleGeneratorService.ENGINES:
+            engine = 'greedy'
+        room_assignment = request.POST.get('room_assignment', 'greedy')
+        if room_assignment not in ScheduleGeneratorService.ROOM_ASSIGNMENTS:
+            room_assignment = 'greedy'
+        try:
+            time_budget = max(float(request.POST.get('time_budget') or ScheduleGeneratorService.DEFAULT_TIME_BUDGET), 0)
+        except ValueError:
+            time_budget = ScheduleGeneratorService.DEFAULT_TIME_BUDGET
+        try:
+            runs = min(max(int(request.POST.get('runs') or 1), 1), 32)
+        except ValueError:
+            runs = 1
+
+        s1_raw = request.POST.getlist('shift1_levels')
+        s2_raw = request.POST.getlist('shift2_levels')
+        year_id = request.POST.get('academic_year')
+        return {
+            'year_id': int(year_id) if year_id else None,
+            'season': request.POST.get('season'),
+            'education_form': request.POST.get('education_form', 'kunduzgi'),
+            'shift1_levels': [int(x) for x in s1_raw] if s1_raw else [],
+            'shift2_levels': [int(x) for x in s2_raw] if s2_raw else [],
+            'backend': backend,
+            'engine': engine,
+            'room_assignment': room_assignment,
+            'time_budget': time_budget,
+            'runs': runs,
+        }
 
+    def _generate_context(self, request, params, **extra):
+        """generate.html uchun umumiy kontekst (forma qiymatlari params dan)."""
         context = self.admin_site.each_context(request)
         context.update({
             'title': "Avtomatik Jadval Generatori",
             'academic_years': AcademicYear.objects.all(),
-            'selected_season': 'autumn',
-            'selected_education_form': 'kunduzgi',
-            'selected_shift1': [1, 4],
-            'selected_shift2': [2, 3],
+            'selected_year': params.get('year_id'),
+            'selected_season': params.get('season') or 'autumn',
+            'selected_education_form': params.get('education_form', 'kunduzgi'),
+            'selected_backend': params.get('backend', 'set'),
+            'selected_engine': params.get('engine', 'greedy'),
+            'selected_room_assignment': params.get('room_assignment', 'greedy'),
+            'selected_time_budget': params.get('time_budget', ScheduleGeneratorService.DEFAULT_TIME_BUDGET),
+            'selected_runs': params.get('runs', 1),
+            'selected_shift1': params.get('shift1_levels', [1, 4]),
+            'selected_shift2': params.get('shift2_levels', [2, 3]),
             'opts': self.model._meta,
             'has_view_permission': self.has_view_permission(request),
             'site_header': self.admin_site.site_header,
             'site_title': self.admin_site.site_title,
         })
+        context.update(extra)
+        return context
+
+    def generate_view(self, request):
+        if request.method == 'POST':
+            action = request.POST.get('action')
+            if action not in ('preview', 'save', 'repair'):
+                action = 'preview'
+            if action == 'save' and request.POST.get('preview_job'):
+                return self._commit_preview(request, request.POST['preview_job'])
+
+            params = self._generate_params(request)
+            if not params['year_id'] or params['season'] not in ('autumn', 'spring'):
+                self.message_user(request, "O'quv yili va mavsumni tanlang.", messages.ERROR)
+                return redirect('admin:education_timetable_generate')
+
+            # Generatsiya HTTP so'rov ichida emas, fon vazifasida bajariladi
+            job = submit_job(action, params, user=request.user)
+            return redirect('admin:education_timetable_generate_job', job_id=job.pk)
+
+        return render(request, "admin/education/timetable/generate.html", self._generate_context(request, {}))
+
+    @staticmethod
+    def _persistence_message(changes):
+        if not changes:
+            return "Dars jadvali muvaffaqiyatli saqlandi!"
+        return (
+            f"Dars jadvali muvaffaqiyatli saqlandi! +{changes['inserted']} / ~{changes['updated']} / "
+            f"-{changes['deleted']} qator, {changes['unchanged']} ta dars o'zgarmadi."
+        )
+
+    def _commit_preview(self, request, token):
+        """Ko'rilgan simulyatsiyani qayta generatsiyasiz saqlash (kirish ma'lumotlari o'zgarmagan bo'lsa)."""
+        job = get_preview_job(token)
+        if job is None:
+            self.message_user(request, "Simulyatsiya natijasi topilmadi.", messages.ERROR)
+            return redirect('admin:education_timetable_generate')
+        try:
+            changes = commit_preview(job)
+        except ValueError as exc:
+            self.message_user(request, f"Jadval saqlanmadi: {exc}", messages.ERROR)
+            return redirect('admin:education_timetable_generate_job', job_id=job.pk)
+        self.message_user(request, self._persistence_message(changes), messages.SUCCESS)
+        return redirect('admin:education_timetable_changelist')
+
+    def generate_job_view(self, request, job_id):
+        """Vazifa sahifasi: bajarilayotgan bo'lsa progress, tugagan bo'lsa natija."""
+        job = get_object_or_404(ScheduleJob, pk=job_id)
+
+        if job.status == 'done' and job.kind == 'save':
+            changes = job.result['stats_summary'].get('persistence')
+            self.message_user(request, self._persistence_message(changes), messages.SUCCESS)
+            return redirect('admin:education_timetable_changelist')
+
+        if job.status == 'done' and job.kind == 'repair':
+            # #13: Mavjud jadvalni saqlab, faqat buzilgan darslarni qayta joylash
+            r = job.result['repair']
+            self.message_user(
+                request,
+                f"Jadval tuzatildi: {r['evicted_placements']} ta dars chiqarildi, "
+                f"{r['placed_pairs']} ta para qayta joylandi "
+                f"(+{r['inserted']} / ~{r['updated']} / -{r['deleted']} qator).",
+                messages.SUCCESS if not job.result['errors_count'] else messages.WARNING
+            )
+            return redirect('admin:education_timetable_changelist')
+
+        if job.status == 'done':
+            return render(request, "admin/education/timetable/generate.html", self._preview_context(request, job))
+
+        if job.status == 'failed':
+            self.message_user(request, f"Generatsiya xato bilan tugadi (vazifa #{job.pk}).", messages.ERROR)
+        elif job.status == 'cancelled':
+            self.message_user(request, f"Vazifa #{job.pk} bekor qilindi.", messages.WARNING)
+
+        context = self._generate_context(request, job.params, job=job)
         return render(request, "admin/education/timetable/generate.html", context)
 
+    def generate_job_status(self, request, job_id):
+        """Progress so'rovi (admin sahifasi buni davriy chaqiradi)."""
+        job = get_object_or_404(ScheduleJob, pk=job_id)
+        return JsonResponse({
+            'id': job.pk,
+            'status': job.status,
+            'status_display': job.get_status_display(),
+            'finished': job.is_finished,
+            'progress': job.progress,
+        })
+
+    def generate_job_cancel(self, request, job_id):
+        if request.method != 'POST':
+            return JsonResponse({'error': 'POST kerak'}, status=405)
+        get_object_or_404(ScheduleJob, pk=job_id)
+        return JsonResponse({'cancelled': cancel_job(job_id)})
+
+    def _preview_context(self, request, job):
+        """Saqlangan simulyatsiya natijasidan preview konteksti (generatsiya qayta ishlamaydi)."""
+        from kadrlar.models import Weekday, TimeSlot
+
+        result = job.result
+        schedule_map = result['lessons']
+
+        # --- GURUHLASH LOGIKASI ---
+        grouped_data = {}
+        all_group_ids = set()
+        for item in schedule_map:
+            all_group_ids.update(item['group_ids'])
+
+        groups_map = {g.id: g for g in Group.objects.filter(id__in=all_group_ids).select_related('specialty')}
+
+        for item in schedule_map:
+            c_level = item.get('course_level', 1)
+            for gr_id in item['group_ids']:
+                if gr_id not in grouped_data:
+                    group = groups_map.get(gr_id)
+                    if not group: continue
+                    grouped_data[gr_id] = {
+                        'group': group,
+                        'course_level': c_level,
+                        'grid': defaultdict(lambda: defaultdict(list))
+                    }
+                grouped_data[gr_id]['grid'][item['timeslot_id']][item['weekday_id']].append(item)
+
+        final_groups_list = []
+        for g_id, data in grouped_data.items():
+            data['grid'] = {k: dict(v) for k, v in data['grid'].items()}
+            final_groups_list.append(data)
+
+        final_groups_list.sort(key=lambda x: (x['course_level'], x['group'].name))
+
+        # Xatolar uchun workload obyektlari (template workload.subject va h.k. ni ko'rsatadi)
+        workloads = Workload.objects.select_related('subject').prefetch_related('plan_subjects').in_bulk(
+            [e['workload_id'] for e in result['errors']]
+        )
+        errors = [dict(e, workload=workloads.get(e['workload_id'])) for e in result['errors']]
+
+        total_streams = result['total_streams']
+        unique_placed = len(set(item['stream_id'] for item in schedule_map))
+        success_percent = int((unique_placed / total_streams) * 100) if total_streams > 0 else 0
+
+        return self._generate_context(
+            request, job.params,
+            title="Jadval Generatsiyasi (Simulyatsiya)",
+            job=job,
+            stats_summary=result['stats_summary'],
+            quality=result.get('quality'),
+            preview_mode=True,
+            grouped_schedules=final_groups_list,
+            errors=errors,
+            weekdays=list(Weekday.objects.order_by('order')),
+            timeslots=list(TimeSlot.objects.order_by('start_time')),
+            total_streams=total_streams,
+            success_percent=success_percent,
+        )
+
 @admin.register(ScheduleError)
 class ScheduleErrorAdmin(admin.ModelAdmin):
-    list_display = ('workload', 'reason', 'created_at')
-    list_filter = ('academic_year', 'reason')
+    list_display = ('workload', 'stream', 'constraint', 'message', 'pairs_placed', 'pairs_needed', 'created_at')
+    list_filter = ('academic_year', 'education_form', 'constraint')
+    list_select_related = ('workload__subject', 'stream__workload__subject')
+    readonly_fields = ('details',)
+
+@admin.register(ScheduleJob)
+class ScheduleJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('kind', 'status', 'params', 'progress', 'error', 'cancel_requested',
+                       'created_by', 'created_at', 'started_at', 'heartbeat_at', 'finished_at')
+    exclude = ('result',)
+
+    def has_add_permission(self, request):
+        return False
 
 @admin.register(SessionPeriod)
 class SessionPeriodAdmin(admin.ModelAdmin):
@@ -395,4 +536,19 @@ class SessionPeriodAdmin(admin.ModelAdmin):
     )
     list_filter = ('academic_year', 'semester', 'education_form', 'course')
     search_fields = ('academic_year__name',)
-    ordering = ('-academic_year__name', 'education_form', 'course', 'semester')
\ No newline at end of file
+    ordering = ('-academic_year__name', 'education_form', 'course', 'semester')
+
+
+@admin.register(AcademicCalendarDay)
+class AcademicCalendarDayAdmin(admin.ModelAdmin):
+    list_display = ('date', 'day_type', 'weekday', 'name', 'academic_year')
+    list_filter = ('academic_year', 'day_type')
+    search_fields = ('name',)
+    ordering = ('-academic_year__name', 'date')
+
+
+@admin.register(LessonLogWatermark)
+class LessonLogWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('academic_year', 'semester', 'education_form', 'generated_until', 'last_created', 'updated_at')
+    list_filter = ('academic_year', 'semester', 'education_form')
+    readonly_fields = ('last_created', 'updated_at')
@@ -18,6 +18,7 @@ import io
 from students.models import Group, AcademicYear
 from education.models import EducationPlan, PlanSubject, Workload, Stream, SubGroup, Room, SessionPeriod
 from education.services.main import generate_semester_logs
+from education.services.lesson_logs import save_daily_logs
 
 @admin.register(LessonLog)
 class LessonLogAdmin(admin.ModelAdmin):
@@ -60,49 +61,18 @@ class LessonLogAdmin(admin.ModelAdmin):
         
         # POST kelganida (saqlash olinganida)
         if request.method == 'POST':
-            # Barcha inputlarni o'qib olib saqlaymiz
-            timetable_ids = request.POST.getlist('timetable_id')
-            
-            for t_id in timetable_ids:
-                status = request.POST.get(f"status_{t_id}")
-                actual_teacher_id = request.POST.get(f"actual_teacher_{t_id}")
-                topic = request.POST.get(f"topic_{t_id}")
-                
-                if status:
-                    # Bazadan qidiramiz
-                    log = LessonLog.objects.filter(timetable_id=t_id, date=selected_date).first()
-                    
-                    if not log:
-                        # Topilmasa yangi yaratamiz
-                        tt = TimeTable.objects.select_related('stream').get(id=t_id)
-                        log = LessonLog(
-                            timetable=tt,
-                            date=selected_date,
-                            group=tt.group or (tt.stream.groups.first() if tt.stream else None),
-                            subject=tt.subject,
-                            room=tt.room,
-                            planned_teacher=tt.teacher,
-                            hours=2.00, # Standard 1 para = 2 soat
-                            employment_type=tt.stream.employment_type if tt.stream else None,
-                            lesson_type=tt.stream.lesson_type if tt.stream else None,
-                        )
-                        if not log.group:
-                            continue # Guruh topilmasa tashlab o'tamiz
-
-                    # O'qituvchi o'zgarishi
-                    if actual_teacher_id:
-                        log.actual_teacher_id = actual_teacher_id
-                    else:
-                        log.actual_teacher = log.planned_teacher
-
-                    # Agar 'held' qilingan bo'lsa va o'qituvchi boshqa bo'lsa
-                    if status == 'held' and log.actual_teacher_id != log.planned_teacher_id:
-                        status = 'replaced'
+            # Barcha inputlarni o'qib olib bitta tranzaksiyada saqlaymiz
+            entries = [
+                {
+                    'timetable_id': t_id,
+                    'status': request.POST.get(f"status_{t_id}"),
+                    'actual_teacher_id': request.POST.get(f"actual_teacher_{t_id}"),
+                    'topic': request.POST.get(f"topic_{t_id}"),
+                }
+                for t_id in request.POST.getlist('timetable_id')
+            ]
+            save_daily_logs(selected_date, entries)
 
-                    log.status = status
-                    log.topic = topic
-                    log.save()
-                    
             messages.success(request, f"{selected_date_str} kungi dars jurnallari saqlandi!")
             return redirect(reverse('admin:education_lessonlog_changelist'))
 
@@ -0,0 +1,63 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+
+from education.models import SessionPeriod
+from education.services.benchmark import run_log_generation, store_timetable
+from education.services.generator import ScheduleGeneratorService
+from education.services.synthetic import SCALES, build_synthetic_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Dars jurnali (LessonLog) generatsiyasini o'lchash: sintetik muassasa uchun jadval "
+        "generatsiya qilinib TimeTable ga yoziladi, so'ng butun semestr jurnali ikki marta "
+        "(yangi va takroriy) yaratiladi. Barcha ma'lumotlar oxirida bekor qilinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='medium', choices=list(SCALES), help="Sintetik ma'lumotlar masshtabi")
+        parser.add_argument('--seed', type=int, default=0, help="Sintetik ma'lumotlar seed i")
+        parser.add_argument('--season', default='autumn', choices=['autumn', 'spring'])
+        parser.add_argument('--form', default='kunduzgi', choices=ScheduleGeneratorService.EDUCATION_FORMS)
+        parser.add_argument('--no-memory', action='store_true', help="Xotirani o'lchamaslik (tracemalloc sekinlatadi)")
+        parser.add_argument('--output', help="JSON natija fayli (default: faqat ekranga)")
+
+    def handle(self, *args, **options):
+        season, form = options['season'], options['form']
+        with transaction.atomic():
+            try:
+                dataset = build_synthetic_dataset(options['scale'], options['seed'], education_form=form)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            year_id = dataset['year_id']
+
+            service = ScheduleGeneratorService(year_id, season, education_form=form)
+            service.generate(dry_run=True)
+            store_timetable(service)
+
+            period = SessionPeriod.objects.filter(
+                academic_year_id=year_id, semester=season, education_form=form
+            ).aggregate(start=Min('start_date'), end=Max('end_date'))
+            result = run_log_generation(
+                year_id, season, period['start'], period['end'], form, trace_memory=not options['no_memory']
+            )
+            result['meta'].update(scale=options['scale'], seed=options['seed'])
+            transaction.set_rollback(True)
+
+        meta = result['meta']
+        self.stdout.write(
+            f"Jadval qatorlari: {meta['timetable_rows']}, davr: {meta['start_date']} — {meta['end_date']}"
+        )
+        for run in result['runs']:
+            memory = f", xotira: {run['peak_memory_kb']} KB" if run['peak_memory_kb'] is not None else ""
+            self.stdout.write(
+                f"  {run['run']:<8} {run['elapsed']:>8.3f} s, yaratildi: {run['created']}, "
+                f"SQL so'rovlar: {run['queries']}{memory}"
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(result, fh, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Natija yozildi: {options['output']}"))
@@ -0,0 +1,177 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from education.services.benchmark import compare_backends, compare_joint, run_benchmark, run_scaling
+from education.services.generator import ScheduleGeneratorService
+from education.services.synthetic import SCALES, build_synthetic_dataset
+from students.models import AcademicYear
+
+
+class Command(BaseCommand):
+    help = (
+        "Jadval generatorini bosqichma-bosqich o'lchash va natijani JSON ga yozish. "
+        "--scale berilsa sintetik ma'lumotlar vaqtincha yaratiladi (oxirida bekor qilinadi). "
+        "--form bir nechta berilsa birgalikda generatsiya alohida generatsiyalar bilan solishtiriladi. "
+        "--compare-backends bandlik backendlarini (set / numpy) vaqt va natija bo'yicha solishtiradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=list(SCALES), help="Sintetik ma'lumotlar masshtabi")
+        parser.add_argument('--seed', type=int, default=0, help="Sintetik ma'lumotlar seed i")
+        parser.add_argument('--keep', action='store_true', help="Sintetik ma'lumotlarni DB da qoldirish")
+        parser.add_argument('--factors', nargs='+', type=int,
+                            help="Masshtablash: sintetik ma'lumotlarni shuncha barobar oshirib o'lchash (masalan 1 2 4)")
+        parser.add_argument('--year', type=int, help="O'quv yili ID (--scale berilmasa; default: aktiv yil)")
+        parser.add_argument('--season', default='autumn', choices=['autumn', 'spring'])
+        parser.add_argument('--form', nargs='+', default=['kunduzgi'],
+                            choices=ScheduleGeneratorService.EDUCATION_FORMS,
+                            help="Ta'lim shakli (bir nechtasi — birgalikda generatsiya)")
+        parser.add_argument('--backend', default='set', choices=ScheduleGeneratorService.BACKENDS)
+        parser.add_argument('--compare-backends', action='store_true',
+                            help="Barcha bandlik backendlarini ishga tushirib solishtirish (--backend e'tiborsiz)")
+        parser.add_argument('--engine', default='greedy', choices=ScheduleGeneratorService.ENGINES)
+        parser.add_argument('--time-budget', type=float, help="Lokal qidiruv vaqti (soniya)")
+        parser.add_argument('--room-assignment', default='greedy',
+                            choices=ScheduleGeneratorService.ROOM_ASSIGNMENTS)
+        parser.add_argument('--runs', type=int, default=1, help="Multi-start urinishlari soni")
+        parser.add_argument('--repeat', type=int, default=1, help="Benchmark necha marta takrorlanadi")
+        parser.add_argument('--profile', action='store_true',
+                            help="Metodlar bo'yicha taymer va chaqiruvlar soni (talababase logger iga ham yoziladi)")
+        parser.add_argument('--no-memory', action='store_true', help="Xotirani o'lchamaslik (tracemalloc sekinlatadi)")
+        parser.add_argument('--output', help="JSON natija fayli (default: faqat ekranga)")
+
+    def handle(self, *args, **options):
+        generator_options = {
+            'backend': options['backend'],
+            'engine': options['engine'],
+            'time_budget': options['time_budget'],
+            'room_assignment': options['room_assignment'],
+            'runs': options['runs'],
+            'seed': options['seed'],
+            'profile': options['profile'],
+        }
+
+        forms = list(dict.fromkeys(options['form']))
+        if options['compare_backends'] and (len(forms) > 1 or options['factors']):
+            raise CommandError("--compare-backends bitta --form bilan va --factors siz ishlatiladi.")
+        if options['factors']:
+            if not options['scale']:
+                raise CommandError("--factors faqat --scale bilan ishlatiladi.")
+            try:
+                result = run_scaling(
+                    options['scale'], options['factors'], options['season'], forms,
+                    trace_memory=not options['no_memory'], **generator_options
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self._print_scaling(result)
+            self._write(result, options['output'])
+            return
+
+        with transaction.atomic():
+            dataset = None
+            if options['scale']:
+                try:
+                    dataset = build_synthetic_dataset(options['scale'], options['seed'], education_forms=forms)
+                except ValueError as exc:
+                    raise CommandError(str(exc))
+                dataset.update(scale=options['scale'], seed=options['seed'])
+                year_id = dataset['year_id']
+            else:
+                year_id = options['year']
+                if not year_id:
+                    year = AcademicYear.objects.filter(is_active=True).first()
+                    if not year:
+                        raise CommandError("Aktiv o'quv yili topilmadi, --year yoki --scale ni ko'rsating.")
+                    year_id = year.id
+
+            if options['compare_backends']:
+                result = compare_backends(
+                    year_id, options['season'], forms[0], repeat=options['repeat'],
+                    trace_memory=not options['no_memory'], **generator_options
+                )
+                result['dataset'] = dataset
+            elif len(forms) > 1:
+                result = compare_joint(
+                    year_id, options['season'], forms, trace_memory=not options['no_memory'], **generator_options
+                )
+                result['dataset'] = dataset
+            else:
+                result = run_benchmark(
+                    year_id, options['season'], forms[0], repeat=options['repeat'],
+                    trace_memory=not options['no_memory'], dataset=dataset, **generator_options
+                )
+            if dataset and not options['keep']:
+                transaction.set_rollback(True)
+
+        if options['compare_backends']:
+            self._print_backends(result)
+        elif len(forms) > 1:
+            self._print_joint(result)
+        else:
+            self._print(result['best'])
+        self._write(result, options['output'])
+
+    def _write(self, result, path):
+        if path:
+            with open(path, 'w', encoding='utf-8') as fh:
+                json.dump(result, fh, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Natija yozildi: {path}"))
+
+    def _print(self, best):
+        self.stdout.write(
+            f"Streamlar: {best['streams']}, paralar: {best['pairs_placed']}/{best['pairs_needed']} "
+            f"(joylashmadi: {best['pairs_failed']}), backtrack: "
+            f"{best['backtrack_successes']}/{best['backtrack_attempts']}"
+        )
+        for name, seconds in best['phases'].items():
+            self.stdout.write(f"  {name:<18}{seconds:>10.3f} s")
+        self.stdout.write(f"  {'jami':<18}{best['elapsed']:>10.3f} s")
+        memory = best['peak_memory_kb']
+        self.stdout.write(
+            f"SQL so'rovlar: {best['queries']}"
+            + (f", xotira cho'qqisi: {memory:.0f} KB" if memory is not None else "")
+        )
+        if best['profile']:
+            for name, values in best['profile']['methods'].items():
+                self.stdout.write(f"  {name:<26}{values['calls']:>10} chaqiruv{values['seconds']:>10.3f} s")
+
+    def _print_joint(self, result):
+        self.stdout.write(self.style.MIGRATE_HEADING("Birgalikda:"))
+        self._print(result['joint'])
+        for form, run in result['separate'].items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Alohida ({form}):"))
+            self._print(run)
+        self.stdout.write(
+            f"Alohida jami: {result['separate_elapsed']:.3f} s, birgalikda: {result['joint']['elapsed']:.3f} s"
+            + (f" (x{result['speedup']})" if result['speedup'] else "")
+        )
+
+    def _print_backends(self, result):
+        self.stdout.write(f"{'Backend':<10}{'Eng yaxshi (s)':>16}{'Joylashdi':>12}{'Joylashmadi':>13}{'SQL':>8}")
+        for backend, run in result['backends'].items():
+            self.stdout.write(
+                f"{backend:<10}{run['elapsed']:>16.3f}{run['pairs_placed']:>12}"
+                f"{run['pairs_failed']:>13}{run['queries']:>8}"
+            )
+        for backend in result['backends']:
+            if backend == 'set':
+                continue
+            if result['same_as_set'][backend]:
+                self.stdout.write(self.style.SUCCESS(f"{backend}: natija 'set' bilan bir xil"))
+            else:
+                self.stdout.write(self.style.ERROR(f"{backend}: natija 'set' dan farq qiladi!"))
+            if result['speedup'][backend]:
+                self.stdout.write(f"{backend}: tezlanish x{result['speedup'][backend]:.2f}")
+
+    def _print_scaling(self, result):
+        base = result['runs'][0]
+        self.stdout.write(f"{'x':>4}{'streamlar':>12}{'paralar':>10}{'greedy, s':>12}{'jami, s':>10}{'nisbat':>9}")
+        for run in result['runs']:
+            ratio = run['elapsed'] / base['elapsed'] if base['elapsed'] else 0
+            self.stdout.write(
+                f"{run['factor']:>4}{run['streams']:>12}{run['pairs_placed']:>10}"
+                f"{run['phases'].get('greedy', 0):>12.3f}{run['elapsed']:>10.3f}{ratio:>9.2f}"
+            )
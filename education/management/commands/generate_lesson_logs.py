@@ -0,0 +1,56 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from education.services.generator import ScheduleGeneratorService
+from education.services.incremental_logs import DEFAULT_HORIZON_DAYS, run_incremental
+
+
+class Command(BaseCommand):
+    help = (
+        "Dars jurnalini belgidan (LessonLogWatermark) ufqqacha to'ldiradi: har bir "
+        "(o'quv yili, mavsum, ta'lim shakli) uchun faqat oxirgi ishga tushishdan keyingi "
+        "sanalar. Tungi rejalashtirilgan vazifa sifatida ishlatiladi, masalan cron: "
+        "`30 2 * * * python manage.py generate_lesson_logs`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON_DAYS,
+                            help="Bugundan necha kun oldinga to'ldiriladi")
+        parser.add_argument('--date', help="Bugungi sana o'rniga (YYYY-MM-DD)")
+        parser.add_argument('--year', type=int, action='append', dest='years',
+                            help="O'quv yili ID (default: faol yillar)")
+        parser.add_argument('--season', action='append', dest='seasons', choices=['autumn', 'spring'])
+        parser.add_argument('--form', action='append', dest='forms', choices=ScheduleGeneratorService.EDUCATION_FORMS)
+        parser.add_argument('--sequential', action='store_true',
+                            help="Ta'lim shakllarini parallel oqimlarda emas, ketma-ket bajarish")
+        parser.add_argument('--dry-run', action='store_true', help="Yozmasdan faqat sanash (belgi surilmaydi)")
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = datetime.date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Noto'g'ri sana: {options['date']}")
+
+        results = run_incremental(
+            today=today, horizon_days=options['horizon'], year_ids=options['years'],
+            seasons=options['seasons'], education_forms=options['forms'],
+            parallel=not options['sequential'], dry_run=options['dry_run'],
+        )
+        if not results:
+            self.stdout.write("To'ldiriladigan oraliq yo'q.")
+            return
+
+        failed = 0
+        for result in results:
+            line = (f"{result['year_id']} {result['season']:<6} {result['education_form']:<8} "
+                    f"{result['start']} — {result['end']}: ")
+            if 'error' in result:
+                failed += 1
+                self.stdout.write(self.style.ERROR(line + f"xato: {result['error']}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(line + f"{result['created']} ta yozuv"))
+        if failed:
+            raise CommandError(f"{failed} ta oraliq xato bilan tugadi")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from education.services.synthetic import SCALES, build_synthetic_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark uchun takrorlanuvchan sintetik muassasa yaratadi "
+        "(yo'nalishlar, guruhlar, o'quv reja, yuklama, streamlar, o'qituvchilar, xonalar)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='small', choices=list(SCALES))
+        parser.add_argument('--seed', type=int, default=0, help="Tasodifiy generator boshlang'ich qiymati")
+        parser.add_argument('--form', default='kunduzgi', choices=['kunduzgi', 'sirtqi'])
+
+    def handle(self, *args, **options):
+        try:
+            dataset = build_synthetic_dataset(options['scale'], options['seed'], options['form'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for name, count in dataset['counts'].items():
+            self.stdout.write(f"{name:<26}{count:>8}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Sintetik ma'lumotlar yaratildi: prefiks {dataset['prefix']}, o'quv yili ID {dataset['year_id']}"
+        ))
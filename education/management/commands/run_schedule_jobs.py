@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from education.models import ScheduleJob
+from education.services.jobs import STALE_AFTER, fail_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Navbatda qolib ketgan jadval generatsiyasi vazifalarini (ScheduleJob) ketma-ket bajaradi va "
+        "signali eskirgan 'running' vazifalarni 'failed' deb belgilaydi. Web jarayon ichidagi worker "
+        "pool ishonchli emas (jarayon qayta ishga tushsa vazifalar yo'qoladi), shuning uchun buyruq "
+        "cron orqali muntazam ishga tushirilishi kerak, masalan: `*/5 * * * * python manage.py run_schedule_jobs`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help="Ko'pi bilan nechta vazifa bajariladi")
+        parser.add_argument('--stale-minutes', type=int, default=int(STALE_AFTER.total_seconds() // 60),
+                            help="Shuncha daqiqa signal bermagan 'running' vazifa to'xtagan hisoblanadi")
+
+    def handle(self, *args, **options):
+        stale = fail_stale_jobs(datetime.timedelta(minutes=options['stale_minutes']))
+        if stale:
+            self.stdout.write(self.style.WARNING(f"To'xtab qolgan vazifalar 'failed' deb belgilandi: {stale}"))
+
+        job_ids = ScheduleJob.objects.filter(status='pending').order_by('created_at').values_list('pk', flat=True)
+        if options['limit']:
+            job_ids = job_ids[:options['limit']]
+
+        for job_id in list(job_ids):
+            job = run_job(job_id)
+            if job is None:
+                continue  # Boshqa worker olib ulgurdi
+            style = self.style.SUCCESS if job.status == 'done' else self.style.WARNING
+            self.stdout.write(style(str(job)))
@@ -0,0 +1,55 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from education.services.generator import ScheduleGeneratorService
+from education.services.quality import ScheduleQuality
+from students.models import AcademicYear
+
+
+class Command(BaseCommand):
+    help = (
+        "DB dagi dars jadvali sifati: guruh/o'qituvchi oynalari, kunlik yuklama dispersiyasi, "
+        "kechki paralar, bo'sh o'rinlar va o'qituvchining kunlik limiti. "
+        "--generate berilsa jadval qayta generatsiya qilinib (saqlanmasdan) solishtiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help="O'quv yili ID (default: aktiv yil)")
+        parser.add_argument('--season', default='autumn', choices=['autumn', 'spring'])
+        parser.add_argument('--form', nargs='+', default=['kunduzgi'],
+                            choices=ScheduleGeneratorService.EDUCATION_FORMS)
+        parser.add_argument('--generate', action='store_true',
+                            help="Yangi dry-run generatsiya sifatini ham hisoblash")
+        parser.add_argument('--json', action='store_true', help="Natijani JSON ko'rinishida chiqarish")
+
+    def handle(self, *args, **options):
+        year_id = options['year']
+        if not year_id:
+            year = AcademicYear.objects.filter(is_active=True).first()
+            if not year:
+                raise CommandError("Aktiv o'quv yili topilmadi, --year ni ko'rsating.")
+            year_id = year.id
+
+        forms = list(dict.fromkeys(options['form']))
+        start = time.perf_counter()
+        reports = {'timetable': ScheduleQuality.from_timetable(year_id, options['season'], forms).score()}
+        elapsed = {'timetable': time.perf_counter() - start}
+
+        if options['generate']:
+            service = ScheduleGeneratorService(year_id, options['season'], education_forms=forms)
+            service.generate(dry_run=True)
+            start = time.perf_counter()
+            reports['generated'] = service.get_quality_report()
+            elapsed['generated'] = time.perf_counter() - start
+
+        if options['json']:
+            self.stdout.write(json.dumps(reports, ensure_ascii=False, indent=2))
+            return
+
+        names = list(reports)
+        self.stdout.write(f"{'':<28}" + ''.join(f"{name:>14}" for name in names))
+        for metric in reports['timetable']:
+            self.stdout.write(f"{metric:<28}" + ''.join(f"{reports[name][metric]:>14}" for name in names))
+        self.stdout.write(f"{'hisoblash vaqti (s)':<28}" + ''.join(f"{elapsed[name]:>14.3f}" for name in names))
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.25 on 2026-10-18 17:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('education', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('preview', 'Simulyatsiya'), ('save', 'Saqlash'), ('repair', 'Tuzatish')], default='preview', max_length=10, verbose_name='Turi')),
+                ('status', models.CharField(choices=[('pending', 'Navbatda'), ('running', 'Bajarilmoqda'), ('done', 'Tugadi'), ('failed', 'Xatolik'), ('cancelled', 'Bekor qilindi')], default='pending', max_length=10, verbose_name='Holati')),
+                ('params', models.JSONField(default=dict, verbose_name='Parametrlar')),
+                ('progress', models.JSONField(blank=True, default=dict, verbose_name='Jarayon')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Natija')),
+                ('error', models.TextField(blank=True, verbose_name='Xato matni')),
+                ('cancel_requested', models.BooleanField(default=False, verbose_name="Bekor qilish so'ralgan")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Yaratuvchi')),
+            ],
+            options={
+                'verbose_name': 'Jadval vazifasi',
+                'verbose_name_plural': 'Jadval vazifalari',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.25 on 2026-10-18 17:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('education', '0002_schedulejob'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='scheduleerror',
+            options={'verbose_name': 'Jadval xatosi', 'verbose_name_plural': 'Jadval xatolari'},
+        ),
+        migrations.RemoveField(
+            model_name='scheduleerror',
+            name='reason',
+        ),
+        migrations.AddField(
+            model_name='scheduleerror',
+            name='blocking_stream',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='education.stream', verbose_name="To'sib turgan patok"),
+        ),
+        migrations.AddField(
+            model_name='scheduleerror',
+            name='constraint',
+            field=models.CharField(choices=[('available', "Bo'sh joy bor"), ('room', "Mos xona (turi / sig'imi)"), ('teacher_availability', "O'qituvchining bo'sh vaqti"), ('shift_window', "Smena oralig'i"), ('teacher_day_limit', "O'qituvchining kunlik limiti"), ('group_conflict', 'Guruhning boshqa darsi'), ('teacher_conflict', "O'qituvchining boshqa darsi"), ('none', 'Bitta cheklov yetarli emas')], default='none', max_length=30, verbose_name="Yumshatish kerak bo'lgan cheklov"),
+        ),
+        migrations.AddField(
+            model_name='scheduleerror',
+            name='details',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Diagnostika tafsilotlari'),
+        ),
+        migrations.AddField(
+            model_name='scheduleerror',
+            name='education_form',
+            field=models.CharField(choices=[('kunduzgi', 'Kunduzgi'), ('sirtqi', 'Sirtqi')], default='kunduzgi', max_length=20, verbose_name="Ta'lim shakli"),
+        ),
+        migrations.AddField(
+            model_name='scheduleerror',
+            name='pairs_needed',
+            field=models.PositiveIntegerField(default=0, verbose_name='Kerakli paralar'),
+        ),
+        migrations.AddField(
+            model_name='scheduleerror',
+            name='pairs_placed',
+            field=models.PositiveIntegerField(default=0, verbose_name='Joylashgan paralar'),
+        ),
+        migrations.AddField(
+            model_name='scheduleerror',
+            name='stream',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='education.stream', verbose_name='Patok'),
+        ),
+    ]
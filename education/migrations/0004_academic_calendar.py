@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-18 17:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0001_initial'),
+        ('kadrlar', '0002_employee_department2'),
+        ('education', '0003_schedule_error_diagnostics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AcademicCalendarDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Sana')),
+                ('day_type', models.CharField(choices=[('holiday', 'Bayram / dam olish kuni'), ('transfer', "Ko'chirilgan ish kuni")], default='holiday', max_length=10, verbose_name='Kun turi')),
+                ('name', models.CharField(blank=True, max_length=200, verbose_name='Izoh')),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='students.academicyear', verbose_name="O'quv yili")),
+                ('weekday', models.ForeignKey(blank=True, help_text="Ko'chirilgan ish kunida qaysi hafta kuni jadvali bo'yicha dars o'tiladi", null=True, on_delete=django.db.models.deletion.CASCADE, to='kadrlar.weekday', verbose_name='Jadval kuni')),
+            ],
+            options={
+                'verbose_name': 'Kalendar kuni',
+                'verbose_name_plural': 'Akademik kalendar',
+                'ordering': ['academic_year', 'date'],
+                'unique_together': {('academic_year', 'date')},
+            },
+        ),
+    ]
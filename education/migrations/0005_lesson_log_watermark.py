@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-18 17:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0001_initial'),
+        ('education', '0004_academic_calendar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonLogWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.CharField(choices=[('autumn', 'Kuzgi (Toq semestrlar)'), ('spring', 'Bahorgi (Juft semestrlar)')], max_length=10, verbose_name='Mavsum')),
+                ('education_form', models.CharField(choices=[('kunduzgi', 'Kunduzgi'), ('sirtqi', 'Sirtqi')], max_length=20, verbose_name="Ta'lim shakli")),
+                ('generated_until', models.DateField(verbose_name='Qaysi sanagacha yaratilgan')),
+                ('last_created', models.PositiveIntegerField(default=0, verbose_name='Oxirgi ishga tushishda yaratilgan')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Yangilangan')),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='students.academicyear', verbose_name="O'quv yili")),
+            ],
+            options={
+                'verbose_name': 'Jurnal generatsiyasi belgisi',
+                'verbose_name_plural': 'Jurnal generatsiyasi belgilari',
+                'ordering': ['academic_year', 'semester', 'education_form'],
+                'unique_together': {('academic_year', 'semester', 'education_form')},
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
@@ -516,15 +517,56 @@ class ScheduleError(models.Model):
     """
     Generatsiya vaqtida joylashtirib bo'lmagan darslar logi.
     Admin buni ko'rib, keyin tuzatishlar kiritadi.
+    Sabab diagnostika natijasi: qaysi bitta cheklovni yumshatish streamni
+    joylashtirishga imkon beradi (tafsilotlar `details` da).
     """
+    CONSTRAINT_CHOICES = [
+        ('available', "Bo'sh joy bor"),
+        ('room', "Mos xona (turi / sig'imi)"),
+        ('teacher_availability', "O'qituvchining bo'sh vaqti"),
+        ('shift_window', "Smena oralig'i"),
+        ('teacher_day_limit', "O'qituvchining kunlik limiti"),
+        ('group_conflict', "Guruhning boshqa darsi"),
+        ('teacher_conflict', "O'qituvchining boshqa darsi"),
+        ('none', "Bitta cheklov yetarli emas"),
+    ]
+    EDUCATION_FORM_CHOICES = [
+        (SharedEducationFormChoices.FULL_TIME.value, SharedEducationFormChoices.FULL_TIME.label),
+        (SharedEducationFormChoices.PART_TIME.value, SharedEducationFormChoices.PART_TIME.label),
+    ]
+
     academic_year = models.ForeignKey('students.AcademicYear', on_delete=models.CASCADE)
     semester = models.IntegerField()
+    education_form = models.CharField(
+        max_length=20, choices=EDUCATION_FORM_CHOICES, default=SharedEducationFormChoices.FULL_TIME.value,
+        verbose_name="Ta'lim shakli"
+    )
     workload = models.ForeignKey('education.Workload', on_delete=models.CASCADE)
-    reason = models.TextField(help_text="Nega joylashmadi? (Masalan: O'qituvchi band)")
+    stream = models.ForeignKey(
+        'education.Stream', on_delete=models.CASCADE, null=True, blank=True, verbose_name="Patok"
+    )
+    constraint = models.CharField(
+        max_length=30, choices=CONSTRAINT_CHOICES, default='none', verbose_name="Yumshatish kerak bo'lgan cheklov"
+    )
+    blocking_stream = models.ForeignKey(
+        'education.Stream', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        verbose_name="To'sib turgan patok"
+    )
+    pairs_needed = models.PositiveIntegerField(default=0, verbose_name="Kerakli paralar")
+    pairs_placed = models.PositiveIntegerField(default=0, verbose_name="Joylashgan paralar")
+    details = models.JSONField(default=dict, blank=True, verbose_name="Diagnostika tafsilotlari")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        verbose_name = "Jadval xatosi"
+        verbose_name_plural = "Jadval xatolari"
+
+    @property
+    def message(self):
+        return self.details.get('message') or self.get_constraint_display()
+
     def __str__(self):
-        return f"Error: {self.workload} - {self.reason}"
+        return f"Error: {self.workload} - {self.message}"
 
 
 # =============================================================================
@@ -591,3 +633,148 @@ class SessionPeriod(models.Model):
         return f"{self.get_education_form_display()} {self.course}-kurs | {self.start_date} — {self.end_date} ({self.weeks_count} hafta)"
 
 
+# =============================================================================
+# 🗓️ AKADEMIK KALENDAR (Bayramlar va ko'chirilgan ish kunlari)
+# =============================================================================
+class AcademicCalendarDay(models.Model):
+    """
+    O'quv yili kalendaridagi maxsus kun.
+      - Bayram / dam olish: shu sanada dars bo'lmaydi (jurnal yozilmaydi).
+      - Ko'chirilgan ish kuni: shu sanada `weekday` jadvali bo'yicha dars o'tiladi
+        (masalan, shanba — dushanba jadvali bilan).
+    Dars davrlari (kurs bo'yicha) SessionPeriod da saqlanadi.
+    """
+    DAY_TYPE_CHOICES = [
+        ('holiday', "Bayram / dam olish kuni"),
+        ('transfer', "Ko'chirilgan ish kuni"),
+    ]
+
+    academic_year = models.ForeignKey(
+        'students.AcademicYear',
+        on_delete=models.CASCADE,
+        verbose_name="O'quv yili"
+    )
+    date = models.DateField(verbose_name="Sana")
+    day_type = models.CharField(
+        max_length=10,
+        choices=DAY_TYPE_CHOICES,
+        default='holiday',
+        verbose_name="Kun turi"
+    )
+    weekday = models.ForeignKey(
+        'kadrlar.Weekday',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name="Jadval kuni",
+        help_text="Ko'chirilgan ish kunida qaysi hafta kuni jadvali bo'yicha dars o'tiladi"
+    )
+    name = models.CharField(max_length=200, blank=True, verbose_name="Izoh")
+
+    class Meta:
+        verbose_name = "Kalendar kuni"
+        verbose_name_plural = "Akademik kalendar"
+        unique_together = ['academic_year', 'date']
+        ordering = ['academic_year', 'date']
+
+    def clean(self):
+        if self.day_type == 'transfer' and not self.weekday_id:
+            raise ValidationError("Ko'chirilgan ish kuni uchun jadval kunini tanlang.")
+        if self.day_type == 'holiday' and self.weekday_id:
+            raise ValidationError("Bayram kuni uchun jadval kuni ko'rsatilmaydi.")
+
+    def __str__(self):
+        label = self.name or self.get_day_type_display()
+        if self.day_type == 'transfer' and self.weekday_id:
+            return f"{self.date} — {label} ({self.weekday})"
+        return f"{self.date} — {label}"
+
+
+# =============================================================================
+# 🔖 JURNAL GENERATSIYASI BELGISI (watermark)
+# =============================================================================
+class LessonLogWatermark(models.Model):
+    """
+    (o'quv yili, mavsum, ta'lim shakli) bo'yicha jurnal qaysi sanagacha
+    generatsiya qilinganini eslab qoladi. `manage.py generate_lesson_logs`
+    har safar shu sanadan keyingi kundan ufqqacha bo'lgan oraliqni to'ldiradi.
+    """
+    SEMESTER_SEASON = TimeTable.SEMESTER_SEASON
+    EDUCATION_FORM_CHOICES = TimeTable.EDUCATION_FORM_CHOICES
+
+    academic_year = models.ForeignKey(
+        'students.AcademicYear',
+        on_delete=models.CASCADE,
+        verbose_name="O'quv yili"
+    )
+    semester = models.CharField(max_length=10, choices=SEMESTER_SEASON, verbose_name="Mavsum")
+    education_form = models.CharField(max_length=20, choices=EDUCATION_FORM_CHOICES, verbose_name="Ta'lim shakli")
+    generated_until = models.DateField(verbose_name="Qaysi sanagacha yaratilgan")
+    last_created = models.PositiveIntegerField(default=0, verbose_name="Oxirgi ishga tushishda yaratilgan")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan")
+
+    class Meta:
+        verbose_name = "Jurnal generatsiyasi belgisi"
+        verbose_name_plural = "Jurnal generatsiyasi belgilari"
+        unique_together = ['academic_year', 'semester', 'education_form']
+        ordering = ['academic_year', 'semester', 'education_form']
+
+    def __str__(self):
+        return f"{self.academic_year} {self.get_semester_display()} {self.get_education_form_display()} — {self.generated_until}"
+
+
+# =============================================================================
+# ⚙️ JADVAL GENERATSIYASI FON VAZIFALARI
+# =============================================================================
+class ScheduleJob(models.Model):
+    """
+    Jadval generatsiyasi (simulyatsiya / saqlash / tuzatish) fon vazifasi.
+    Admin sahifasi progress maydonini so'rab turadi, tugagach natija
+    `result` dan ko'rsatiladi (generatsiya qayta ishga tushirilmaydi).
+    Worker bajarilish davomida `heartbeat_at` ni yangilab turadi: signali
+    eskirgan 'running' vazifani `manage.py run_schedule_jobs` to'xtagan deb belgilaydi.
+    """
+    KIND_CHOICES = [
+        ('preview', "Simulyatsiya"),
+        ('save', "Saqlash"),
+        ('repair', "Tuzatish"),
+    ]
+    STATUS_CHOICES = [
+        ('pending', "Navbatda"),
+        ('running', "Bajarilmoqda"),
+        ('done', "Tugadi"),
+        ('failed', "Xatolik"),
+        ('cancelled', "Bekor qilindi"),
+    ]
+    FINISHED_STATUSES = ('done', 'failed', 'cancelled')
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='preview', verbose_name="Turi")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Holati")
+    params = models.JSONField(default=dict, verbose_name="Parametrlar")
+    progress = models.JSONField(default=dict, blank=True, verbose_name="Jarayon")
+    result = models.JSONField(null=True, blank=True, verbose_name="Natija")
+    error = models.TextField(blank=True, verbose_name="Xato matni")
+    cancel_requested = models.BooleanField(default=False, verbose_name="Bekor qilish so'ralgan")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Yaratuvchi"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="Oxirgi signal")
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Jadval vazifasi"
+        verbose_name_plural = "Jadval vazifalari"
+        ordering = ['-created_at']
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_kind_display()} ({self.get_status_display()})"
@@ -0,0 +1,85 @@
+"""
+Akademik kalendarning vektor ko'rinishi (jurnal generatsiyasi uchun).
+
+Sana oralig'i bir marta NumPy datetime64[D] massiviga aylantiriladi va har bir
+sana uchun "jadval kuni" — qaysi Weekday.order jadvali bo'yicha dars o'tilishi
+(0 — dars yo'q) hisoblanadi:
+  - odatiy kun — sananing o'z hafta kuni;
+  - bayram — 0;
+  - ko'chirilgan ish kuni — AcademicCalendarDay.weekday tartibi.
+So'ng har bir (ta'lim shakli, kurs) uchun SessionPeriod oynasidan tashqaridagi
+sanalar nolga tushiriladi. Sirtqi guruhlar faqat o'z sessiyasi ichida o'qiydi:
+sessiya topilmasa ularga dars kuni yo'q. Kunduzgi uchun davr topilmasa
+oynasiz (faqat bayram/ko'chirishlar) kalendar ishlatiladi.
+"""
+import datetime
+
+import numpy as np
+
+from education.models import AcademicCalendarDay, SessionPeriod
+
+NO_LESSONS = 0
+
+
+def to_datetime64(day):
+    return np.datetime64(day, 'D')
+
+
+class AcademicCalendar:
+    """Bitta (o'quv yili, mavsum) va sana oralig'i uchun kompilyatsiya qilingan kalendar."""
+
+    def __init__(self, academic_year_id, semester, start_date, end_date):
+        self.academic_year_id = academic_year_id
+        self.semester = semester
+        self.start_date = start_date
+        self.end_date = end_date
+        self.dates = np.arange(to_datetime64(start_date), to_datetime64(end_date) + 1, dtype='datetime64[D]')
+
+        # 1970-01-01 — payshanba: (kun + 3) % 7 dushanbada 0 beradi
+        self.base_days = ((self.dates.astype(np.int64) + 3) % 7 + 1).astype(np.int8)
+
+        special = AcademicCalendarDay.objects.filter(
+            academic_year_id=academic_year_id, date__range=(start_date, end_date),
+        ).values_list('date', 'day_type', 'weekday__order')
+        for day, day_type, order in special:
+            index = (day - start_date).days
+            if day_type == 'transfer' and order:
+                self.base_days[index] = order
+            else:
+                self.base_days[index] = NO_LESSONS
+
+        self.periods = {
+            (p.education_form, p.course): (p.start_date, p.end_date)
+            for p in SessionPeriod.objects.filter(academic_year_id=academic_year_id, semester=semester)
+        }
+        self._days = {}
+
+    def schedule_days(self, education_form, course):
+        """
+        Sanalar bo'yicha jadval kuni massivi (int8, len(self.dates)).
+        (ta'lim shakli, kurs) bo'yicha bir marta hisoblanadi.
+        """
+        key = (education_form, course)
+        days = self._days.get(key)
+        if days is not None:
+            return days
+
+        period = self.periods.get(key)
+        if period is not None:
+            start, end = period
+            window = (self.dates >= to_datetime64(start)) & (self.dates <= to_datetime64(end))
+            days = np.where(window, self.base_days, NO_LESSONS).astype(np.int8)
+        elif education_form == 'sirtqi':
+            days = np.zeros(len(self.dates), dtype=np.int8)
+        else:
+            days = self.base_days
+        days.flags.writeable = False
+        self._days[key] = days
+        return days
+
+    def teaching_mask(self, education_form, course):
+        """Dars kunlari maskasi (bool, len(self.dates))."""
+        return self.schedule_days(education_form, course) != NO_LESSONS
+
+    def date_at(self, index):
+        return self.start_date + datetime.timedelta(days=int(index))
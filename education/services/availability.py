@@ -0,0 +1,106 @@
+"""
+#26: O'qituvchilar bo'sh vaqtlarining jarayon darajasidagi keshi.
+
+TeacherAvailability yozuvlari har bir o'qituvchi uchun {kun: slotlar bitmaskasi}
+ko'rinishiga bir marta kompilyatsiya qilinadi va jarayon ichidagi barcha
+generatsiyalar (preview, fon vazifalari, benchmark) shu nusxadan foydalanadi.
+Bit tartibi — paralarning start_time bo'yicha tartibi, shuning uchun kesh
+paralar ID lari ketma-ketligi bo'yicha ajratiladi (para qo'shilsa/o'chirilsa
+yangi kalit hosil bo'ladi).
+
+Kesh education.signals dagi post_save / post_delete / m2m_changed signallari
+orqali bekor qilinadi. QuerySet.update() va bulk_create() signal yubormaydi —
+ulardan keyin invalidate_teacher_availability() ni qo'lda chaqirish kerak.
+Kesh bitta jarayon uchun: boshqa jarayondagi o'zgarish shu jarayon keshini
+bekor qilmaydi.
+"""
+import threading
+
+from django.db import transaction
+
+from kadrlar.models import TeacherAvailability
+
+
+class AvailabilityBitsets:
+    """
+    teacher_id -> {day_id: bo'sh slotlar bitmaskasi}.
+    Eski (teacher_id, day_id, slot_id) kortejlari to'plami protokolini ham
+    qo'llaydi (`in`, iteratsiya, len), shuning uchun generator atrofidagi
+    kod (local search, repair, snapshot) o'zgarishsiz ishlaydi.
+    O'zgarmas deb hisoblanadi: bir nechta servis bitta nusxani bo'lishadi.
+    """
+    __slots__ = ('slot_ids', 'slot_pos', 'masks', '_size')
+
+    def __init__(self, slot_ids, rows=()):
+        self.slot_ids = tuple(slot_ids)
+        self.slot_pos = {s_id: i for i, s_id in enumerate(self.slot_ids)}
+        self.masks = {}
+        self._size = 0
+        for teacher_id, day_id, slot_id in rows:
+            pos = self.slot_pos.get(slot_id)
+            if pos is None:
+                continue
+            days = self.masks.setdefault(teacher_id, {})
+            mask = days.get(day_id, 0)
+            if not mask >> pos & 1:
+                days[day_id] = mask | 1 << pos
+                self._size += 1
+
+    def mask(self, teacher_id, day_id):
+        """O'qituvchining shu kundagi bo'sh slotlari maskasi (0 — bo'sh vaqt yo'q)."""
+        days = self.masks.get(teacher_id)
+        return days.get(day_id, 0) if days else 0
+
+    def __contains__(self, key):
+        teacher_id, day_id, slot_id = key
+        pos = self.slot_pos.get(slot_id)
+        return pos is not None and bool(self.mask(teacher_id, day_id) >> pos & 1)
+
+    def __iter__(self):
+        slot_ids = self.slot_ids
+        for teacher_id, days in self.masks.items():
+            for day_id, mask in days.items():
+                while mask:
+                    low = mask & -mask
+                    yield teacher_id, day_id, slot_ids[low.bit_length() - 1]
+                    mask ^= low
+
+    def __len__(self):
+        return self._size
+
+
+_cache = {}             # tuple(slot_ids) -> AvailabilityBitsets
+_version = 0            # har bir bekor qilishda oshadi
+_lock = threading.Lock()
+
+
+def get_teacher_availability(slot_ids):
+    """Berilgan paralar tartibi uchun keshlangan bitsetlar (kerak bo'lsa bitta so'rov bilan quriladi)."""
+    key = tuple(slot_ids)
+    bitsets = _cache.get(key)
+    if bitsets is not None:
+        return bitsets
+
+    version = _version
+    rows = TeacherAvailability.timeslots.through.objects.values_list(
+        'teacheravailability__teacher_id', 'teacheravailability__weekday_id', 'timeslot_id'
+    )
+    bitsets = AvailabilityBitsets(key, rows)
+    with _lock:
+        # Qurish davomida kesh bekor qilingan bo'lsa natija eskirgan — saqlanmaydi
+        if version == _version:
+            _cache[key] = bitsets
+    return bitsets
+
+
+def invalidate_teacher_availability():
+    """Keshni tozalaydi (joriy tranzaksiya commit bo'lganda yana bir bor)."""
+    _clear()
+    transaction.on_commit(_clear)
+
+
+def _clear():
+    global _version
+    with _lock:
+        _version += 1
+        _cache.clear()
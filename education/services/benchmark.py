@@ -0,0 +1,247 @@
+"""
+Jadval generatori uchun benchmark: har bir ishga tushirishda bosqichlar
+vaqti (stats['phases']), joylashgan/joylashmagan paralar, backtracking
+statistikasi, xotira cho'qqisi, SQL so'rovlar soni va jadval sifati
+(ScheduleQuality) o'lchanadi.
+Natija JSON ga yoziladigan oddiy dict ko'rinishida qaytadi.
+
+Bir nechta ta'lim shakli berilsa birgalikda generatsiya (#21) har bir
+shaklni alohida generatsiya qilishning jami vaqti bilan solishtiriladi.
+compare_backends — bandlik backendlari (#10: set / numpy) vaqti va
+natijasi bir xilligi.
+
+run_log_generation — dars jurnali (LessonLog) generatsiyasi o'lchovlari.
+"""
+import datetime
+import hashlib
+import subprocess
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from education.models import TimeTable
+from education.services.generator import ScheduleGeneratorService
+from education.services.lesson_logs import LessonLogGenerator
+from education.services.synthetic import build_synthetic_dataset
+
+
+def _git_revision():
+    """Joriy commit qisqa hash i (git bo'lmasa None)."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_once(year_id, season='autumn', education_form='kunduzgi', trace_memory=True, **options):
+    """Bitta dry-run generatsiya va uning o'lchovlari."""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            service = ScheduleGeneratorService(year_id, season, education_form=education_form, **options)
+            schedule_map, _ = service.generate(dry_run=True)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    stats = service.stats
+    return {
+        'elapsed': round(elapsed, 4),
+        'phases': dict(stats['phases']),
+        'streams': stats['total_streams'],
+        'placed_streams': stats['placed_streams'],
+        'failed_streams': stats['failed_streams'],
+        'pairs_needed': stats['total_pairs_needed'],
+        'pairs_placed': stats['total_pairs_placed'],
+        'pairs_failed': stats['total_pairs_needed'] - stats['total_pairs_placed'],
+        'backtrack_attempts': stats['backtrack_attempts'],
+        'backtrack_successes': stats['backtrack_successes'],
+        'fail_reasons': dict(stats['fail_reasons']),
+        'peak_memory_kb': round(peak / 1024, 1) if peak is not None else None,
+        'queries': len(queries),
+        'quality': service.get_quality_report(),
+        'profile': stats.get('profile'),
+        'schedule_digest': schedule_digest(schedule_map),
+    }
+
+
+def schedule_digest(schedule_map):
+    """Joylashuvlar (stream, kun, slot, xona) to'plamining qisqa hash i — natijalarni solishtirish uchun."""
+    placements = sorted(
+        (item['stream'].id, item['weekday_id'], item['timeslot_id'], item['room_id']) for item in schedule_map
+    )
+    return hashlib.sha1(repr(placements).encode()).hexdigest()[:12]
+
+
+def run_benchmark(year_id, season='autumn', education_form='kunduzgi', repeat=1, trace_memory=True,
+                  dataset=None, **options):
+    """
+    Generatorni `repeat` marta ishga tushiradi.
+    Qaytaradi: {'meta': {...}, 'runs': [...], 'best': eng tez ishga tushirish}.
+    """
+    runs = [
+        run_once(year_id, season, education_form, trace_memory=trace_memory, **options)
+        for _ in range(max(repeat, 1))
+    ]
+    return {
+        'meta': {
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'year_id': year_id,
+            'season': season,
+            'education_form': education_form,
+            'options': options,
+            'dataset': dataset,
+        },
+        'runs': runs,
+        'best': min(runs, key=lambda r: r['elapsed']),
+    }
+
+
+def compare_backends(year_id, season='autumn', education_form='kunduzgi', repeat=1, trace_memory=True,
+                     **options):
+    """
+    #10: Har bir bandlik backendi bo'yicha run_benchmark. Natija 'set' bilan
+    bir xilligi schedule_digest orqali tekshiriladi.
+    Qaytaradi: {'backends': {backend: eng tez run}, 'same_as_set': {...}, 'speedup': {...}}.
+    """
+    options.pop('backend', None)
+    best = {
+        backend: run_benchmark(
+            year_id, season, education_form, repeat=repeat, trace_memory=trace_memory, backend=backend, **options
+        )['best']
+        for backend in ScheduleGeneratorService.BACKENDS
+    }
+    base = best['set']
+    return {
+        'backends': best,
+        'same_as_set': {b: run['schedule_digest'] == base['schedule_digest'] for b, run in best.items()},
+        'speedup': {b: round(base['elapsed'] / run['elapsed'], 2) if run['elapsed'] else None
+                    for b, run in best.items()},
+    }
+
+
+def compare_joint(year_id, season='autumn', education_forms=('kunduzgi', 'sirtqi'), trace_memory=True, **options):
+    """
+    #21: Shakllarni birgalikda generatsiya qilish va har birini alohida
+    generatsiya qilish (ketma-ket, jami vaqt) o'lchovlari.
+    Alohida dry-run lar bir-birining natijasini ko'rmaydi, shuning uchun
+    ularning joylashmagan paralari birgalikdagidan kam bo'lishi mumkin.
+    """
+    joint = run_once(year_id, season, trace_memory=trace_memory, education_forms=education_forms, **options)
+    separate = {
+        form: run_once(year_id, season, form, trace_memory=trace_memory, **options)
+        for form in education_forms
+    }
+    separate_elapsed = sum(run['elapsed'] for run in separate.values())
+    return {
+        'joint': joint,
+        'separate': separate,
+        'separate_elapsed': round(separate_elapsed, 4),
+        'speedup': round(separate_elapsed / joint['elapsed'], 2) if joint['elapsed'] else None,
+    }
+
+
+def run_scaling(scale, factors=(1, 2, 4), season='autumn', education_forms=('kunduzgi',),
+                trace_memory=False, **options):
+    """
+    Sintetik ma'lumotlar hajmini `factors` barobar oshirib generatorni o'lchaydi
+    (o'sish chiziqli yoki kvadratikligini ko'rish uchun). Ma'lumotlar to'plami
+    generator seed i bilan quriladi va o'lchovdan keyin bekor qilinadi.
+    """
+    seed = options.get('seed', 0)
+    runs = []
+    for factor in factors:
+        with transaction.atomic():
+            dataset = build_synthetic_dataset(scale, seed, education_forms=education_forms, factor=factor)
+            run = run_once(
+                dataset['year_id'], season, trace_memory=trace_memory, education_forms=education_forms, **options
+            )
+            transaction.set_rollback(True)
+        run['factor'] = factor
+        runs.append(run)
+    return {
+        'meta': {
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'scale': scale,
+            'seed': seed,
+            'season': season,
+            'education_forms': list(education_forms),
+            'options': options,
+        },
+        'runs': runs,
+    }
+
+
+def store_timetable(service):
+    """
+    Dry-run natijasini TimeTable ga yozadi (jurnal benchmarki uchun).
+    unique_teacher_slot_v2 bir o'qituvchi-slotga bitta qator ruxsat beradi,
+    shuning uchun har bir darsdan birinchi guruh qatori olinadi.
+    """
+    rows = [
+        TimeTable(
+            academic_year_id=service.year_id, semester=service.season,
+            education_form=service.get_stream_form(item['stream']),
+            weekday_id=item['weekday_id'], timeslot_id=item['timeslot_id'], group_id=item['group_ids'][0],
+            stream=item['stream'], subject_id=item['stream'].workload.subject_id,
+            teacher_id=item['stream'].teacher.id, room_id=item['room_id'],
+        )
+        for item in service.schedule_map if item['group_ids']
+    ]
+    TimeTable.objects.bulk_create(rows)
+    return len(rows)
+
+
+def run_log_generation(year_id, season, start_date, end_date, education_form='kunduzgi', trace_memory=True):
+    """
+    LessonLogGenerator o'lchovlari: birinchi ishga tushirish (hamma yozuv yangi)
+    va takroriy ishga tushirish (hamma yozuv mavjud — hech narsa yaratilmasligi kerak).
+    """
+    runs = []
+    for label in ('initial', 'repeat'):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                created = LessonLogGenerator(year_id, season, education_form).run(start_date, end_date)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+        runs.append({
+            'run': label,
+            'elapsed': round(elapsed, 4),
+            'created': created,
+            'queries': len(queries),
+            'peak_memory_kb': round(peak / 1024, 1) if peak is not None else None,
+        })
+    return {
+        'meta': {
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'year_id': year_id,
+            'season': season,
+            'education_form': education_form,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'timetable_rows': TimeTable.objects.filter(
+                academic_year_id=year_id, semester=season, education_form=education_form
+            ).count(),
+        },
+        'runs': runs,
+    }
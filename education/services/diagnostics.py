@@ -0,0 +1,211 @@
+"""
+#27: Joylashmagan streamlar diagnostikasi.
+
+Generatsiya tugagach har bir joylashmagan stream uchun qaysi bitta cheklovni
+yumshatish uni joylashtirishga imkon berishi hisoblanadi: o'qituvchining bo'sh
+vaqti, mos turi/sig'imli xona, smena oralig'i, o'qituvchining kunlik limiti
+yoki aniq bir streamning (guruh yoki o'qituvchi bo'yicha) to'qnashuvi.
+
+Yakuniy bandlik bir marta (kun, obyekt) -> slotlar bitmaskalariga yig'iladi.
+Har bir slot uchun uni yopib turgan cheklovlar to'plami maskalardan olinadi:
+to'siqsiz slot — kun hozir ochiq, bitta to'siqli slot — o'sha cheklov
+yumshatilsa kun ochiladi. Stream bir kunga bitta para oladi, shuning uchun
+cheklov yetarli, agar ochiq kunlar va u ochadigan kunlar yetishmayotgan
+paralarni qoplasa.
+"""
+from collections import defaultdict
+
+from education.models import ScheduleError
+from education.services.room_index import RoomIndex
+
+# Bir nechta cheklov yetarli bo'lsa tavsiya tartibi (odatda tuzatish osonrog'i birinchi)
+CONSTRAINT_ORDER = (
+    'room', 'teacher_availability', 'shift_window', 'teacher_day_limit', 'group_conflict', 'teacher_conflict',
+)
+# Stream bilan bog'liq to'qnashuvlar (bo'shatish — to'sib turgan streamni surish)
+CONFLICTS = ('group_conflict', 'teacher_conflict')
+
+
+class ScheduleDiagnostics:
+    """Servisning yakuniy holati bo'yicha service.errors yozuvlariga 'diagnosis' qo'shadi."""
+
+    def __init__(self, service):
+        self.service = service
+        self.slot_ids = [s.id for s in service.timeslots]
+        self.all_slots = (1 << len(self.slot_ids)) - 1
+
+        # (kun, o'qituvchi) -> band slotlar (boshqa shakl jadvali ham kiradi)
+        self.teacher_masks = defaultdict(int)
+        for day_id, slot_id, t_id in service.matrix_teacher:
+            pos = service._slot_pos.get(slot_id)
+            if pos is not None:
+                self.teacher_masks[(day_id, t_id)] |= 1 << pos
+
+        # (kun, slot) -> band xonalar bitmapi (backenddan qat'i nazar RoomIndex ko'rinishida)
+        self.rooms = RoomIndex(service.rooms)
+        for key in service.matrix_room:
+            self.rooms.add(key)
+
+        # Bandlik egalari: (kun, slot, o'qituvchi|guruh) -> stream
+        self.teacher_owner = {}
+        self.group_owner = {}
+        for entry in service.schedule_map:
+            stream = entry['stream']
+            key = (entry['weekday_id'], entry['timeslot_id'])
+            self.teacher_owner[key + (stream.teacher.id,)] = stream
+            for g_id in entry['group_ids']:
+                self.group_owner[key + (g_id,)] = stream
+
+    def run(self):
+        for error in self.service.errors:
+            error['diagnosis'] = self.diagnose(error['stream'], error['pairs_needed'] - error['pairs_placed'])
+        return self.service.errors
+
+    def _day_blockers(self, stream, meta, day_id, allowed, fit):
+        """
+        Kun bo'yicha: (ochiqmi, {bitta o'zi kunni ochadigan cheklov kalitlari}).
+        Kalit — (cheklov, to'sib turgan stream yoki None).
+        """
+        service = self.service
+        teacher_id = stream.teacher.id
+        over_limit = service._day_load_teacher.get((day_id, teacher_id), 0) >= service.MAX_PAIRS_PER_DAY_TEACHER
+        teacher_busy = self.teacher_masks.get((day_id, teacher_id), 0)
+        unavailable = 0
+        if meta.is_hourly:
+            unavailable = self.all_slots & ~service.teacher_availability_cache.mask(teacher_id, day_id)
+        group_masks = [(g_id, service._group_day_mask.get((day_id, g_id), 0)) for g_id in meta.group_ids]
+        group_busy = 0
+        for _, mask in group_masks:
+            group_busy |= mask
+        rooms_busy = self.rooms.busy
+
+        single = set()
+        for pos, slot_id in enumerate(self.slot_ids):
+            bit = 1 << pos
+            blockers = set()
+            if over_limit:
+                blockers.add(('teacher_day_limit', None))
+            if not allowed & bit:
+                blockers.add(('shift_window', None))
+            if unavailable & bit:
+                blockers.add(('teacher_availability', None))
+            if teacher_busy & bit:
+                blockers.add(('teacher_conflict', self.teacher_owner.get((day_id, slot_id, teacher_id))))
+            if group_busy & bit:
+                for g_id, mask in group_masks:
+                    if mask & bit:
+                        blockers.add(('group_conflict', self.group_owner.get((day_id, slot_id, g_id))))
+            if not fit & ~rooms_busy.get((day_id, slot_id), 0):
+                blockers.add(('room', None))
+
+            if not blockers:
+                return True, set()
+            if len(blockers) == 1:
+                single |= blockers
+        return False, single
+
+    def diagnose(self, stream, missing):
+        """Bitta joylashmagan stream diagnozi (JSON ga yoziladigan dict)."""
+        service = self.service
+        meta = service.get_stream_meta(stream)
+        allowed = 0
+        for i in meta.slot_indices:
+            allowed |= 1 << i
+        fit = self.rooms.fit_mask(meta.student_count, meta.room_types)
+        used_days = service._stream_days.get(stream.id, ())
+
+        open_days = 0
+        unlocks = defaultdict(int)      # cheklov kaliti -> u ochadigan kunlar soni
+        for day in service.weekdays:
+            if day.id in used_days:
+                continue
+            is_open, single = self._day_blockers(stream, meta, day.id, allowed, fit)
+            if is_open:
+                open_days += 1
+                continue
+            for key in single:
+                unlocks[key] += 1
+
+        relaxations = []
+        for (constraint, blocking), days in unlocks.items():
+            # Egasi noma'lum to'qnashuv (boshqa shakl jadvali) bu yerda bo'shatilmaydi
+            if constraint in CONFLICTS and blocking is None:
+                continue
+            if open_days + days >= missing:
+                relaxations.append({
+                    'constraint': constraint,
+                    'days': days,
+                    'stream_id': blocking.id if blocking is not None else None,
+                    'stream': blocking.name if blocking is not None else None,
+                })
+        relaxations.sort(key=lambda r: (CONSTRAINT_ORDER.index(r['constraint']), -r['days'], r['stream_id'] or 0))
+
+        if open_days >= missing:
+            constraint, primary = 'available', None
+        elif relaxations:
+            primary = relaxations[0]
+            constraint = primary['constraint']
+        else:
+            constraint, primary = 'none', None
+
+        diagnosis = {
+            'constraint': constraint,
+            'blocking_stream_id': primary['stream_id'] if primary else None,
+            'missing': missing,
+            'open_days': open_days,
+            'relaxations': relaxations,
+            'room_types': list(meta.room_types),
+            'student_count': meta.student_count,
+            'room_exists': bool(fit),
+        }
+        diagnosis['message'] = describe(diagnosis, service.MAX_PAIRS_PER_DAY_TEACHER)
+        return diagnosis
+
+
+def describe(diagnosis, max_pairs_per_day=None):
+    """Diagnozning foydalanuvchiga ko'rsatiladigan matni."""
+    missing = diagnosis['missing']
+    constraint = diagnosis['constraint']
+    primary = diagnosis['relaxations'][0] if diagnosis['relaxations'] else {}
+    if constraint == 'available':
+        return f"{missing} ta para uchun hozir bo'sh joy bor — tuzatish (repair) rejimi bilan joylash mumkin."
+    if constraint == 'room':
+        room = f"{', '.join(diagnosis['room_types'])} turidagi, kamida {diagnosis['student_count']} o'rinli xona"
+        if diagnosis['room_exists']:
+            return f"Bunday xonalar band: yana bitta {room} kerak."
+        return f"{room.capitalize()} yo'q."
+    if constraint == 'teacher_availability':
+        return f"O'qituvchining bo'sh vaqtini kengaytirish kerak ({primary['days']} kun ochiladi)."
+    if constraint == 'shift_window':
+        return f"Smena oralig'idan tashqaridagi paralarga ruxsat berish kerak ({primary['days']} kun ochiladi)."
+    if constraint == 'teacher_day_limit':
+        limit = f" ({max_pairs_per_day} para)" if max_pairs_per_day else ""
+        return f"O'qituvchining kunlik limiti{limit} yetmaydi."
+    if constraint == 'group_conflict':
+        return f"Guruh «{primary['stream']}» darsi bilan to'qnashadi — uni boshqa vaqtga surish kerak."
+    if constraint == 'teacher_conflict':
+        return f"O'qituvchi «{primary['stream']}» darsi bilan band — uni boshqa vaqtga surish kerak."
+    return f"{missing} ta para: bitta cheklovni yumshatish yetarli emas."
+
+
+def build_schedule_errors(year_id, records):
+    """
+    Xato yozuvlari (ScheduleGeneratorService.serialize_error ko'rinishida)
+    bo'yicha saqlanmagan ScheduleError obyektlari.
+    """
+    objects = []
+    for record in records:
+        diagnosis = record.get('diagnosis') or {}
+        objects.append(ScheduleError(
+            academic_year_id=year_id,
+            semester=record.get('semester') or 0,
+            education_form=record.get('education_form') or 'kunduzgi',
+            workload_id=record['workload_id'],
+            stream_id=record['stream_id'],
+            constraint=diagnosis.get('constraint', 'none'),
+            blocking_stream_id=diagnosis.get('blocking_stream_id'),
+            pairs_needed=record['pairs_needed'],
+            pairs_placed=record['pairs_placed'],
+            details=dict(diagnosis, fail_reasons=record.get('stats') or {}),
+        ))
+    return objects
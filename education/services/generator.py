@@ -1,8 +1,30 @@
-from collections import defaultdict
-from django.db import transaction
+import logging
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+from django.db import connection, transaction
 from django.db.models import Count
-from education.models import TimeTable, ScheduleError, Room, Stream, SessionPeriod
-from kadrlar.models import Weekday, TimeSlot, TeacherAvailability
+from education.models import TimeTable, ScheduleError, Room, Stream, SessionPeriod, SubGroup
+from kadrlar.models import Weekday, TimeSlot
+from education.services.availability import get_teacher_availability
+from education.services.diagnostics import ScheduleDiagnostics, build_schedule_errors
+from education.services.occupancy import OccupancyTensor, SlotMaskIndex
+from education.services.room_index import RoomIndex
+from education.services.room_assignment import RoomAssigner
+from education.services.trail import UndoTrail
+from education.services.local_search import LocalSearchOptimizer, build_gap_table
+from education.services.multistart import MultiStartRunner
+from education.services.repair import ScheduleRepairer
+from education.services.persistence import sync_timetable
+from education.services.quality import ScheduleQuality
+from education.services.profiling import GeneratorProfiler
+from education.services.snapshot import StreamMeta
+
+logger = logging.getLogger('talababase')
 
 
 class ScheduleGeneratorService:
@@ -18,6 +40,25 @@ class ScheduleGeneratorService:
     - #4: O'qituvchi kunlik yuklamasi cheklovi
     - #7: Konfigurlash mumkin bo'lgan parametrlar
     - #9: Batafsil generatsiya statistikasi
+    - #10: Bandlik backendi tanlash ('set' yoki 'numpy' vektor tensor)
+    - #11: Lokal qidiruv (Simulated Annealing + tabu) bilan greedy natijani yaxshilash
+    - #12: Multi-start: bir nechta jarayonda tartibi o'zgartirilgan generatsiyalar
+    - #13: Tuzatish (repair) rejimi: faqat o'zgarish ta'sir qilgan darslar qayta joylanadi
+    - #14: Stream metama'lumotlari (StreamMeta) bir marta hisoblanadi, ORM qayta aylanilmaydi
+    - #15: Talabalar soni bitta guruhlangan so'rov bilan yuklanadi; kichik guruhli (SubGroup) streamlar
+    - #16: Xona indeksi (RoomIndex): tur bitmaski + sig'im bisect + (kun, slot) bandlik bitmapi
+    - #17: Ikki bosqichli rejim: vaqtlar qotirilgach xonalar min-cost tayinlash bilan taqsimlanadi
+    - #18: Undo jurnali (checkpoint/rollback) asosidagi chuqur backtracking
+    - #19: Generatsiya bosqichlari vaqti (stats['phases']) — benchmark uchun
+    - #20: Jarayon holati (progress) callback orqali — fon vazifalari uchun
+    - #21: Bir nechta ta'lim shaklini umumiy o'qituvchi/xona bandligida birgalikda generatsiya qilish
+    - #22: Jadval sifati hisoboti (oynalar, yuklama dispersiyasi, kechki slotlar, bo'sh o'rinlar)
+    - #23: Ixtiyoriy profillash (profile=True): metod taymerlari, chaqiruvlar va SQL so'rovlar soni
+    - #24: (kun, guruh) band slotlar bitmaskasi — "oyna" jarimasi jadvaldan O(1) da
+    - #25: schedule_map yozuvlari stream ID bo'yicha indekslanadi (band kunlar tekshiruvi O(1))
+    - #26: o'qituvchilar bo'sh vaqti jarayon darajasidagi bitset keshida (signallar bilan yangilanadi),
+      set backendda slot tekshiruvi (kun, obyekt) bitmaskalari bilan bir yo'la
+    - #27: Joylashmagan streamlar diagnostikasi — qaysi bitta cheklovni yumshatish yetarli (ScheduleError)
     """
 
     # =========================================================
@@ -27,6 +68,7 @@ class ScheduleGeneratorService:
     MAX_PAIRS_PER_DAY_TEACHER = 4   # O'qituvchi uchun kunlik max paralar
     MAX_BACKTRACK_ATTEMPTS = 3      # Backtrack urinishlari soni
     BACKTRACK_WINDOW = 5            # Oxirgi nechta joylashtirilgan stream tekshiriladi
+    BACKTRACK_DEPTH = 1             # #18: Surilgan stream uchun yana necha daraja surish mumkin
     DEFAULT_WEEKS_FULLTIME = 15     # Kunduzgi default hafta soni
     DEFAULT_WEEKS_PARTTIME = 4      # Sirtqi default hafta soni
 
@@ -38,40 +80,167 @@ class ScheduleGeneratorService:
         'seminar': ['practice'],
     }
 
-    def __init__(self, year_id, season, shift1_levels=None, shift2_levels=None, education_form='kunduzgi'):
-        self.year_id = year_id
-        self.season = season
-        self.education_form = education_form
-        self.shift1_levels = shift1_levels if shift1_levels is not None else [1, 4]
-        self.shift2_levels = shift2_levels if shift2_levels is not None else [2, 3]
+    # #10: Bandlik (occupancy) backendlari
+    BACKENDS = ('set', 'numpy')
+
+    # #11: Generatsiya usullari
+    ENGINES = ('greedy', 'local_search')
+    DEFAULT_TIME_BUDGET = 10        # Lokal qidiruv uchun vaqt (soniya)
+
+    # #12: Multi-start (priority tartibini tasodifiy "silkitish" darajasi)
+    PRIORITY_JITTER = 150
+
+    # #17: Xonalarni tayinlash usuli ('matching' — vaqtlar qotirilgach optimal qayta taqsimlash)
+    ROOM_ASSIGNMENTS = ('greedy', 'matching')
+
+    # #20: progress_callback(progress_dict) — generatsiya holatini tashqariga uzatish
+    progress_callback = None
+
+    # #21: Birgalikda generatsiya qilinishi mumkin bo'lgan ta'lim shakllari
+    EDUCATION_FORMS = ('kunduzgi', 'sirtqi')
+
+    def __init__(self, year_id, season, shift1_levels=None, shift2_levels=None, education_form='kunduzgi',
+                 backend='set', engine='greedy', time_budget=None, seed=None, perturb=False,
+                 runs=1, workers=None, room_assignment='greedy', backtrack_depth=None, backtrack_window=None,
+                 progress_callback=None, education_forms=None, profile=False):
+        self._configure(
+            year_id, season, shift1_levels, shift2_levels, education_form,
+            backend, engine, time_budget, seed, perturb, runs, workers, room_assignment,
+            backtrack_depth, backtrack_window, education_forms, profile,
+        )
+        self._snapshot = None
+        self.progress_callback = progress_callback
 
         self.weekdays = list(Weekday.objects.order_by('order'))
         self.timeslots = list(TimeSlot.objects.order_by('start_time'))
         self.rooms = list(Room.objects.filter(is_active=True).order_by('capacity'))
 
-        # O'qituvchi bo'sh vaqtlari keshi (soatbay uchun)
-        self.teacher_availability_cache = set()
-        availabilities = TeacherAvailability.objects.all().prefetch_related('timeslots')
-        for av in availabilities:
-            for slot in av.timeslots.all():
-                self.teacher_availability_cache.add((av.teacher_id, av.weekday_id, slot.id))
+        # O'qituvchi bo'sh vaqtlari (soatbay uchun) — #26: jarayon darajasidagi bitset keshidan
+        self.teacher_availability_cache = get_teacher_availability([s.id for s in self.timeslots])
 
-        # SessionPeriod keshi (kurs -> hafta soni)
+        # SessionPeriod keshi ((ta'lim shakli, kurs) -> hafta soni)
         self.session_weeks_cache = {}
         periods = SessionPeriod.objects.filter(
             academic_year_id=self.year_id,
             semester=self.season,
-            education_form=self.education_form
+            education_form__in=self.education_forms
         )
         for p in periods:
-            self.session_weeks_cache[p.course] = p.weeks_count
+            self.session_weeks_cache[(p.education_form, p.course)] = p.weeks_count
 
+        self._init_state()
+
+        # Boshqa ta'lim shaklining dars jadvalidan teacher/room bandligini yuklash
+        self._load_cross_form_conflicts()
+
+    @classmethod
+    def from_snapshot(cls, snapshot, **options):
+        """
+        #12: DB ga umuman murojaat qilmaydigan servis (multi-start workerlari uchun).
+        Barcha ma'lumotlar ORM'siz ScheduleSnapshot dan olinadi.
+        """
+        service = cls.__new__(cls)
+        service._configure(
+            snapshot.year_id, snapshot.season, snapshot.shift1_levels, snapshot.shift2_levels,
+            snapshot.education_form, education_forms=snapshot.education_forms, **options
+        )
+        for name, value in snapshot.params.items():
+            setattr(service, name, value)
+        service._snapshot = snapshot
+
+        service.weekdays = list(snapshot.weekdays)
+        service.timeslots = list(snapshot.timeslots)
+        service.rooms = list(snapshot.rooms)
+        service.teacher_availability_cache = snapshot.availability
+        service.session_weeks_cache = dict(snapshot.session_weeks)
+
+        service._init_state()
+        service._student_count_cache.update(snapshot.student_counts)
+        for stream in snapshot.streams:
+            service._course_cache[stream.id] = stream.course
+            service._pairs_cache[stream.id] = stream.pairs_needed
+            service._groups_cache[stream.id] = list(stream.groups)
+            service._stream_student_cache[stream.id] = stream.student_count
+            service._form_cache[stream.id] = stream.education_form
+
+        for key in snapshot.teacher_busy:
+            service.matrix_teacher.add(key)
+        for key in snapshot.room_busy:
+            service.matrix_room.add(key)
+        return service
+
+    def _configure(self, year_id, season, shift1_levels=None, shift2_levels=None, education_form='kunduzgi',
+                   backend='set', engine='greedy', time_budget=None, seed=None, perturb=False,
+                   runs=1, workers=None, room_assignment='greedy', backtrack_depth=None, backtrack_window=None,
+                   education_forms=None, profile=False):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Noma'lum backend: {backend}. Mumkin: {', '.join(self.BACKENDS)}")
+        if engine not in self.ENGINES:
+            raise ValueError(f"Noma'lum engine: {engine}. Mumkin: {', '.join(self.ENGINES)}")
+        if room_assignment not in self.ROOM_ASSIGNMENTS:
+            raise ValueError(
+                f"Noma'lum room_assignment: {room_assignment}. Mumkin: {', '.join(self.ROOM_ASSIGNMENTS)}"
+            )
+
+        self.year_id = year_id
+        self.backend = backend
+        self.engine = engine
+        self.time_budget = time_budget if time_budget is not None else self.DEFAULT_TIME_BUDGET
+        self.seed = seed
+        self.perturb = perturb
+        self.runs = max(int(runs or 1), 1)
+        self.workers = workers
+        self.room_assignment = room_assignment
+        # #18: Backtracking chuqurligi va oynasini instansiya darajasida o'zgartirish
+        if backtrack_depth is not None:
+            self.BACKTRACK_DEPTH = max(int(backtrack_depth), 1)
+        if backtrack_window is not None:
+            self.BACKTRACK_WINDOW = max(int(backtrack_window), 1)
+        self.season = season
+        # #21: education_forms berilsa shu shakllar bitta bandlikda birgalikda joylanadi;
+        # self.education_form — birinchi shakl (bitta shaklli kod uchun)
+        forms = tuple(dict.fromkeys(education_forms or (education_form,)))
+        unknown = [form for form in forms if form not in self.EDUCATION_FORMS]
+        if unknown:
+            raise ValueError(
+                f"Noma'lum ta'lim shakli: {', '.join(unknown)}. Mumkin: {', '.join(self.EDUCATION_FORMS)}"
+            )
+        self.education_forms = forms
+        self.education_form = forms[0]
+        self.shift1_levels = shift1_levels if shift1_levels is not None else [1, 4]
+        self.shift2_levels = shift2_levels if shift2_levels is not None else [2, 3]
+
+        # #23: Profillash yoqilgandagina metodlar o'raladi
+        self._profiler = None
+        if profile:
+            self._profiler = GeneratorProfiler()
+            self._profiler.instrument(self)
+
+    def _init_state(self):
+        """Generatsiya holatini (keshlar, bandlik, statistika) boshlang'ich qiymatga keltiradi."""
         # #6: Talabalar soni keshi (group_id -> count)
         self._student_count_cache = {}
 
-        self.matrix_teacher = set()
-        self.matrix_group = set()
-        self.matrix_room = set()
+        # #15: Kichik guruhlar (group_id -> guruhdagi SubGroup soni; stream_id -> talabalar soni)
+        self._subgroup_total_cache = {}
+        self._sub_groups_cache = {}
+        self._stream_student_cache = {}
+
+        # #12: Stream bo'yicha hisoblangan qiymatlar keshi (stream_id -> qiymat)
+        self._course_cache = {}
+        self._pairs_cache = {}
+        self._groups_cache = {}
+        # #21: stream_id -> ta'lim shakli
+        self._form_cache = {}
+
+        # #14: stream_id -> StreamMeta
+        self._meta_cache = {}
+        self._room_mask_cache = {}
+
+        # #12: Tartib va teng holatlarni tasodifiy hal qilish (faqat perturb=True bo'lsa)
+        self._rng = random.Random(self.seed) if self.perturb else None
+
+        self._init_occupancy()
         self.schedule_map = []
         self.errors = []
 
@@ -87,7 +256,11 @@ class ScheduleGeneratorService:
             'fail_reasons': defaultdict(int),
             'per_teacher': defaultdict(lambda: {'placed': 0, 'failed': 0}),
             'per_group': defaultdict(lambda: {'placed': 0, 'failed': 0}),
+            # #19: Bosqich nomi -> sarflangan vaqt (soniya)
+            'phases': {},
         }
+        # #20: Joriy holat (progress_callback ga uzatiladi)
+        self.progress = {}
 
         # #2: Kun yuklamasi hisoblagichlari
         self._day_load_group = defaultdict(int)      # (day_id, group_id) -> dars soni
@@ -96,20 +269,76 @@ class ScheduleGeneratorService:
         # #1: Backtracking uchun joylashtirilgan streamlar tarixi
         self._placement_history = []  # [(stream, groups, group_ids, placement_item), ...]
 
-        # Boshqa ta'lim shaklining dars jadvalidan teacher/room bandligini yuklash
-        self._load_cross_form_conflicts()
+        # #18: Undo jurnali va schedule_map yozuvlari pozitsiyasi (id(entry) -> indeks)
+        self._trail = UndoTrail()
+        self._entry_pos = {}
+
+        # #25: stream_id -> {id(entry): entry} va stream_id -> Counter(day_id)
+        self._stream_entries = defaultdict(dict)
+        self._stream_days = defaultdict(Counter)
+
+    def _init_occupancy(self):
+        """
+        #10: Bandlik matritsalarini tanlangan backend bo'yicha yaratadi.
+        'set'   — (day_id, slot_id, entity_id) kortejlari to'plami
+                  (#16: xonalar uchun shu protokoldagi RoomIndex,
+                  #26: o'qituvchilar uchun (kun, o'qituvchi) bitmaskali SlotMaskIndex).
+        'numpy' — [entity, day, slot] bool tensor, bir kunning barcha slotlari
+                  bitta vektor amal bilan tekshiriladi.
+        """
+        slot_ids = [s.id for s in self.timeslots]
+        # #14: slot_id -> self.timeslots dagi indeks
+        self._slot_pos = {s_id: i for i, s_id in enumerate(slot_ids)}
+        # #24: (day_id, group_id) -> band slot indekslari bitmaskasi (matrix_group bilan birga yangilanadi)
+        self._group_day_mask = defaultdict(int)
+        self._gap_table = build_gap_table(len(slot_ids))
+
+        if self.backend == 'set':
+            # #26: o'qituvchi bandligi (kun, o'qituvchi) bitmaskalarida
+            self.matrix_teacher = SlotMaskIndex(slot_ids)
+            self.matrix_group = set()
+            self.matrix_room = RoomIndex(self.rooms)
+            return
+
+        day_ids = [d.id for d in self.weekdays]
+
+        self.matrix_teacher = OccupancyTensor(day_ids, slot_ids)
+        self.matrix_group = OccupancyTensor(day_ids, slot_ids)
+        # Aktiv xonalar birinchi bo'lib ro'yxatga olinadi: tensor qatori == self.rooms indeksi
+        self.matrix_room = OccupancyTensor(day_ids, slot_ids, [r.id for r in self.rooms])
+        self._room_capacity = np.array([r.capacity for r in self.rooms], dtype=np.int64)
+        self._room_types = np.array([r.room_type for r in self.rooms], dtype=object)
+
+        # Soatbay o'qituvchilar bo'sh vaqtlari ham tensor ko'rinishida
+        self._availability_tensor = OccupancyTensor(day_ids, slot_ids)
+        for teacher_id, day_id, slot_id in self.teacher_availability_cache:
+            if day_id in self._availability_tensor.day_index and slot_id in self._slot_pos:
+                self._availability_tensor.add((day_id, slot_id, teacher_id))
+
+    def _room_fit_mask(self, student_count, allowed_room_types):
+        """#10: Turi va sig'imi mos keladigan aktiv xonalar maskasi (self.rooms tartibida)."""
+        key = (student_count, tuple(allowed_room_types))
+        mask = self._room_mask_cache.get(key)
+        if mask is None:
+            if not self.rooms:
+                mask = np.zeros(0, dtype=bool)
+            else:
+                mask = np.isin(self._room_types, allowed_room_types) & (self._room_capacity >= student_count)
+            self._room_mask_cache[key] = mask
+        return mask
 
     def _load_cross_form_conflicts(self):
         """
         Boshqa ta'lim shakli bo'yicha mavjud jadvaldan o'qituvchi va xona
         bandligini matrix'ga qo'shadi. Bu kunduzgi va sirtqi dars vaqtlari
-        bir-biriga to'g'ri kelmasligi uchun zarur.
+        bir-biriga to'g'ri kelmasligi uchun zarur. #21: birgalikda generatsiya
+        qilinayotgan shakllar bu yerda hisobga olinmaydi (ular qaytadan joylanadi).
         """
-        other_form = 'sirtqi' if self.education_form == 'kunduzgi' else 'kunduzgi'
         existing = TimeTable.objects.filter(
             academic_year_id=self.year_id,
             semester=self.season,
-            education_form=other_form
+        ).exclude(
+            education_form__in=self.education_forms
         ).values_list('weekday_id', 'timeslot_id', 'teacher_id', 'room_id')
 
         for weekday_id, timeslot_id, teacher_id, room_id in existing:
@@ -121,44 +350,97 @@ class ScheduleGeneratorService:
         return [1, 3, 5, 7, 9] if self.season == 'autumn' else [2, 4, 6, 8, 10]
 
     def fetch_streams(self):
+        if self._snapshot is not None:
+            return list(self._snapshot.streams)
+
         semesters = self.get_target_semesters()
         streams = Stream.objects.filter(
             workload__plan_subjects__education_plan__academic_year_id=self.year_id,
             workload__plan_subjects__semester__in=semesters,
-            workload__plan_subjects__education_plan__education_form=self.education_form,
+            workload__plan_subjects__education_plan__education_form__in=self.education_forms,
             teacher__isnull=False
         ).select_related(
-            'workload', 'workload__subject', 'teacher'
+            'workload', 'workload__subject', 'teacher', 'teacher__employee'
         ).prefetch_related(
-            'groups', 'workload__plan_subjects', 'workload__plan_subjects__education_plan'
+            'groups', 'sub_groups', 'workload__plan_subjects', 'workload__plan_subjects__education_plan'
         ).annotate(
             group_count=Count('groups')
         ).distinct()
-        return list(streams)
+        streams = list(streams)
+        self._preload_student_counts(streams)
+        return streams
 
     # --- YORDAMCHI METODLAR ---
     def get_stream_course(self, stream):
         """Stream qaysi kursga tegishliligini O'quv Rejasidan aniqlaydi"""
-        plan_subject = stream.workload.plan_subjects.first()
+        if stream.id in self._course_cache:
+            return self._course_cache[stream.id]
+
+        plan_subject = self._get_plan_subject(stream)
+        if plan_subject and plan_subject.education_plan:
+            course = plan_subject.education_plan.course
+        else:
+            course = 1  # Topilmasa default 1-kurs
+        self._course_cache[stream.id] = course
+        return course
+
+    def get_stream_form(self, stream):
+        """#21: Stream ta'lim shakli (O'quv Rejasidan; bitta shaklli rejimda — servis shakli)"""
+        if len(self.education_forms) == 1:
+            return self.education_form
+        if stream.id in self._form_cache:
+            return self._form_cache[stream.id]
+
+        plan_subject = self._get_plan_subject(stream)
+        form = self.education_form
         if plan_subject and plan_subject.education_plan:
-            return plan_subject.education_plan.course
-        return 1  # Topilmasa default 1-kurs
+            form = plan_subject.education_plan.education_form
+        self._form_cache[stream.id] = form
+        return form
+
+    @staticmethod
+    def _get_plan_subject(stream):
+        """
+        Workload ning birinchi PlanSubject i (.first() bilan bir xil).
+        .first() prefetch keshini chetlab yangi so'rov yuboradi, shuning uchun
+        prefetch qilingan ro'yxatdan olinadi — u ham PlanSubject.Meta.ordering
+        bo'yicha saralangan.
+        """
+        workload = stream.workload
+        if 'plan_subjects' not in getattr(workload, '_prefetched_objects_cache', {}):
+            return workload.plan_subjects.first()
+        plan_subjects = list(workload.plan_subjects.all())
+        return plan_subjects[0] if plan_subjects else None
+
+    def get_stream_groups(self, stream):
+        """Stream guruhlari (keshlanadi)."""
+        if stream.id not in self._groups_cache:
+            self._groups_cache[stream.id] = list(stream.groups.all())
+        return self._groups_cache[stream.id]
 
     def get_weeks_duration(self, stream):
         """SessionPeriod dan dinamik hafta sonini olish"""
         level = self.get_stream_course(stream)
+        form = self.get_stream_form(stream)
 
         # Avval keshdan qidiramiz
-        if level in self.session_weeks_cache:
-            return self.session_weeks_cache[level]
+        if (form, level) in self.session_weeks_cache:
+            return self.session_weeks_cache[(form, level)]
 
         # Kesh topilmasa, ta'lim shakliga qarab default
-        if self.education_form == 'sirtqi':
+        if form == 'sirtqi':
             return self.DEFAULT_WEEKS_PARTTIME
         return self.DEFAULT_WEEKS_FULLTIME
 
     def calculate_pairs(self, stream):
-        plan_subject = stream.workload.plan_subjects.first()
+        if stream.id in self._pairs_cache:
+            return self._pairs_cache[stream.id]
+        pairs = self._calculate_pairs(stream)
+        self._pairs_cache[stream.id] = pairs
+        return pairs
+
+    def _calculate_pairs(self, stream):
+        plan_subject = self._get_plan_subject(stream)
         if not plan_subject:
             return 0
 
@@ -182,7 +464,8 @@ class ScheduleGeneratorService:
     def get_student_count(self, groups):
         """
         Guruhlar bo'yicha haqiqiy aktiv talabalar sonini hisoblash.
-        DB dan to'g'ridan-to'g'ri so'rov yuboriladi va keshlanadi.
+        Kesh odatda fetch_streams da (#15) to'ldiriladi; topilmagan guruh
+        uchungina DB ga alohida so'rov yuboriladi.
         """
         from students.models import Student
 
@@ -201,20 +484,125 @@ class ScheduleGeneratorService:
         # Agar birorta ham talaba topilmasa, 1 qaytaramiz (division by zero oldini olish)
         return count if count > 0 else 1
 
+    def _preload_student_counts(self, streams):
+        """
+        #15: Barcha streamlar guruhlari uchun aktiv talabalar sonini bitta
+        guruhlangan so'rov bilan yuklaydi (get_student_count bilan bir xil ma'no).
+        Kichik guruhlar soni ham bitta so'rov bilan olinadi.
+        """
+        from students.models import Student
+
+        group_ids = set()
+        parent_ids = set()
+        for stream in streams:
+            group_ids.update(g.id for g in self.get_stream_groups(stream))
+            parent_ids.update(sg.group_id for sg in self.get_stream_sub_groups(stream))
+
+        missing = (group_ids | parent_ids) - self._student_count_cache.keys()
+        if missing:
+            counts = dict(
+                Student.objects.filter(group_id__in=missing, status='active')
+                .values_list('group_id')
+                .annotate(n=Count('id'))
+                .values_list('group_id', 'n')
+            )
+            for g_id in missing:
+                self._student_count_cache[g_id] = counts.get(g_id, 0)
+
+        missing = parent_ids - self._subgroup_total_cache.keys()
+        if missing:
+            totals = dict(
+                SubGroup.objects.filter(group_id__in=missing)
+                .values_list('group_id')
+                .annotate(n=Count('id'))
+                .values_list('group_id', 'n')
+            )
+            self._subgroup_total_cache.update(totals)
+
+    def get_stream_sub_groups(self, stream):
+        """Stream kichik guruhlari (keshlanadi; snapshot recordlarida bo'lmaydi)."""
+        if stream.id not in self._sub_groups_cache:
+            manager = getattr(stream, 'sub_groups', None)
+            self._sub_groups_cache[stream.id] = list(manager.all()) if manager is not None else []
+        return self._sub_groups_cache[stream.id]
+
+    def get_stream_student_count(self, stream):
+        """
+        #15: Stream uchun real talabalar soni.
+        Kichik guruh tanlangan bo'lsa, butun guruh emas, uning ulushi olinadi:
+        ceil(guruhdagi aktiv talabalar / guruhdagi kichik guruhlar soni).
+        """
+        if stream.id in self._stream_student_cache:
+            return self._stream_student_cache[stream.id]
+
+        groups = self.get_stream_groups(stream)
+        sub_groups = self.get_stream_sub_groups(stream)
+        if not sub_groups:
+            count = self.get_student_count(groups)
+        else:
+            split_ids = {sg.group_id for sg in sub_groups}
+            whole = [g for g in groups if g.id not in split_ids]
+            count = self.get_student_count(whole) if whole else 0
+            for sg in sub_groups:
+                group_count = self._student_count_cache.get(sg.group_id)
+                if group_count is None:
+                    group_count = self.get_student_count([sg.group])
+                parts = self._subgroup_total_cache.get(sg.group_id) or 1
+                count += math.ceil(group_count / parts)
+            count = count if count > 0 else 1
+
+        self._stream_student_cache[stream.id] = count
+        return count
+
     def sort_streams_by_priority(self, streams):
         def priority_key(stream):
-            group_score = stream.group_count * 100
-            emp_type = stream.employment_type
-            teacher_score = 1000 if emp_type in ('hourly', 'external_part_time') else 0
-            type_score = 50 if stream.lesson_type == 'lab' else 0
+            # #14: Asosiy ball StreamMeta da oldindan hisoblangan
+            priority = self.get_stream_meta(stream).priority
 
-            level = self.get_stream_course(stream)
-            level_score = 500 if self.education_form == 'sirtqi' else 0
+            # #12: Multi-start uchun tartibni tasodifiy silkitish
+            jitter = self._rng.uniform(0, self.PRIORITY_JITTER) if self._rng else 0
 
-            return -(group_score + teacher_score + type_score + level_score)
+            return -(priority + jitter)
 
         return sorted(streams, key=priority_key)
 
+    # =========================================================
+    # #14: STREAM METAMA'LUMOTLARI
+    # =========================================================
+    def get_stream_meta(self, stream):
+        """Stream uchun StreamMeta (birinchi murojaatda hisoblanib keshlanadi)."""
+        meta = self._meta_cache.get(stream.id)
+        if meta is None:
+            meta = self._build_stream_meta(stream)
+            self._meta_cache[stream.id] = meta
+        return meta
+
+    def _build_stream_meta(self, stream):
+        groups = self.get_stream_groups(stream)
+        emp_type = stream.employment_type
+        is_hourly = emp_type in ('hourly', 'external_part_time')
+        slots = tuple(self.get_allowed_slots_for_stream(stream))
+
+        group_score = getattr(stream, 'group_count', len(groups)) * 100
+        teacher_score = 1000 if is_hourly else 0
+        type_score = 50 if stream.lesson_type == 'lab' else 0
+        level_score = 500 if self.get_stream_form(stream) == 'sirtqi' else 0
+
+        return StreamMeta(
+            stream_id=stream.id,
+            teacher_id=stream.teacher.id,
+            employment_type=emp_type,
+            is_hourly=is_hourly,
+            course=self.get_stream_course(stream),
+            pairs_needed=self.calculate_pairs(stream),
+            group_ids=tuple(g.id for g in groups),
+            student_count=self.get_stream_student_count(stream),
+            slots=slots,
+            slot_indices=tuple(self._slot_pos[s.id] for s in slots),
+            room_types=tuple(self.ROOM_TYPE_MAP.get(stream.lesson_type, ['practice'])),
+            priority=group_score + teacher_score + type_score + level_score,
+        )
+
     def get_allowed_slots_for_stream(self, stream):
         """
         Sirtqi talabalar uchun smena cheklovi yo'q (kun bo'yi dars).
@@ -227,7 +615,7 @@ class ScheduleGeneratorService:
             return all_slots
 
         # Sirtqi talabalar uchun smena cheklovi yo'q - kun bo'yi dars
-        if self.education_form == 'sirtqi':
+        if self.get_stream_form(stream) == 'sirtqi':
             return all_slots
 
         # Kunduzgi: Smena tekshiruvi
@@ -273,6 +661,10 @@ class ScheduleGeneratorService:
             total_load = group_load + teacher_load
             day_scores.append((day, total_load))
 
+        # #12: Teng yukli kunlar tartibini tasodifiy hal qilish
+        if self._rng:
+            self._rng.shuffle(day_scores)
+
         # Eng kam yukli kundan boshlaymiz
         day_scores.sort(key=lambda x: x[1])
         return [d[0] for d in day_scores]
@@ -286,35 +678,38 @@ class ScheduleGeneratorService:
         Agar slot guruhning mavjud darslariga yaqin (ketma-ket) bo'lsa — jarima past.
         Agar slot "oyna" hosil qilsa — jarima yuqori.
         """
-        slot_index = None
-        for i, ts in enumerate(self.timeslots):
-            if ts.id == slot.id:
-                slot_index = i
-                break
-
+        slot_index = self._slot_pos.get(slot.id)
         if slot_index is None:
             return 0
+        return self._gap_penalties(day_id, (slot_index,), group_ids)[0]
 
-        # Shu kundagi guruhlarga tegishli band slotlar indekslari
-        occupied_indices = set()
+    def _gap_penalties(self, day_id, slot_indices, group_ids):
+        """
+        #24: Kunning barcha nomzod slotlari uchun "oyna" jarimalari bir yo'la.
+        Guruhlar maskalari OR qilinadi, jarima — build_gap_table jadvalidan:
+        ketma-ket band slotlar orasidagi bo'shliq kvadratlari yig'indisi.
+        """
+        mask = 0
         for g_id in group_ids:
-            for i, ts in enumerate(self.timeslots):
-                if (day_id, ts.id, g_id) in self.matrix_group:
-                    occupied_indices.add(i)
-
-        if not occupied_indices:
+            mask |= self._group_day_mask.get((day_id, g_id), 0)
+        if not mask:
             # Hali hech narsa yo'q — jarima yo'q, lekin erta slotlarni afzal ko'ramiz
-            return slot_index  # Past indeks = past jarima
-
-        # Yangi slotni qo'shganda bo'shliq (gap) bor-yo'qligini tekshirish
-        test_indices = sorted(occupied_indices | {slot_index})
-        total_gap = 0
-        for i in range(1, len(test_indices)):
-            gap = test_indices[i] - test_indices[i - 1] - 1
-            if gap > 0:
-                total_gap += gap * gap  # Katta bo'shliq = katta jarima (kvadratik)
-
-        return total_gap
+            return list(slot_indices)  # Past indeks = past jarima
+        table = self._gap_table
+        return [table[mask | 1 << i] for i in slot_indices]
+
+    def _mark_groups(self, day_id, slot_id, group_ids, busy):
+        """#24: Guruhlar bandligini matrix_group va (kun, guruh) bitmaskalarida birga yangilaydi."""
+        bit = 1 << self._slot_pos[slot_id]
+        masks = self._group_day_mask
+        if busy:
+            for g_id in group_ids:
+                self.matrix_group.add((day_id, slot_id, g_id))
+                masks[(day_id, g_id)] |= bit
+        else:
+            for g_id in group_ids:
+                self.matrix_group.discard((day_id, slot_id, g_id))
+                masks[(day_id, g_id)] &= ~bit
 
     # =========================================================
     # #5: AQLLI XONA TANLASH (BEST-FIT)
@@ -324,32 +719,125 @@ class ScheduleGeneratorService:
         Sig'imga eng yaqin (lekin kichik bo'lmagan) xonani tanlaydi.
         Bu katta xonalarni katta guruhlarga saqlashga yordam beradi.
         """
-        best_room = None
-        best_diff = float('inf')
+        room, _ = self._lookup_room(day_id, slot_id, student_count, allowed_room_types)
+        return room
 
-        for room in self.rooms:
-            if room.room_type not in allowed_room_types:
-                continue
-            if room.capacity < student_count:
-                continue
-            if (day_id, slot_id, room.id) in self.matrix_room:
-                continue
+    def _lookup_room(self, day_id, slot_id, student_count, allowed_room_types):
+        """
+        #16: Eng mos bo'sh xona va topilmasa sabab.
+        Qaytaradi: (room, None) yoki (None, 'room_busy' | 'room_capacity').
+        """
+        if self.backend == 'numpy':
+            # Xonalar sig'im bo'yicha saralangan: birinchi bo'sh mos xona — eng yaqin sig'imli
+            fit = self._room_fit_mask(student_count, allowed_room_types)
+            if not fit.any():
+                return None, "room_capacity"
+            busy = self.matrix_room.day_matrix(day_id, [self._slot_pos[slot_id]], len(self.rooms))[:, 0]
+            free = fit & ~busy
+            if not free.any():
+                return None, "room_busy"
+            return self.rooms[int(free.argmax())], None
+
+        return self.matrix_room.find(day_id, slot_id, student_count, allowed_room_types)
 
-            diff = room.capacity - student_count
-            if diff < best_diff:
-                best_diff = diff
-                best_room = room
+    # =========================================================
+    # SLOT TEKSHIRUVI (set va numpy backendlar uchun)
+    # =========================================================
+    def _check_slot(self, day_id, slot, teacher, emp_type, group_ids, student_count, allowed_room_types):
+        """
+        Bitta slotni tekshiradi.
+        Qaytaradi: (fail_reason, None) yoki (None, best_room).
+        """
+        is_avail, reason = self.is_teacher_available(teacher, day_id, slot.id, emp_type)
+        if not is_avail:
+            if "ish vaqti" in reason:
+                return "teacher_unavailable", None
+            return "teacher_busy", None
+
+        for g_id in group_ids:
+            if (day_id, slot.id, g_id) in self.matrix_group:
+                return "group_busy", None
+
+        # #5: Best-Fit xona tanlash (#16: sabab ham indeksdan olinadi)
+        best_room, room_fail = self._lookup_room(day_id, slot.id, student_count, allowed_room_types)
+        if not best_room:
+            return room_fail, None
 
-        return best_room
+        return None, best_room
+
+    def _check_slots_masked(self, day_id, slots, teacher, emp_type, group_ids, student_count,
+                            allowed_room_types):
+        """
+        #26: set backend uchun: o'qituvchi bandligi, uning bo'sh vaqti va guruhlar
+        bandligi kunning barcha slotlari uchun bitta bitmaska amali bilan olinadi,
+        xona faqat to'siqsiz slotlar uchun qidiriladi. Natija _check_slot bilan
+        aynan bir xil; generator — birinchi mos slotdan keyingilari tekshirilmaydi.
+        """
+        teacher_busy = self.matrix_teacher.day_mask(day_id, teacher.id)
+        unavailable = 0
+        if emp_type in ('hourly', 'external_part_time'):
+            unavailable = ~self.teacher_availability_cache.mask(teacher.id, day_id)
+        group_busy = 0
+        for g_id in group_ids:
+            group_busy |= self._group_day_mask.get((day_id, g_id), 0)
+        blocked = teacher_busy | unavailable | group_busy
+
+        for slot in slots:
+            bit = 1 << self._slot_pos[slot.id]
+            if not blocked & bit:
+                best_room, room_fail = self._lookup_room(day_id, slot.id, student_count, allowed_room_types)
+                yield (room_fail, None) if best_room is None else (None, best_room)
+            elif teacher_busy & bit:
+                yield "teacher_busy", None
+            elif unavailable & bit:
+                yield "teacher_unavailable", None
+            else:
+                yield "group_busy", None
+
+    def _check_slots_vectorized(self, day_id, slots, teacher, emp_type, group_ids, student_count,
+                                allowed_room_types):
+        """
+        #10: Bir kunning barcha nomzod slotlarini bitta vektor amal bilan tekshiradi.
+        Natija _check_slot bilan aynan bir xil: tekshiruv tartibi va sabablar saqlanadi.
+        """
+        slot_idx = np.array([self._slot_pos[s.id] for s in slots], dtype=np.intp)
+
+        teacher_busy = self.matrix_teacher.busy_any([teacher.id], day_id, slot_idx)
+        if emp_type in ('hourly', 'external_part_time'):
+            teacher_unavailable = ~self._availability_tensor.busy_any([teacher.id], day_id, slot_idx)
+        else:
+            teacher_unavailable = np.zeros(len(slots), dtype=bool)
+        group_busy = self.matrix_group.busy_any(group_ids, day_id, slot_idx)
+
+        room_ok = self._room_fit_mask(student_count, allowed_room_types)
+        free_rooms = room_ok[:, None] & ~self.matrix_room.day_matrix(day_id, slot_idx, len(self.rooms))
+        has_room = free_rooms.any(axis=0)
+        first_room = free_rooms.argmax(axis=0) if len(self.rooms) else np.zeros(len(slots), dtype=np.intp)
+        room_fail = "room_busy" if room_ok.any() else "room_capacity"
+
+        checks = []
+        for i in range(len(slots)):
+            if teacher_busy[i]:
+                checks.append(("teacher_busy", None))
+            elif teacher_unavailable[i]:
+                checks.append(("teacher_unavailable", None))
+            elif group_busy[i]:
+                checks.append(("group_busy", None))
+            elif not has_room[i]:
+                checks.append((room_fail, None))
+            else:
+                checks.append((None, self.rooms[int(first_room[i])]))
+        return checks
 
     # =========================================================
     # #4 + #2 + #3: YAXSHILANGAN SLOT TOPISH
     # =========================================================
     def find_best_slot(self, stream, groups, pairs_needed, student_count):
-        group_ids = [g.id for g in groups]
+        meta = self.get_stream_meta(stream)
+        group_ids = meta.group_ids
         teacher = stream.teacher
-        allowed_slots = self.get_allowed_slots_for_stream(stream)
-        allowed_room_types = self.ROOM_TYPE_MAP.get(stream.lesson_type, ['practice'])
+        allowed_slots = meta.slots
+        allowed_room_types = meta.room_types
 
         placed_slots = []
         fail_reasons = {
@@ -363,10 +851,11 @@ class ScheduleGeneratorService:
 
         # #2: Kunlarni yuklanish bo'yicha saralash (eng bo'sh kundan boshlash)
         sorted_days = self._get_sorted_days_for_groups(group_ids, teacher.id)
+        used_days = self._stream_days.get(stream.id, ())
 
         for day in sorted_days:
-            # Shu stream shu kunga allaqachon qo'yilgan bo'lsa, o'tkazamiz
-            if any(p['weekday_id'] == day.id for p in self.schedule_map if p['stream'] == stream):
+            # Shu stream shu kunga allaqachon qo'yilgan bo'lsa, o'tkazamiz (#25: indeksdan)
+            if day.id in used_days:
                 continue
 
             # #4: O'qituvchi kunlik limiti tekshiruvi
@@ -375,57 +864,36 @@ class ScheduleGeneratorService:
                 fail_reasons["teacher_overloaded"] += 1
                 continue
 
-            # #3: Slotlarni "oyna" jarimasi bo'yicha saralash
-            slot_candidates = []
-            for slot in allowed_slots:
-                gap_penalty = self._calculate_gap_penalty(day.id, slot, group_ids)
-                slot_candidates.append((slot, gap_penalty))
+            # #3: Slotlarni "oyna" jarimasi bo'yicha saralash (#24: bitmaska bilan bir yo'la)
+            slot_candidates = list(zip(
+                allowed_slots, self._gap_penalties(day.id, meta.slot_indices, group_ids)
+            ))
 
             # Past jarima = yaxshiroq (ketma-ket darslar)
+            if self._rng:
+                self._rng.shuffle(slot_candidates)
             slot_candidates.sort(key=lambda x: x[1])
 
-            for slot, _ in slot_candidates:
-                is_avail, reason = self.is_teacher_available(teacher, day.id, slot.id, stream.employment_type)
-                if not is_avail:
-                    if "ish vaqti" in reason:
-                        fail_reasons["teacher_unavailable"] += 1
-                    else:
-                        fail_reasons["teacher_busy"] += 1
-                    continue
-
-                groups_busy = False
-                for g_id in group_ids:
-                    if (day.id, slot.id, g_id) in self.matrix_group:
-                        groups_busy = True
-                        break
-                if groups_busy:
-                    fail_reasons["group_busy"] += 1
-                    continue
-
-                # #5: Best-Fit xona tanlash
-                best_room = self._find_best_fit_room(
-                    day.id, slot.id, student_count, allowed_room_types
+            slots = [slot for slot, _ in slot_candidates]
+            if self.backend == 'numpy':
+                checks = self._check_slots_vectorized(
+                    day.id, slots, teacher, stream.employment_type,
+                    group_ids, student_count, allowed_room_types
+                )
+            else:
+                checks = self._check_slots_masked(
+                    day.id, slots, teacher, stream.employment_type,
+                    group_ids, student_count, allowed_room_types
                 )
 
-                if not best_room:
-                    valid_type_rooms = [r for r in self.rooms if r.room_type in allowed_room_types]
-                    if any(r.capacity >= student_count for r in valid_type_rooms):
-                        fail_reasons["room_busy"] += 1
-                    else:
-                        fail_reasons["room_capacity"] += 1
+            for slot, (fail_reason, best_room) in zip(slots, checks):
+                if fail_reason:
+                    fail_reasons[fail_reason] += 1
                     continue
 
                 # Joylashtiramiz
                 placed_slots.append({'weekday': day, 'timeslot': slot, 'room': best_room})
-                self.matrix_teacher.add((day.id, slot.id, teacher.id))
-                self.matrix_room.add((day.id, slot.id, best_room.id))
-                for g_id in group_ids:
-                    self.matrix_group.add((day.id, slot.id, g_id))
-
-                # #2: Yuklanish hisoblagichlarini yangilash
-                self._day_load_teacher[(day.id, teacher.id)] += 1
-                for g_id in group_ids:
-                    self._day_load_group[(day.id, g_id)] += 1
+                self._occupy(day.id, slot.id, teacher.id, best_room.id, group_ids)
 
                 if len(placed_slots) == pairs_needed:
                     return placed_slots, None
@@ -438,6 +906,111 @@ class ScheduleGeneratorService:
 
         return placed_slots, fail_reasons
 
+    def _occupy(self, day_id, slot_id, teacher_id, room_id, group_ids):
+        """Joylashuvni bandlik matritsalari va kun yuklamasiga yozadi."""
+        self._apply_occupancy(day_id, slot_id, teacher_id, room_id, group_ids, 1)
+        self._trail.record(self._apply_occupancy, day_id, slot_id, teacher_id, room_id, group_ids, -1)
+
+    def _release(self, day_id, slot_id, teacher_id, room_id, group_ids):
+        """#18: _occupy ning teskarisi."""
+        self._apply_occupancy(day_id, slot_id, teacher_id, room_id, group_ids, -1)
+        self._trail.record(self._apply_occupancy, day_id, slot_id, teacher_id, room_id, group_ids, 1)
+
+    def _apply_occupancy(self, day_id, slot_id, teacher_id, room_id, group_ids, sign):
+        if sign > 0:
+            self.matrix_teacher.add((day_id, slot_id, teacher_id))
+            self.matrix_room.add((day_id, slot_id, room_id))
+        else:
+            self.matrix_teacher.discard((day_id, slot_id, teacher_id))
+            self.matrix_room.discard((day_id, slot_id, room_id))
+        self._mark_groups(day_id, slot_id, group_ids, sign > 0)
+
+        # #2: Yuklanish hisoblagichlarini yangilash
+        self._day_load_teacher[(day_id, teacher_id)] += sign
+        for g_id in group_ids:
+            self._day_load_group[(day_id, g_id)] += sign
+
+    # =========================================================
+    # #18: UNDO JURNALI (checkpoint / rollback)
+    # =========================================================
+    def checkpoint(self):
+        """Joriy holat belgisi: rollback(mark) shu holatga qaytaradi."""
+        return self._trail.checkpoint()
+
+    def rollback(self, to):
+        """checkpoint() dan keyingi barcha o'zgarishlarni O(o'zgarishlar) da bekor qiladi."""
+        self._trail.rollback(to)
+
+    def commit(self, to):
+        """checkpoint() dan keyingi o'zgarishlarni qabul qiladi."""
+        self._trail.commit(to)
+
+    def _add_entry(self, entry):
+        self._entry_pos[id(entry)] = len(self.schedule_map)
+        self.schedule_map.append(entry)
+        self._index_entry(entry)
+        self._trail.record(self._undo_add_entry, entry)
+
+    def _undo_add_entry(self, entry):
+        # Teskari tartibda bekor qilinadi, shuning uchun yozuv har doim oxirida
+        self.schedule_map.pop()
+        del self._entry_pos[id(entry)]
+        self._unindex_entry(entry)
+
+    def _remove_entry(self, entry):
+        """Yozuvni O(1) da o'chiradi (o'rniga oxirgi yozuv qo'yiladi)."""
+        idx = self._entry_pos.pop(id(entry))
+        last = self.schedule_map.pop()
+        if last is not entry:
+            self.schedule_map[idx] = last
+            self._entry_pos[id(last)] = idx
+        self._unindex_entry(entry)
+        self._trail.record(self._undo_remove_entry, entry, idx)
+
+    def _undo_remove_entry(self, entry, idx):
+        if idx < len(self.schedule_map):
+            moved = self.schedule_map[idx]
+            self._entry_pos[id(moved)] = len(self.schedule_map)
+            self.schedule_map.append(moved)
+            self.schedule_map[idx] = entry
+        else:
+            self.schedule_map.append(entry)
+        self._entry_pos[id(entry)] = idx
+        self._index_entry(entry)
+
+    # =========================================================
+    # #25: STREAM BO'YICHA INDEKS
+    # =========================================================
+    def _index_entry(self, entry):
+        stream_id = entry['stream'].id
+        self._stream_entries[stream_id][id(entry)] = entry
+        self._stream_days[stream_id][entry['weekday_id']] += 1
+
+    def _unindex_entry(self, entry):
+        stream_id = entry['stream'].id
+        del self._stream_entries[stream_id][id(entry)]
+        days = self._stream_days[stream_id]
+        days[entry['weekday_id']] -= 1
+        if not days[entry['weekday_id']]:
+            del days[entry['weekday_id']]
+
+    def _set_schedule(self, entries):
+        """schedule_map ni to'liq almashtiradi va pozitsiya/stream indekslarini qayta quradi."""
+        self.schedule_map = list(entries)
+        self._entry_pos = {id(entry): idx for idx, entry in enumerate(self.schedule_map)}
+        self._stream_entries = defaultdict(dict)
+        self._stream_days = defaultdict(Counter)
+        for entry in self.schedule_map:
+            self._index_entry(entry)
+
+    def get_stream_entries(self, stream_id):
+        """#25: Streamning joriy schedule_map yozuvlari."""
+        return list(self._stream_entries.get(stream_id, {}).values())
+
+    def _set_history(self, index, record):
+        self._trail.record(self._placement_history.__setitem__, index, self._placement_history[index])
+        self._placement_history[index] = record
+
     # =========================================================
     # #1: BACKTRACKING
     # =========================================================
@@ -447,191 +1020,217 @@ class ScheduleGeneratorService:
         boshqa slotlarga surish va qayta urinish.
 
         Mantiq:
-        1. Oxirgi N ta joylashtirilgan streamni ko'rib chiqamiz
-        2. Har birini o'chirib, hozirgi streamni joylashtira olamizmi tekshiramiz
-        3. Agar ha — o'chrilganini boshqa joyga qayta o'rnatamiz
-        4. MAX_BACKTRACK_ATTEMPTS ta urinish
+        1. Oxirgi BACKTRACK_WINDOW ta joylashtirilgan streamni ko'rib chiqamiz
+        2. Har birini bo'shatib, hozirgi streamni joylashtira olamizmi tekshiramiz
+        3. Agar ha — bo'shatilganini boshqa joyga qayta o'rnatamiz; joy topilmasa,
+           u uchun ham xuddi shu usulda joy ochamiz (BACKTRACK_DEPTH darajagacha)
+        4. Har bir darajada MAX_BACKTRACK_ATTEMPTS ta urinish
+        #18: Har bir urinish checkpoint ichida, muvaffaqiyatsizi rollback qilinadi.
         """
         self.stats['backtrack_attempts'] += 1
-
-        # Oxirgi BACKTRACK_WINDOW ta joylashtirilgan stream
-        candidates = self._placement_history[-self.BACKTRACK_WINDOW:]
-        group_ids_current = [g.id for g in groups]
-        teacher_current = stream.teacher
-        allowed_slots_current = self.get_allowed_slots_for_stream(stream)
-        allowed_room_types_current = self.ROOM_TYPE_MAP.get(stream.lesson_type, ['practice'])
-
+        self._report_progress(backtrack=str(stream.name), backtrack_attempts=self.stats['backtrack_attempts'])
+        placed = self._backtrack(stream, groups, pairs_needed, student_count,
+                                 self.BACKTRACK_DEPTH, {stream.id})
+        if placed is not None:
+            self.stats['backtrack_successes'] += 1
+        return placed
+
+    def _backtrack(self, stream, groups, pairs_needed, student_count, depth, exclude):
+        history = self._placement_history
+        first = max(len(history) - self.BACKTRACK_WINDOW, 0)
         attempts = 0
 
-        for prev_stream, prev_groups, prev_group_ids, prev_items in reversed(candidates):
+        for index in range(len(history) - 1, first - 1, -1):
             if attempts >= self.MAX_BACKTRACK_ATTEMPTS:
                 break
             attempts += 1
 
-            # O'zimizning stream ni qayta joylashtirmaymiz
-            if prev_stream.id == stream.id:
+            prev_stream, prev_groups, prev_group_ids, prev_items = history[index]
+            # O'zimizning (va yuqori darajada surilayotgan) streamlarni qayta joylashtirmaymiz
+            if prev_stream.id in exclude:
                 continue
 
-            # Oldingi streamning bitta slotini o'chirish simulyatsiyasi
-            for prev_item in prev_items:
-                prev_day_id = prev_item['weekday_id']
-                prev_slot_id = prev_item['timeslot_id']
-
-                # Oldingi joyni bo'shatish
-                self.matrix_teacher.discard((prev_day_id, prev_slot_id, prev_stream.teacher.id))
-                self.matrix_room.discard((prev_day_id, prev_slot_id, prev_item['room_id']))
-                for g_id in prev_group_ids:
-                    self.matrix_group.discard((prev_day_id, prev_slot_id, g_id))
-
-                # Yuklanish hisoblagichlarini kamaytirish
-                key_t = (prev_day_id, prev_stream.teacher.id)
-                if self._day_load_teacher[key_t] > 0:
-                    self._day_load_teacher[key_t] -= 1
-                for g_id in prev_group_ids:
-                    key_g = (prev_day_id, g_id)
-                    if self._day_load_group[key_g] > 0:
-                        self._day_load_group[key_g] -= 1
+            mark = self.checkpoint()
 
-            # Hozirgi streamni shu bo'shatilgan joyga joylashtirishga urinish
-            new_placed, new_reasons = self.find_best_slot(
-                stream, groups, pairs_needed, student_count
-            )
+            # Oldingi streamning joylarini bo'shatish
+            for item in prev_items:
+                self._remove_entry(item)
+                self._release(item['weekday_id'], item['timeslot_id'], prev_stream.teacher.id,
+                              item['room_id'], prev_group_ids)
 
+            # Hozirgi streamni shu bo'shatilgan joyga joylashtirishga urinish
+            new_placed, _ = self.find_best_slot(stream, groups, pairs_needed, student_count)
             if len(new_placed) == pairs_needed:
-                # Muvaffaqiyat! Endi oldingi streamni boshqa joyga joylashtiramiz
+                prev_meta = self.get_stream_meta(prev_stream)
                 prev_pairs = len(prev_items)
-                prev_student_count = self.get_student_count(prev_groups)
-
-                # Oldingi streamni schedule_map dan o'chiramiz
-                self.schedule_map = [
-                    item for item in self.schedule_map
-                    if item['stream'].id != prev_stream.id
-                ]
-
                 re_placed, _ = self.find_best_slot(
-                    prev_stream, prev_groups, prev_pairs, prev_student_count
+                    prev_stream, prev_groups, prev_pairs, prev_meta.student_count
                 )
 
-                if len(re_placed) >= prev_pairs:
-                    # Barcha joylanganlarni schedule_map ga qo'shamiz
-                    prev_course = self.get_stream_course(prev_stream)
+                if len(re_placed) < prev_pairs and depth > 1:
+                    # Chuqurroq qidiruv: oldingi stream uchun boshqasini surib joy ochamiz
                     for item in re_placed:
-                        self.schedule_map.append({
-                            'stream': prev_stream,
-                            'workload': prev_stream.workload,
-                            'weekday': item['weekday'], 'weekday_id': item['weekday'].id,
-                            'timeslot': item['timeslot'], 'timeslot_id': item['timeslot'].id,
-                            'room': item['room'], 'room_id': item['room'].id,
-                            'teacher_name': str(prev_stream.teacher),
-                            'subject_name': prev_stream.workload.subject.name,
-                            'group_ids': prev_group_ids,
-                            'label': f"{prev_stream.workload.subject.name} ({prev_stream.get_lesson_type_display()})",
-                            'student_count': prev_student_count,
-                            'room_name': item['room'].name,
-                            'course_level': prev_course,
-                        })
-
-                    self.stats['backtrack_successes'] += 1
-                    return new_placed
-                else:
-                    # Oldingi streamni qayta joylashtirib bo'lmadi,
-                    # hammasini tiklash kerak — hozirgi stream ni o'chiramiz
-                    for item in new_placed:
-                        d_id = item['weekday'].id
-                        s_id = item['timeslot'].id
-                        self.matrix_teacher.discard((d_id, s_id, teacher_current.id))
-                        self.matrix_room.discard((d_id, s_id, item['room'].id))
-                        for g_id in group_ids_current:
-                            self.matrix_group.discard((d_id, s_id, g_id))
-                        key_t = (d_id, teacher_current.id)
-                        if self._day_load_teacher[key_t] > 0:
-                            self._day_load_teacher[key_t] -= 1
-                        for g_id in group_ids_current:
-                            key_g = (d_id, g_id)
-                            if self._day_load_group[key_g] > 0:
-                                self._day_load_group[key_g] -= 1
-
-                    # Hozirgi streamning yozuvlarini o'chiramiz
-                    self.schedule_map = [
-                        item for item in self.schedule_map
-                        if item['stream'].id != stream.id
-                    ]
+                        self._release(item['weekday'].id, item['timeslot'].id, prev_stream.teacher.id,
+                                      item['room'].id, prev_group_ids)
+                    re_placed = self._backtrack(
+                        prev_stream, prev_groups, prev_pairs, prev_meta.student_count,
+                        depth - 1, exclude | {prev_stream.id}
+                    ) or []
 
-                    # Oldingi streamni eski joylariga tiklash
-                    for prev_item in prev_items:
-                        d_id = prev_item['weekday_id']
-                        s_id = prev_item['timeslot_id']
-                        self.matrix_teacher.add((d_id, s_id, prev_stream.teacher.id))
-                        self.matrix_room.add((d_id, s_id, prev_item['room_id']))
-                        for g_id in prev_group_ids:
-                            self.matrix_group.add((d_id, s_id, g_id))
-                        self._day_load_teacher[(d_id, prev_stream.teacher.id)] += 1
-                        for g_id in prev_group_ids:
-                            self._day_load_group[(d_id, g_id)] += 1
-
-                    # schedule_map ga qaytaramiz
-                    for prev_item in prev_items:
-                        self.schedule_map.append(prev_item)
-
-                    continue  # Keyingi candidateni sinash
-            else:
-                # Joylashmadi, matritsalarni orqaga qaytarish
-                # Hozirgi urinishda qisman joylashgan narsalarni tozalash
-                for item in new_placed:
-                    d_id = item['weekday'].id
-                    s_id = item['timeslot'].id
-                    self.matrix_teacher.discard((d_id, s_id, teacher_current.id))
-                    self.matrix_room.discard((d_id, s_id, item['room'].id))
-                    for g_id in group_ids_current:
-                        self.matrix_group.discard((d_id, s_id, g_id))
-                    key_t = (d_id, teacher_current.id)
-                    if self._day_load_teacher[key_t] > 0:
-                        self._day_load_teacher[key_t] -= 1
-                    for g_id in group_ids_current:
-                        key_g = (d_id, g_id)
-                        if self._day_load_group[key_g] > 0:
-                            self._day_load_group[key_g] -= 1
-
-                # Oldingilarni tiklash
-                for prev_item in prev_items:
-                    d_id = prev_item['weekday_id']
-                    s_id = prev_item['timeslot_id']
-                    self.matrix_teacher.add((d_id, s_id, prev_stream.teacher.id))
-                    self.matrix_room.add((d_id, s_id, prev_item['room_id']))
-                    for g_id in prev_group_ids:
-                        self.matrix_group.add((d_id, s_id, g_id))
-                    self._day_load_teacher[(d_id, prev_stream.teacher.id)] += 1
-                    for g_id in prev_group_ids:
-                        self._day_load_group[(d_id, g_id)] += 1
+                if len(re_placed) >= prev_pairs:
+                    entries = [
+                        self._build_entry(prev_stream, item, prev_group_ids,
+                                          prev_meta.student_count, prev_meta.course)
+                        for item in re_placed
+                    ]
+                    for entry in entries:
+                        self._add_entry(entry)
+                    self._set_history(index, (prev_stream, prev_groups, prev_group_ids, entries))
+                    self.commit(mark)
+                    return new_placed
 
-                continue
+            # Joylashmadi — holatni urinishdan oldingi ko'rinishga qaytarish
+            self.rollback(mark)
 
         return None  # Backtracking muvaffaqiyatsiz
 
+    def _build_entry(self, stream, item, group_ids, student_count, course_level):
+        """schedule_map uchun bitta joylashuv yozuvi (Template ham shu formatni kutadi)."""
+        return {
+            'stream': stream,
+            'workload': stream.workload,
+            'weekday': item['weekday'], 'weekday_id': item['weekday'].id,
+            'timeslot': item['timeslot'], 'timeslot_id': item['timeslot'].id,
+            'room': item['room'], 'room_id': item['room'].id,
+            'teacher_name': str(stream.teacher),
+            'subject_name': stream.workload.subject.name,
+            'group_ids': group_ids,
+            'label': f"{stream.workload.subject.name} ({stream.get_lesson_type_display()})",
+            'student_count': student_count,
+            'room_name': item['room'].name,
+            'course_level': course_level,
+        }
+
+    # =========================================================
+    # #19: GENERATSIYA BOSQICHLARI VAQTI
+    # =========================================================
+    @contextmanager
+    def _phase(self, name):
+        """Blok bajarilish vaqtini stats['phases'][name] ga qo'shadi."""
+        self._report_progress(phase=name)
+        queries = self._profiler.queries if self._profiler is not None else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phases = self.stats['phases']
+            phases[name] = round(phases.get(name, 0) + time.perf_counter() - start, 4)
+            if self._profiler is not None:
+                self._profiler.phase_queries[name] += self._profiler.queries - queries
+
+    # =========================================================
+    # #23: PROFILLASH
+    # =========================================================
+    @contextmanager
+    def _profiling(self):
+        """
+        profile=True bo'lsa blok ichidagi SQL so'rovlarni sanaydi, oxirida profilni
+        stats['profile'] ga va 'talababase' logger iga yozadi. Aks holda hech narsa qilmaydi.
+        """
+        if self._profiler is None:
+            yield
+            return
+        try:
+            with connection.execute_wrapper(self._profiler.count_query):
+                yield
+        finally:
+            self.stats['profile'] = self._profiler.report()
+            self._profiler.log(
+                logger,
+                f"Jadval generatori profili (yil={self.year_id}, {self.season}, {'+'.join(self.education_forms)})",
+                self.stats['phases'],
+            )
+
+    # =========================================================
+    # #20: JARAYON HOLATI (PROGRESS)
+    # =========================================================
+    def _report_progress(self, **state):
+        """
+        Holatni yangilab progress_callback ni chaqiradi (callback bo'lmasa hech narsa qilmaydi).
+        Callback istisno ko'tarib generatsiyani to'xtatishi mumkin (masalan, bekor qilinganda).
+        """
+        if self.progress_callback is None:
+            return
+        self.progress.update(state)
+        self.progress_callback(self.progress)
+
     # =========================================================
     # ASOSIY GENERATSIYA
     # =========================================================
     def generate(self, dry_run=True):
-        raw_streams = self.fetch_streams()
-        streams = self.sort_streams_by_priority(raw_streams)
-
-        self.schedule_map = []
+        with self._profiling():
+            return self._generate(dry_run)
+
+    def _generate(self, dry_run):
+        # #12: Multi-start — bir nechta mustaqil generatsiya, eng yaxshisi olinadi
+        if self.runs > 1:
+            with self._phase('multi_start'):
+                MultiStartRunner(self).run()
+            self._diagnose()
+            if not dry_run:
+                with self._phase('save'):
+                    self._save_to_db()
+            return self.schedule_map, self.errors
+
+        with self._phase('fetch'):
+            raw_streams = self.fetch_streams()
+            streams = self.sort_streams_by_priority(raw_streams)
+
+        self._set_schedule([])
         self.errors = []
         self._placement_history = []
 
         # #9: Statistikani boshlash
         self.stats['total_streams'] = len(streams)
+        self._report_progress(streams_total=len(streams), streams_processed=0)
 
-        for stream in streams:
-            pairs_needed = self.calculate_pairs(stream)
+        with self._phase('greedy'):
+            self._place_streams(streams)
+
+        # #11: Greedy natijasini lokal qidiruv bilan yaxshilash
+        if self.engine == 'local_search':
+            with self._phase('local_search'):
+                LocalSearchOptimizer(self, time_budget=self.time_budget, seed=self.seed).run()
+
+        # #17: 2-bosqich — har bir (kun, slot) uchun xonalarni optimal qayta taqsimlash
+        if self.room_assignment == 'matching':
+            with self._phase('room_assignment'):
+                RoomAssigner(self).run()
+
+        self._diagnose()
+        if not dry_run:
+            with self._phase('save'):
+                self._save_to_db()
+
+        return self.schedule_map, self.errors
+
+    def _place_streams(self, streams):
+        """Greedy bosqich: streamlarni navbat bilan joylash (kerak bo'lsa backtracking)."""
+        for processed, stream in enumerate(streams):
+            self._report_progress(
+                streams_processed=processed, pairs_placed=self.stats['total_pairs_placed'],
+                pairs_needed=self.stats['total_pairs_needed'], backtrack=None,
+            )
+            meta = self.get_stream_meta(stream)
+            pairs_needed = meta.pairs_needed
             if pairs_needed < 1:
                 continue
 
             self.stats['total_pairs_needed'] += pairs_needed
 
-            groups = list(stream.groups.all())
-            group_ids = [g.id for g in groups]
-            student_count = self.get_student_count(groups)
+            groups = self.get_stream_groups(stream)
+            group_ids = list(meta.group_ids)
+            student_count = meta.student_count
             teacher_name = str(stream.teacher)
 
             allocated, reasons = self.find_best_slot(stream, groups, pairs_needed, student_count)
@@ -640,35 +1239,30 @@ class ScheduleGeneratorService:
             missing = pairs_needed - len(allocated)
             if missing > 0 and len(self._placement_history) > 0:
                 # Avval qisman joylashganlarni qaytarib olamiz (backtrack uchun toza holat)
+                mark = self.checkpoint()
+                for item in allocated:
+                    self._release(item['weekday'].id, item['timeslot'].id, stream.teacher.id,
+                                  item['room'].id, group_ids)
                 # Backtrack bilan qayta urinish
                 backtrack_result = self._try_backtrack(
                     stream, groups, pairs_needed, student_count
                 )
                 if backtrack_result is not None:
+                    self.commit(mark)
                     allocated = backtrack_result
                     missing = 0
                     reasons = None
+                else:
+                    # Qisman joylashuv qaytib tiklanadi
+                    self.rollback(mark)
 
             # --- Streamning kursini ham natijaga qo'shamiz (Template uchun) ---
-            course_level = self.get_stream_course(stream)
+            course_level = meta.course
 
             placed_items = []
             for item in allocated:
-                entry = {
-                    'stream': stream,
-                    'workload': stream.workload,
-                    'weekday': item['weekday'], 'weekday_id': item['weekday'].id,
-                    'timeslot': item['timeslot'], 'timeslot_id': item['timeslot'].id,
-                    'room': item['room'], 'room_id': item['room'].id,
-                    'teacher_name': teacher_name,
-                    'subject_name': stream.workload.subject.name,
-                    'group_ids': group_ids,
-                    'label': f"{stream.workload.subject.name} ({stream.get_lesson_type_display()})",
-                    'student_count': student_count,
-                    'room_name': item['room'].name,
-                    'course_level': course_level,
-                }
-                self.schedule_map.append(entry)
+                entry = self._build_entry(stream, item, group_ids, student_count, course_level)
+                self._add_entry(entry)
                 placed_items.append(entry)
 
             # #1: Backtracking tarixga qo'shish
@@ -692,60 +1286,122 @@ class ScheduleGeneratorService:
 
             if missing > 0:
                 if reasons:
-                    top_reason = max(reasons, key=reasons.get)
-                    detail = f"{missing} ta para qolib ketdi. Sabab: {top_reason}"
                     # #9: Sabablarni yig'ish
                     for r_key, r_count in reasons.items():
                         if r_count > 0:
                             self.stats['fail_reasons'][r_key] += r_count
                 else:
-                    detail = f"{missing} ta para joylashmadi."
                     self.stats['fail_reasons']['unknown'] += missing
 
-                self.errors.append({
-                    'workload': stream.workload,
-                    'reason': detail,
-                    'stats': reasons,
-                    # #9: Qo'shimcha ma'lumot
-                    'teacher': teacher_name,
-                    'groups': ', '.join([g.name for g in groups]),
-                    'lesson_type': stream.get_lesson_type_display(),
-                    'pairs_needed': pairs_needed,
-                    'pairs_placed': len(allocated),
-                })
+                self.errors.append(self._build_error(stream, groups, reasons, pairs_needed, len(allocated)))
 
-        if not dry_run:
-            self._save_to_db()
+        self._report_progress(
+            streams_processed=len(streams), pairs_placed=self.stats['total_pairs_placed'],
+            pairs_needed=self.stats['total_pairs_needed'], backtrack=None,
+        )
 
+    # =========================================================
+    # #13: TUZATISH (REPAIR) REJIMI
+    # =========================================================
+    def repair(self, stream_ids=None, teacher_ids=None, room_ids=None, dry_run=True):
+        """
+        Mavjud jadvalni saqlagan holda faqat buzilgan joylashuvlarni qayta joylaydi.
+        DB ga minimal farq yoziladi (ta'sir qilinmagan qatorlar ID si o'zgarmaydi).
+        """
+        if len(self.education_forms) > 1:
+            raise ValueError("Tuzatish rejimi bitta ta'lim shakli uchun ishlaydi")
+        with self._profiling(), self._phase('repair'):
+            ScheduleRepairer(
+                self, stream_ids=stream_ids, teacher_ids=teacher_ids, room_ids=room_ids
+            ).run(dry_run=dry_run)
         return self.schedule_map, self.errors
 
+    def _build_error(self, stream, groups, reasons, pairs_needed, pairs_placed):
+        """Joylashmagan stream uchun xato yozuvi."""
+        return {
+            'stream': stream,
+            'workload': stream.workload,
+            'reason': self._missing_detail(pairs_needed - pairs_placed, reasons),
+            'stats': reasons,
+            # #9: Qo'shimcha ma'lumot
+            'teacher': str(stream.teacher),
+            'groups': ', '.join([g.name for g in groups]),
+            'lesson_type': stream.get_lesson_type_display(),
+            'pairs_needed': pairs_needed,
+            'pairs_placed': pairs_placed,
+        }
+
+    def _diagnose(self):
+        """#27: Joylashmagan streamlar uchun qaysi bitta cheklov yumshatilishi kerakligi (error['diagnosis'])."""
+        if self.errors:
+            with self._phase('diagnostics'):
+                ScheduleDiagnostics(self).run()
+
+    def serialize_error(self, error):
+        """#27: Xato yozuvining JSON ko'rinishi (preview natijasi va ScheduleError uchun)."""
+        stream = error['stream']
+        plan_subject = self._get_plan_subject(stream)
+        return {
+            'stream_id': stream.id,
+            'workload_id': error['workload'].id,
+            'reason': error['reason'],
+            'stats': error['stats'],
+            'teacher': error['teacher'],
+            'groups': error['groups'],
+            'lesson_type': error['lesson_type'],
+            'pairs_needed': error['pairs_needed'],
+            'pairs_placed': error['pairs_placed'],
+            'education_form': self.get_stream_form(stream),
+            'semester': plan_subject.semester if plan_subject else 0,
+            'diagnosis': error.get('diagnosis'),
+        }
+
+    @staticmethod
+    def _missing_detail(missing, reasons):
+        """Joylashmagan paralar uchun xato matni."""
+        if reasons:
+            top_reason = max(reasons, key=reasons.get)
+            return f"{missing} ta para qolib ketdi. Sabab: {top_reason}"
+        return f"{missing} ta para joylashmadi."
+
     def _save_to_db(self):
+        """
+        Jadvalni DB ga farq bo'yicha yozadi (tabiiy kalit: stream, guruh, kun, slot):
+        o'zgarmagan darslar ID si saqlanadi. Natija stats['persistence'] da.
+        #21: Har bir ta'lim shakli o'z qatorlariga yoziladi, hammasi bitta tranzaksiyada.
+        """
+        desired = {form: {} for form in self.education_forms}
+        for item in self.schedule_map:
+            stream = item['stream']
+            rows = desired[self.get_stream_form(stream)]
+            for group_id in item['group_ids']:
+                rows[(stream.id, group_id, item['weekday_id'], item['timeslot_id'])] = {
+                    'room_id': item['room_id'],
+                    'teacher_id': stream.teacher.id,
+                    'subject_id': stream.workload.subject.id,
+                }
         with transaction.atomic():
-            # Faqat shu ta'lim shakli bo'yicha tozalash
-            TimeTable.objects.filter(
-                academic_year_id=self.year_id,
-                semester=self.season,
-                education_form=self.education_form
+            # Faqat shu ta'lim shakl(lar)i; qo'lda kiritilgan qatorlar ham yangi jadval bilan almashadi
+            per_form = {
+                form: sync_timetable(self.year_id, self.season, form, rows, prune_manual=True)
+                for form, rows in desired.items()
+            }
+            if len(per_form) == 1:
+                self.stats['persistence'] = per_form[self.education_form]
+            else:
+                totals = defaultdict(int)
+                for changes in per_form.values():
+                    for key, value in changes.items():
+                        totals[key] += value
+                self.stats['persistence'] = dict(totals, forms=per_form)
+            # #27: Xatoliklar diagnostika natijasi bilan (shu shakl(lar) bo'yicha almashtiriladi)
+            ScheduleError.objects.filter(
+                academic_year_id=self.year_id, education_form__in=self.education_forms
             ).delete()
-
-            objs = []
-            for item in self.schedule_map:
-                for group_id in item['group_ids']:
-                    objs.append(TimeTable(
-                        academic_year_id=self.year_id,
-                        semester=self.season,
-                        education_form=self.education_form,
-                        weekday=item['weekday'],
-                        timeslot=item['timeslot'],
-                        stream=item['stream'],
-                        subject=item['stream'].workload.subject,
-                        teacher=item['stream'].teacher,
-                        group_id=group_id,
-                        room=item['room']
-                    ))
-            TimeTable.objects.bulk_create(objs)
-            # Xatoliklar (ixtiyoriy)
-            ScheduleError.objects.filter(academic_year_id=self.year_id).delete()
+            ScheduleError.objects.bulk_create(
+                build_schedule_errors(self.year_id, [self.serialize_error(e) for e in self.errors])
+            )
+        return self.stats['persistence']
 
     # =========================================================
     # #9: STATISTIKA OLISH
@@ -769,4 +1425,26 @@ class ScheduleGeneratorService:
             'backtrack_successes': s['backtrack_successes'],
             'fail_reasons': dict(s['fail_reasons']),
         }
-        return summary
\ No newline at end of file
+        # #11: Lokal qidiruv natijasi (eng yaxshi narx vaqt bo'yicha)
+        if 'local_search' in s:
+            summary['local_search'] = s['local_search']
+        # #12: Multi-start urinishlari natijalari
+        if 'multi_start' in s:
+            summary['multi_start'] = s['multi_start']
+        # #17: Xonalarni qayta taqsimlash natijasi
+        if 'room_assignment' in s:
+            summary['room_assignment'] = s['room_assignment']
+        # #13: Tuzatish rejimi natijasi (farq hajmi)
+        if 'repair' in s:
+            summary['repair'] = s['repair']
+        # Saqlash natijasi (qo'shilgan / o'zgargan / o'chirilgan qatorlar)
+        if 'persistence' in s:
+            summary['persistence'] = s['persistence']
+        # #23: Profil (faqat profile=True bo'lsa)
+        if 'profile' in s:
+            summary['profile'] = s['profile']
+        return summary
+
+    def get_quality_report(self):
+        """#22: Joriy schedule_map sifati (ScheduleQuality ko'rsatkichlari)."""
+        return ScheduleQuality.from_service(self).score()
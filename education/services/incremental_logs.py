@@ -0,0 +1,141 @@
+"""
+Dars jurnalini bosqichma-bosqich (watermark bo'yicha) generatsiya qilish.
+
+Har bir (o'quv yili, mavsum, ta'lim shakli) uchun LessonLogWatermark oxirgi
+to'ldirilgan sanani saqlaydi. Navbatdagi ishga tushish faqat
+(belgi + 1 kun) .. (bugun + ufq) oralig'ini, sessiya davrlari bilan
+kesishgan qismida to'ldiradi — tungi ishga tushishlar kichik bo'lib qoladi.
+
+Ta'lim shakllari parallel oqimlarda bajariladi (SQLite da — ketma-ket):
+Django ulanishi oqimga bog'liq, shuning uchun har bir oqim o'z DB ulanishini
+ochadi va oxirida yopadi (jobs._run_in_worker bilan bir xil). Bitta shakl
+ichidagi nishonlar ketma-ket ishlaydi. Jurnal yozuvlari va belgi bitta
+tranzaksiyada saqlanadi: yiqilgan ishga tushish belgini surmaydi.
+"""
+import datetime
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from education.models import LessonLogWatermark, SessionPeriod
+from education.services.lesson_logs import LessonLogGenerator
+from students.models import AcademicYear
+
+logger = logging.getLogger('talababase')
+
+DEFAULT_HORIZON_DAYS = 14
+
+
+def find_targets(today, horizon_days=DEFAULT_HORIZON_DAYS, year_ids=None, seasons=None, education_forms=None):
+    """
+    To'ldirilishi kerak bo'lgan oraliqlar:
+    [{'year_id', 'season', 'education_form', 'start', 'end'}, ...].
+    Oyna — shu (yil, mavsum, shakl) sessiya davrlarining eng erta boshlanishi
+    va eng kech tugashi. Yil berilmasa faol o'quv yillari olinadi.
+    """
+    if year_ids is None:
+        year_ids = list(AcademicYear.objects.filter(is_active=True).values_list('id', flat=True))
+    periods = SessionPeriod.objects.filter(academic_year_id__in=year_ids)
+    if seasons:
+        periods = periods.filter(semester__in=seasons)
+    if education_forms:
+        periods = periods.filter(education_form__in=education_forms)
+    windows = periods.values('academic_year_id', 'semester', 'education_form').annotate(
+        first=Min('start_date'), last=Max('end_date'),
+    ).order_by('academic_year_id', 'semester', 'education_form')
+
+    watermarks = {
+        (w.academic_year_id, w.semester, w.education_form): w.generated_until
+        for w in LessonLogWatermark.objects.filter(academic_year_id__in=year_ids)
+    }
+    horizon = today + datetime.timedelta(days=horizon_days)
+    targets = []
+    for window in windows:
+        key = (window['academic_year_id'], window['semester'], window['education_form'])
+        start = window['first']
+        if key in watermarks:
+            start = max(start, watermarks[key] + datetime.timedelta(days=1))
+        end = min(window['last'], horizon)
+        if start <= end:
+            targets.append({'year_id': key[0], 'season': key[1], 'education_form': key[2],
+                            'start': start, 'end': end})
+    return targets
+
+
+def run_target(target, dry_run=False):
+    """Bitta oraliqni to'ldiradi va belgini suradi. Qaytaradi: natija dict."""
+    generator = LessonLogGenerator(target['year_id'], target['season'], target['education_form'])
+    key = {'academic_year_id': target['year_id'], 'semester': target['season'],
+           'education_form': target['education_form']}
+    with transaction.atomic():
+        if dry_run:
+            mark = LessonLogWatermark.objects.filter(**key).values_list('generated_until', flat=True).first()
+        else:
+            # Qulf qatorni talab qiladi: birinchi ishga tushishda belgi avval yaratiladi
+            # (oynadan oldingi kun), so'ng qayta o'qiladi — bir vaqtda ishga tushgan boshqa
+            # jarayon shu yerda kutadi va belgini surib ulgurganini ko'radi
+            LessonLogWatermark.objects.get_or_create(
+                **key, defaults={'generated_until': target['start'] - datetime.timedelta(days=1)},
+            )
+            watermark = LessonLogWatermark.objects.select_for_update().get(**key)
+            mark = watermark.generated_until
+        if mark is not None and mark >= target['start']:
+            target = dict(target, start=mark + datetime.timedelta(days=1))
+            if target['start'] > target['end']:
+                return dict(target, created=0)
+
+        created = generator.run(target['start'], target['end'], dry_run=dry_run)
+        if not dry_run:
+            watermark.generated_until = target['end']
+            watermark.last_created = created
+            watermark.save(update_fields=['generated_until', 'last_created', 'updated_at'])
+    return dict(target, created=created)
+
+
+def _run_form(targets, dry_run):
+    """Bitta ta'lim shaklining nishonlari (worker oqimida: o'z DB ulanishi bilan)."""
+    close_old_connections()
+    try:
+        return _run_targets(targets, dry_run)
+    finally:
+        connection.close()
+
+
+def _run_targets(targets, dry_run):
+    results = []
+    for target in targets:
+        try:
+            results.append(run_target(target, dry_run))
+        except Exception as exc:
+            logger.exception("Jurnal generatsiyasi xato bilan tugadi: %s", target)
+            results.append(dict(target, created=0, error=str(exc)))
+    return results
+
+
+def run_incremental(today=None, horizon_days=DEFAULT_HORIZON_DAYS, year_ids=None, seasons=None,
+                    education_forms=None, parallel=True, dry_run=False):
+    """
+    Barcha nishonlarni to'ldiradi. parallel=True bo'lsa har bir ta'lim shakli
+    alohida oqimda (alohida DB ulanishida) ishlaydi.
+    Qaytaradi: nishonlar natijalari ro'yxati (yil, mavsum, shakl tartibida).
+    """
+    today = today or timezone.localdate()
+    targets = find_targets(today, horizon_days, year_ids, seasons, education_forms)
+    by_form = defaultdict(list)
+    for target in targets:
+        by_form[target['education_form']].append(target)
+
+    # SQLite bir vaqtda bitta yozuvchiga ruxsat beradi — parallel oqimlar bir-birini bloklaydi
+    if not parallel or len(by_form) <= 1 or connection.vendor == 'sqlite':
+        results = _run_targets(targets, dry_run)
+    else:
+        with ThreadPoolExecutor(max_workers=len(by_form), thread_name_prefix='lesson-logs') as executor:
+            futures = [executor.submit(_run_form, form_targets, dry_run) for form_targets in by_form.values()]
+            results = [result for future in futures for result in future.result()]
+
+    order = {(t['year_id'], t['season'], t['education_form']): i for i, t in enumerate(targets)}
+    return sorted(results, key=lambda r: order[(r['year_id'], r['season'], r['education_form'])])
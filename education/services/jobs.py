@@ -0,0 +1,226 @@
+"""
+Jadval generatsiyasini HTTP so'rovdan tashqarida bajarish.
+
+Vazifa ScheduleJob jadvaliga yoziladi va jarayon ichidagi lokal worker
+pool'ga (ThreadPoolExecutor) beriladi. Worker holatni (qayta ishlangan
+streamlar, joylashgan paralar, joriy backtrack) ScheduleJob.progress ga
+yozib boradi; shu yangilash bilan birga heartbeat_at yangilanadi va bekor
+qilish so'rovi ham tekshiriladi.
+
+Jarayon ichidagi pool ishonchli emas: web jarayon qayta ishga tushsa yoki
+o'ldirilsa, navbatdagi (on_commit hali bajarilmagan) vazifa yo'qoladi,
+bajarilayotgani esa 'running' holatida qolib ketadi. Shuning uchun
+`manage.py run_schedule_jobs` cron orqali muntazam ishga tushirilishi
+shart: u qolib ketgan 'pending' vazifalarni bajaradi va signali
+STALE_AFTER dan eski 'running' vazifalarni 'failed' deb belgilaydi.
+"""
+import datetime
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from education.models import ScheduleJob
+from education.services.generator import ScheduleGeneratorService
+from education.services.preview import build_snapshot, input_fingerprint
+
+logger = logging.getLogger('talababase')
+
+PROGRESS_INTERVAL = 0.5         # DB dagi progress necha soniyada bir yangilanadi
+DEFAULT_WORKERS = 2             # settings.SCHEDULE_JOB_WORKERS bo'lmasa
+STALE_AFTER = datetime.timedelta(minutes=10)    # shuncha vaqt signal bo'lmasa worker to'xtagan hisoblanadi
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """Vazifa foydalanuvchi tomonidan bekor qilindi."""
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'SCHEDULE_JOB_WORKERS', DEFAULT_WORKERS),
+                thread_name_prefix='schedule-job',
+            )
+    return _executor
+
+
+def submit_job(kind, params, user=None):
+    """Vazifani yaratadi; tranzaksiya commit bo'lgach worker pool'ga beriladi."""
+    job = ScheduleJob.objects.create(
+        kind=kind, params=params,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+    transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, job.pk))
+    return job
+
+
+def cancel_job(job_id):
+    """
+    Navbatdagi vazifa darhol bekor qilinadi, bajarilayotganiga esa bayroq
+    qo'yiladi (worker keyingi progress yangilanishida to'xtaydi).
+    """
+    now = timezone.now()
+    if ScheduleJob.objects.filter(pk=job_id, status='pending').update(
+            status='cancelled', cancel_requested=True, finished_at=now):
+        return True
+    return bool(ScheduleJob.objects.filter(pk=job_id, status='running').update(cancel_requested=True))
+
+
+def build_service(params, progress_callback=None):
+    """ScheduleJob.params dan generator servisini yaratadi."""
+    return ScheduleGeneratorService(
+        params['year_id'], params['season'], params.get('shift1_levels'), params.get('shift2_levels'),
+        params.get('education_form', 'kunduzgi'),
+        backend=params.get('backend', 'set'),
+        engine=params.get('engine', 'greedy'),
+        time_budget=params.get('time_budget'),
+        runs=params.get('runs', 1),
+        room_assignment=params.get('room_assignment', 'greedy'),
+        progress_callback=progress_callback,
+    )
+
+
+class _ProgressReporter:
+    """
+    Generator progress_callback i: holatni ko'pi bilan PROGRESS_INTERVAL da bir
+    marta DB ga yozadi. Yozish `cancel_requested=False` sharti bilan bajariladi,
+    shuning uchun bitta so'rov bekor qilinganini ham aniqlaydi.
+    """
+
+    def __init__(self, job_id, interval=PROGRESS_INTERVAL):
+        self.job_id = job_id
+        self.interval = interval
+        self._last = float('-inf')
+
+    def __call__(self, progress):
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return
+        self._last = now
+        self.flush(progress)
+
+    def flush(self, progress):
+        updated = ScheduleJob.objects.filter(pk=self.job_id, cancel_requested=False).update(
+            progress=dict(progress), heartbeat_at=timezone.now()
+        )
+        if not updated:
+            raise JobCancelled()
+
+
+def serialize_preview(service, schedule_map, errors):
+    """Simulyatsiya natijasining JSON ko'rinishi (admin preview shundan chiziladi)."""
+    lessons = [
+        {
+            'stream_id': item['stream'].id,
+            'weekday_id': item['weekday_id'],
+            'timeslot_id': item['timeslot_id'],
+            'room_id': item['room_id'],
+            'group_ids': list(item['group_ids']),
+            'teacher_name': item['teacher_name'],
+            'subject_name': item['subject_name'],
+            'label': item['label'],
+            'student_count': item['student_count'],
+            'room_name': item['room_name'],
+            'course_level': item['course_level'],
+        }
+        for item in schedule_map
+    ]
+    return {
+        'lessons': lessons,
+        'errors': [service.serialize_error(error) for error in errors],
+        'stats_summary': service.get_stats_summary(),
+        'quality': service.get_quality_report(),
+        'total_streams': service.stats['total_streams'],
+    }
+
+
+def _execute(job, service):
+    if job.kind == 'save':
+        _, errors = service.generate(dry_run=False)
+        return {
+            'stats_summary': service.get_stats_summary(),
+            'quality': service.get_quality_report(),
+            'errors_count': len(errors),
+        }
+    if job.kind == 'repair':
+        _, errors = service.repair(dry_run=False)
+        return {'repair': service.stats['repair'], 'errors_count': len(errors)}
+    # Barmoq izi generatsiyadan oldin olinadi: jarayon davomidagi o'zgarishlar ham sezilsin
+    fingerprint = input_fingerprint(service.year_id, service.season, service.education_form)
+    schedule_map, errors = service.generate(dry_run=True)
+    result = serialize_preview(service, schedule_map, errors)
+    result.update(fingerprint=fingerprint, snapshot=build_snapshot(schedule_map))
+    return result
+
+
+def run_job(job_id):
+    """
+    Vazifani joriy oqimda bajaradi. Faqat 'pending' holatdagi vazifa olinadi
+    (bir vazifani ikki worker bajarmasligi uchun), aks holda None qaytadi.
+    """
+    now = timezone.now()
+    claimed = ScheduleJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=now, heartbeat_at=now
+    )
+    if not claimed:
+        return None
+
+    job = ScheduleJob.objects.get(pk=job_id)
+    reporter = _ProgressReporter(job.pk)
+    service = None
+    fields = {}
+    try:
+        service = build_service(job.params, progress_callback=reporter)
+        fields['result'] = _execute(job, service)
+        fields['status'] = 'done'
+    except JobCancelled:
+        fields['status'] = 'cancelled'
+    except Exception:
+        logger.exception("Jadval vazifasi #%s xato bilan tugadi", job.pk)
+        fields.update(status='failed', error=traceback.format_exc())
+
+    if service is not None:
+        fields['progress'] = dict(service.progress, phase=fields['status'])
+    fields['finished_at'] = timezone.now()
+    ScheduleJob.objects.filter(pk=job.pk).update(**fields)
+    job.refresh_from_db()
+    return job
+
+
+def fail_stale_jobs(stale_after=STALE_AFTER):
+    """
+    Signali (heartbeat_at, bo'lmasa started_at) stale_after dan eski 'running'
+    vazifalarni 'failed' deb belgilaydi — ularning workeri jarayon bilan birga
+    to'xtagan. Qaytaradi: belgilangan vazifalar soni.
+    """
+    now = timezone.now()
+    threshold = now - stale_after
+    stale = ScheduleJob.objects.filter(status='running').filter(
+        Q(heartbeat_at__lt=threshold) | Q(heartbeat_at__isnull=True, started_at__lt=threshold)
+    )
+    return stale.update(
+        status='failed', finished_at=now,
+        error=f"Worker {int(stale_after.total_seconds() // 60)} daqiqadan beri signal bermadi "
+              f"(jarayon to'xtagan bo'lishi mumkin).",
+    )
+
+
+def _run_in_worker(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    except Exception:
+        logger.exception("Jadval vazifasi #%s ni bajarib bo'lmadi", job_id)
+    finally:
+        connection.close()
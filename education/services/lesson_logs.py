@@ -0,0 +1,242 @@
+"""
+Dars jurnali (LessonLog) yozuvlarini TimeTable asosida ommaviy yaratish.
+
+Barcha nomzod (jadval, sana, guruh) qatorlari avval xotirada quriladi:
+mavjud yozuvlar bitta so'rov bilan olingan kalitlar to'plami orqali
+tashlab ketiladi, (guruh, fan) bo'yicha o'quv reja soat limiti sanalar
+tartibida qo'llanadi, qolganlari esa bo'laklab bulk_create bilan yoziladi.
+Limitlar va mavjud soatlar ikki so'rov bilan olinadi, jadval esa hafta kuni
+bo'yicha guruhlanadi — ish hajmi kunlar × jadval emas, darslar soniga bog'liq.
+Sanalar akademik kalendar (academic_calendar.AcademicCalendar) orqali
+tanlanadi: bayramlarda jurnal yozilmaydi, ko'chirilgan ish kunlarida
+ko'rsatilgan hafta kuni jadvali ishlatiladi, har bir kurs esa faqat o'z
+SessionPeriod oynasida (sirtqi — faqat sessiya ichida) dars oladi.
+
+save_daily_logs — kunlik jurnal formasini (admin) ommaviy saqlash.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from education.models import LessonLog, Stream, TimeTable, Workload
+from education.services.academic_calendar import AcademicCalendar
+
+LESSON_HOURS = Decimal('2.00')      # Bitta para — 2 akademik soat
+DEFAULT_HOURS_LIMIT = 1000          # O'quv reja topilmasa
+
+
+class LessonLogGenerator:
+    """Bitta (o'quv yili, semestr, ta'lim shakli) jadvali bo'yicha jurnal generatori."""
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, academic_year_id, semester, education_form='kunduzgi', batch_size=None):
+        self.academic_year_id = academic_year_id
+        self.semester = semester
+        self.education_form = education_form
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.stats = {}
+
+    def fetch_timetables(self):
+        """Jadval qatorlari (guruhsiz qatorlar uchun jurnal yuritilmaydi)."""
+        return list(TimeTable.objects.filter(
+            academic_year_id=self.academic_year_id,
+            semester=self.semester,
+            education_form=self.education_form,
+            group__isnull=False,
+        ).select_related('weekday', 'stream'))
+
+    def load_plans(self, timetables):
+        """
+        Workload -> (birinchi PlanSubject soatlari, o'quv reja kursi) — bitta so'rov.
+        Birinchi PlanSubject — PlanSubject.Meta.ordering bo'yicha.
+        """
+        plans = {}
+        workload_ids = {tt.stream.workload_id for tt in timetables if tt.stream is not None}
+        rows = Workload.plan_subjects.through.objects.filter(workload_id__in=workload_ids).order_by(
+            'workload_id', 'plansubject__semester', 'plansubject__subject__name'
+        ).values_list(
+            'workload_id', 'plansubject__education_plan__course', 'plansubject__lecture_hours',
+            'plansubject__practice_hours', 'plansubject__seminar_hours', 'plansubject__lab_hours',
+        )
+        for workload_id, course, *hours in rows:
+            plans.setdefault(workload_id, (sum(hours), course))
+        return plans
+
+    @staticmethod
+    def _plan(tt, plans):
+        return plans.get(tt.stream.workload_id) if tt.stream is not None else None
+
+    def load_hours(self, timetables, plans):
+        """
+        (guruh, fan) -> o'quv reja bo'yicha jami soat va jurnaldagi mavjud soatlar.
+        Limit birinchi uchragan jadval qatori streamining rejasidan olinadi.
+        Qaytaradi: (limits, current).
+        """
+        limits = {}
+        for tt in timetables:
+            key = (tt.group_id, tt.subject_id)
+            if key not in limits:
+                plan = self._plan(tt, plans)
+                limits[key] = plan[0] if plan else DEFAULT_HOURS_LIMIT
+
+        # Jurnaldagi mavjud soatlar (bitta guruhlangan so'rov)
+        current = dict.fromkeys(limits, Decimal(0))
+        totals = LessonLog.objects.filter(
+            group_id__in={g_id for g_id, _ in limits}, subject_id__in={s_id for _, s_id in limits}
+        ).values('group_id', 'subject_id').annotate(total=Sum('hours')).values_list('group_id', 'subject_id', 'total')
+        for group_id, subject_id, total in totals:
+            if (group_id, subject_id) in current:
+                current[(group_id, subject_id)] = total or Decimal(0)
+        return limits, current
+
+    def existing_keys(self, timetables, start_date, end_date):
+        """Oraliqdagi mavjud yozuvlar kalitlari {(timetable_id, sana, group_id)} — bitta so'rov."""
+        return set(LessonLog.objects.filter(
+            timetable_id__in=[tt.id for tt in timetables],
+            date__range=(start_date, end_date),
+        ).values_list('timetable_id', 'date', 'group_id'))
+
+    def build(self, start_date, end_date):
+        """Yaratiladigan LessonLog obyektlari (sana, keyin jadval tartibida)."""
+        timetables = self.fetch_timetables()
+        if not timetables:
+            return []
+        plans = self.load_plans(timetables)
+        limits, current = self.load_hours(timetables, plans)
+        existing = self.existing_keys(timetables, start_date, end_date)
+        calendar = AcademicCalendar(self.academic_year_id, self.semester, start_date, end_date)
+
+        # (kurs, hafta kuni tartibi) -> jadval qatorlari (asl tartibda)
+        buckets = defaultdict(list)
+        for tt in timetables:
+            plan = self._plan(tt, plans)
+            buckets[(plan[1] if plan else None, tt.weekday.order)].append(tt)
+        courses = sorted({course for course, _ in buckets}, key=lambda c: (c is None, c or 0))
+
+        # [kurs, sana] -> jadval kuni (0 — dars yo'q); faqat dars bor sanalar aylanadi
+        schedule = np.stack([calendar.schedule_days(self.education_form, course) for course in courses])
+        logs = []
+        for index in np.flatnonzero(schedule.any(axis=0)):
+            day = calendar.date_at(index)
+            for row, course in enumerate(courses):
+                for tt in buckets.get((course, int(schedule[row, index])), ()):
+                    key = (tt.group_id, tt.subject_id)
+                    if current[key] + LESSON_HOURS > limits[key]:
+                        continue
+                    if (tt.id, day, tt.group_id) in existing:
+                        continue
+                    logs.append(self._new_log(tt, day))
+                    current[key] += LESSON_HOURS
+        return logs
+
+    @staticmethod
+    def _new_log(tt, day):
+        # bulk_create save() ni chaqirmaydi: LessonLog.save() to'ldiradigan maydonlar shu yerda
+        stream = tt.stream
+        return LessonLog(
+            date=day,
+            timetable=tt,
+            group_id=tt.group_id,
+            subject_id=tt.subject_id,
+            planned_teacher_id=tt.teacher_id,
+            actual_teacher_id=tt.teacher_id,
+            hours=LESSON_HOURS,
+            status='scheduled',
+            is_confirmed=False,
+            employment_type=stream.employment_type if stream else None,
+            lesson_type=stream.lesson_type if stream else None,
+        )
+
+    def run(self, start_date, end_date, dry_run=False):
+        """
+        Jurnal yozuvlarini yaratadi. Qaytaradi: haqiqatda qo'shilgan yozuvlar soni
+        (dry_run da — qo'shilishi kerak bo'lganlar). stats['attempted'] — bulk_create
+        ga berilgan qatorlar, stats['created'] — bazaga tushganlari.
+        """
+        logs = self.build(start_date, end_date)
+        created = len(logs)
+        if not dry_run and logs:
+            written = LessonLog.objects.filter(
+                timetable_id__in={log.timetable_id for log in logs}, date__range=(start_date, end_date),
+            )
+            with transaction.atomic():
+                before = written.count()
+                # Parallel generatsiya bilan to'qnashgan qatorlar jim o'tkazib yuboriladi
+                # (ignore_conflicts: bulk_create qo'shilgan qatorlar sonini bermaydi)
+                LessonLog.objects.bulk_create(logs, batch_size=self.batch_size, ignore_conflicts=True)
+                created = written.count() - before
+        self.stats = {'attempted': len(logs), 'created': created, 'batches': -(-len(logs) // self.batch_size)}
+        return created
+
+
+def save_daily_logs(day, entries):
+    """
+    Kunlik jurnal formasini saqlash (LessonLogAdmin.daily_batch_logs_view).
+    entries: [{'timetable_id', 'status', 'actual_teacher_id', 'topic'}, ...].
+    Jadval qatorlari va shu kundagi mavjud yozuvlar oldindan yuklanadi,
+    o'zgarishlar xotirada hisoblanadi va bitta bulk_create + bitta
+    bulk_update bilan yoziladi; o'zgarmagan yozuvlar tashlab ketiladi.
+    Qaytaradi: {'created', 'updated', 'unchanged'}.
+    """
+    entries = [e for e in entries if e.get('status') and str(e['timetable_id']).isdigit()]
+    ids = {int(e['timetable_id']) for e in entries}
+    timetables = TimeTable.objects.select_related('stream').in_bulk(ids)
+    existing = {}
+    for log in LessonLog.objects.filter(timetable_id__in=ids, date=day).order_by('pk'):
+        existing.setdefault(log.timetable_id, log)
+
+    # Guruhsiz jadval qatorlari uchun stream ning birinchi guruhi (kerak bo'lsagina so'rov)
+    stream_ids = {tt.stream_id for tt in timetables.values() if tt.group_id is None and tt.stream_id}
+    stream_groups = {}
+    if stream_ids:
+        for stream_id, group_id in Stream.groups.through.objects.filter(stream_id__in=stream_ids).order_by(
+                'stream_id', 'group__name').values_list('stream_id', 'group_id'):
+            stream_groups.setdefault(stream_id, group_id)
+
+    now = timezone.now()
+    to_create, to_update = [], []
+    unchanged = 0
+    for entry in entries:
+        tt = timetables.get(int(entry['timetable_id']))
+        if tt is None:
+            continue
+        log = existing.get(tt.id)
+        is_new = log is None
+        if is_new:
+            group_id = tt.group_id or stream_groups.get(tt.stream_id)
+            if not group_id:
+                continue    # Guruh topilmasa tashlab o'tamiz
+            log = LessonLog(
+                timetable=tt, date=day, group_id=group_id, subject_id=tt.subject_id, room_id=tt.room_id,
+                planned_teacher_id=tt.teacher_id, hours=LESSON_HOURS,
+                employment_type=tt.stream.employment_type if tt.stream else None,
+                lesson_type=tt.stream.lesson_type if tt.stream else None,
+            )
+
+        actual_teacher_id = int(entry['actual_teacher_id']) if entry.get('actual_teacher_id') else log.planned_teacher_id
+        status = entry['status']
+        # Agar 'held' qilingan bo'lsa va o'qituvchi boshqa bo'lsa
+        if status == 'held' and actual_teacher_id != log.planned_teacher_id:
+            status = 'replaced'
+        topic = entry.get('topic')
+
+        if is_new:
+            log.actual_teacher_id, log.status, log.topic = actual_teacher_id, status, topic
+            to_create.append(log)
+        elif (log.actual_teacher_id, log.status, log.topic or '') == (actual_teacher_id, status, topic or ''):
+            unchanged += 1
+        else:
+            log.actual_teacher_id, log.status, log.topic, log.updated_at = actual_teacher_id, status, topic, now
+            to_update.append(log)
+
+    with transaction.atomic():
+        if to_create:
+            LessonLog.objects.bulk_create(to_create)
+        if to_update:
+            LessonLog.objects.bulk_update(to_update, ['actual_teacher', 'status', 'topic', 'updated_at'])
+    return {'created': len(to_create), 'updated': len(to_update), 'unchanged': unchanged}
@@ -0,0 +1,478 @@
+import math
+import random
+import time
+from collections import defaultdict, deque
+
+
+def build_gap_table(n_slots):
+    """
+    mask -> "oyna" jarimasi (_calculate_gap_penalty bilan bir xil formula:
+    ketma-ket band slotlar orasidagi bo'shliq kvadratlari yig'indisi).
+    """
+    table = []
+    for mask in range(1 << n_slots):
+        indices = [i for i in range(n_slots) if mask >> i & 1]
+        total = 0
+        for a, b in zip(indices, indices[1:]):
+            gap = b - a - 1
+            total += gap * gap
+        table.append(total)
+    return table
+
+
+class LocalSearchOptimizer:
+    """
+    Greedy natijasini lokal qidiruv (Simulated Annealing + tabu) bilan yaxshilash.
+
+    Narx funksiyasi:
+      - joylashmagan paralar (W_UNPLACED)
+      - guruhlarning "oyna" darslari (W_GAP, _calculate_gap_penalty formulasi)
+      - kun bo'yicha muvozanat: guruh kunlik yuki kvadrati (W_BALANCE)
+      - xona mosligi: bo'sh qolgan o'rinlar (W_ROOM)
+
+    Qo'shnilar: bitta darsni boshqa (kun, slot)ga surish, bir o'qituvchining
+    ikki darsini almashtirish va joylashmagan parani joylashtirish.
+    Har bir harakat faqat ta'sirlangan (guruh, kun) hadlari bo'yicha
+    delta narx bilan baholanadi — to'liq qayta hisob yo'q.
+    Qattiq cheklovlar (bandlik, xona turi/sig'imi, smena, soatbay vaqti,
+    kunlik limit, bir kunda bitta para) hech qachon buzilmaydi.
+    """
+
+    W_UNPLACED = 1000
+    W_GAP = 10
+    W_BALANCE = 1
+    W_ROOM = 0.05
+
+    SWAP_PROBABILITY = 0.3      # Harakatlarning qanchasi almashtirish bo'ladi
+    UNPLACED_PROBABILITY = 0.5  # Joylashmagan para bo'lsa, uni tanlash ehtimoli
+    TABU_TENURE = 7             # Yaqinda surilgan darslar necha harakat davomida tegilmaydi
+    START_TEMPERATURE = 20.0
+    END_TEMPERATURE = 0.05
+    HISTORY_INTERVAL = 0.1      # best_cost tarixini yozish oralig'i (soniya)
+
+    def __init__(self, service, time_budget=10, seed=None):
+        self.service = service
+        self.time_budget = time_budget
+        self.rng = random.Random(seed)
+
+        self.n_days = len(service.weekdays)
+        self.n_slots = len(service.timeslots)
+        self.day_ids = [d.id for d in service.weekdays]
+        self.slot_ids = [s.id for s in service.timeslots]
+        self.day_pos = {d_id: i for i, d_id in enumerate(self.day_ids)}
+        self.slot_pos = {s_id: i for i, s_id in enumerate(self.slot_ids)}
+        self.room_pos = {r.id: i for i, r in enumerate(service.rooms)}
+        self.gap_table = build_gap_table(self.n_slots)
+        self.max_teacher_load = service.MAX_PAIRS_PER_DAY_TEACHER
+
+        self._load_state()
+
+    # =========================================================
+    # HOLATNI YUKLASH
+    # =========================================================
+    def _load_state(self):
+        service = self.service
+
+        # Bandlik bitmaskalari: (entity_id, day) -> slotlar maskasi
+        self.teacher_mask = defaultdict(int)
+        self.group_mask = defaultdict(int)
+        self.room_busy = defaultdict(int)  # (day, slot) -> xonalar maskasi (self.rooms indeksi)
+        for day_id, slot_id, t_id in service.matrix_teacher:
+            self.teacher_mask[(t_id, self.day_pos[day_id])] |= 1 << self.slot_pos[slot_id]
+        for day_id, slot_id, g_id in service.matrix_group:
+            self.group_mask[(g_id, self.day_pos[day_id])] |= 1 << self.slot_pos[slot_id]
+        for day_id, slot_id, r_id in service.matrix_room:
+            if r_id in self.room_pos:
+                self.room_busy[(self.day_pos[day_id], self.slot_pos[slot_id])] |= 1 << self.room_pos[r_id]
+
+        self.teacher_load = defaultdict(int)
+        for (day_id, t_id), load in service._day_load_teacher.items():
+            self.teacher_load[(t_id, self.day_pos[day_id])] = load
+
+        # Soatbay o'qituvchilar bo'sh vaqtlari: (teacher_id, day) -> slotlar maskasi
+        self.availability = defaultdict(int)
+        for t_id, day_id, slot_id in service.teacher_availability_cache:
+            if day_id in self.day_pos and slot_id in self.slot_pos:
+                self.availability[(t_id, self.day_pos[day_id])] |= 1 << self.slot_pos[slot_id]
+
+        # Streamlar va darslar (bitta dars = bitta para)
+        self.streams = []          # stream indeksi -> ma'lumot
+        self.stream_index = {}
+        self.lessons = []          # [stream_idx, day, slot, room] (day == -1 — joylashmagan)
+        self.stream_days = defaultdict(int)
+        self.teacher_lessons = defaultdict(list)
+
+        for entry in service.schedule_map:
+            si = self._register_stream(entry['stream'], entry['group_ids'], entry['student_count'])
+            d = self.day_pos[entry['weekday_id']]
+            self._add_lesson(si, d, self.slot_pos[entry['timeslot_id']], self.room_pos[entry['room_id']])
+
+        for error in service.errors:
+            stream = error.get('stream')
+            if stream is None:
+                continue
+            meta = service.get_stream_meta(stream)
+            si = self._register_stream(stream, list(meta.group_ids), meta.student_count)
+            for _ in range(error['pairs_needed'] - error['pairs_placed']):
+                self._add_lesson(si, -1, -1, -1)
+
+        self.initial = [tuple(lesson[1:]) for lesson in self.lessons]
+
+    def _register_stream(self, stream, group_ids, student_count):
+        if stream.id in self.stream_index:
+            return self.stream_index[stream.id]
+
+        service = self.service
+        allowed_slot_mask = 0
+        for idx in service.get_stream_meta(stream).slot_indices:
+            allowed_slot_mask |= 1 << idx
+
+        room_types = service.ROOM_TYPE_MAP.get(stream.lesson_type, ['practice'])
+        room_mask = 0
+        for i, room in enumerate(service.rooms):
+            if room.room_type in room_types and room.capacity >= student_count:
+                room_mask |= 1 << i
+
+        si = len(self.streams)
+        self.streams.append({
+            'stream': stream,
+            'teacher_id': stream.teacher.id,
+            'group_ids': tuple(group_ids),
+            'student_count': student_count,
+            'allowed_slot_mask': allowed_slot_mask,
+            'room_mask': room_mask,
+            'needs_availability': stream.employment_type in ('hourly', 'external_part_time'),
+        })
+        self.stream_index[stream.id] = si
+        return si
+
+    def _add_lesson(self, si, d, s, r):
+        li = len(self.lessons)
+        self.lessons.append([si, d, s, r])
+        self.teacher_lessons[self.streams[si]['teacher_id']].append(li)
+        if d >= 0:
+            self.stream_days[(si, d)] += 1
+
+    # =========================================================
+    # NARX FUNKSIYASI
+    # =========================================================
+    def _group_day_cost(self, g_id, d):
+        mask = self.group_mask.get((g_id, d), 0)
+        load = bin(mask).count('1')
+        return self.W_GAP * self.gap_table[mask] + self.W_BALANCE * load * load
+
+    def _room_cost(self, si, r):
+        if r < 0:
+            return self.W_UNPLACED
+        return self.W_ROOM * (self.service.rooms[r].capacity - self.streams[si]['student_count'])
+
+    def total_cost(self):
+        """To'liq narx (faqat boshlang'ich qiymat va tekshiruv uchun)."""
+        cost = sum(self._room_cost(si, r) for si, _, _, r in self.lessons)
+        group_ids = {g_id for info in self.streams for g_id in info['group_ids']}
+        for g_id in group_ids:
+            for d in range(self.n_days):
+                cost += self._group_day_cost(g_id, d)
+        return cost
+
+    # =========================================================
+    # BANDLIKNI O'ZGARTIRISH
+    # =========================================================
+    def _release(self, li):
+        si, d, s, r = self.lessons[li]
+        if d < 0:
+            return
+        info = self.streams[si]
+        clear = ~(1 << s)
+        self.teacher_mask[(info['teacher_id'], d)] &= clear
+        for g_id in info['group_ids']:
+            self.group_mask[(g_id, d)] &= clear
+        self.room_busy[(d, s)] &= ~(1 << r)
+        self.teacher_load[(info['teacher_id'], d)] -= 1
+        self.stream_days[(si, d)] -= 1
+
+    def _occupy(self, li, d, s, r):
+        lesson = self.lessons[li]
+        lesson[1], lesson[2], lesson[3] = d, s, r
+        if d < 0:
+            return
+        si = lesson[0]
+        info = self.streams[si]
+        bit = 1 << s
+        self.teacher_mask[(info['teacher_id'], d)] |= bit
+        for g_id in info['group_ids']:
+            self.group_mask[(g_id, d)] |= bit
+        self.room_busy[(d, s)] |= 1 << r
+        self.teacher_load[(info['teacher_id'], d)] += 1
+        self.stream_days[(si, d)] += 1
+
+    def _find_room(self, si, d, s):
+        """
+        (day, slot)ga joylash mumkin bo'lsa eng mos xona indeksini, aks holda -1 qaytaradi.
+        Xonalar sig'im bo'yicha saralangan, shuning uchun eng kichik bit — Best-Fit.
+        """
+        info = self.streams[si]
+        bit = 1 << s
+        if not info['allowed_slot_mask'] & bit:
+            return -1
+        t_id = info['teacher_id']
+        if self.teacher_mask.get((t_id, d), 0) & bit:
+            return -1
+        if info['needs_availability'] and not self.availability.get((t_id, d), 0) & bit:
+            return -1
+        if self.teacher_load.get((t_id, d), 0) >= self.max_teacher_load:
+            return -1
+        if self.stream_days.get((si, d), 0):
+            return -1
+        for g_id in info['group_ids']:
+            if self.group_mask.get((g_id, d), 0) & bit:
+                return -1
+        free = info['room_mask'] & ~self.room_busy.get((d, s), 0)
+        if not free:
+            return -1
+        return (free & -free).bit_length() - 1
+
+    # =========================================================
+    # HARAKATLAR (delta narx bilan)
+    # =========================================================
+    def _affected_cost(self, keys):
+        return sum(self._group_day_cost(g_id, d) for g_id, d in keys)
+
+    def _affected_keys(self, lesson_indices, extra_days=()):
+        keys = set()
+        for li in lesson_indices:
+            si, d, _, _ = self.lessons[li]
+            days = [d] if d >= 0 else []
+            days.extend(extra_days)
+            for g_id in self.streams[si]['group_ids']:
+                for day in days:
+                    keys.add((g_id, day))
+        return keys
+
+    def _try_move(self, li):
+        """Darsni tasodifiy (kun, slot)ga surish. Qaytaradi: (delta, undo) yoki None."""
+        si, d_old, s_old, r_old = self.lessons[li]
+        d_new = self.rng.randrange(self.n_days)
+        s_new = self.rng.randrange(self.n_slots)
+        if d_new == d_old and s_new == s_old:
+            return None
+
+        keys = self._affected_keys([li], [d_new])
+        before = self._affected_cost(keys) + self._room_cost(si, r_old)
+
+        self._release(li)
+        r_new = self._find_room(si, d_new, s_new)
+        if r_new < 0:
+            self._occupy(li, d_old, s_old, r_old)
+            return None
+        self._occupy(li, d_new, s_new, r_new)
+
+        after = self._affected_cost(keys) + self._room_cost(si, r_new)
+        return after - before, [(li, d_old, s_old, r_old)]
+
+    def _try_swap(self, li):
+        """Bir o'qituvchining ikki darsi vaqtlarini almashtirish."""
+        candidates = self.teacher_lessons[self.streams[self.lessons[li][0]]['teacher_id']]
+        if len(candidates) < 2:
+            return None
+        lj = self.rng.choice(candidates)
+        if lj == li:
+            return None
+        si, di, s_i, ri = self.lessons[li]
+        sj, dj, s_j, rj = self.lessons[lj]
+        if di < 0 or dj < 0 or (di == dj and s_i == s_j):
+            return None
+
+        keys = self._affected_keys([li, lj], [di, dj])
+        before = self._affected_cost(keys) + self._room_cost(si, ri) + self._room_cost(sj, rj)
+
+        self._release(li)
+        self._release(lj)
+
+        r_i_new = self._find_room(si, dj, s_j)
+        if r_i_new >= 0:
+            self._occupy(li, dj, s_j, r_i_new)
+            r_j_new = self._find_room(sj, di, s_i)
+            if r_j_new >= 0:
+                self._occupy(lj, di, s_i, r_j_new)
+                after = self._affected_cost(keys) + self._room_cost(si, r_i_new) + self._room_cost(sj, r_j_new)
+                return after - before, [(lj, dj, s_j, rj), (li, di, s_i, ri)]
+            self._release(li)
+
+        self._occupy(li, di, s_i, ri)
+        self._occupy(lj, dj, s_j, rj)
+        return None
+
+    def _undo(self, undo):
+        for li, _, _, _ in undo:
+            self._release(li)
+        for li, d, s, r in undo:
+            self._occupy(li, d, s, r)
+
+    # =========================================================
+    # ASOSIY SIKL
+    # =========================================================
+    def run(self):
+        started = time.perf_counter()
+        current = self.total_cost()
+        best = current
+        best_state = [tuple(lesson[1:]) for lesson in self.lessons]
+        history = [(0.0, round(best, 2))]
+        last_history_at = 0.0
+
+        iterations = accepted = 0
+        tabu = deque(maxlen=self.TABU_TENURE)
+        # Joylashmagan darslar: tasodifiy tanlash uchun ro'yxat + O(1) o'chirish uchun indeks xaritasi
+        unplaced = [li for li, lesson in enumerate(self.lessons) if lesson[1] < 0]
+        unplaced_pos = {li: pos for pos, li in enumerate(unplaced)}
+        n_lessons = len(self.lessons)
+
+        temperature_ratio = self.END_TEMPERATURE / self.START_TEMPERATURE
+        elapsed = 0.0
+        while n_lessons and elapsed < self.time_budget:
+            iterations += 1
+            if iterations % 256 == 0 or iterations == 1:
+                elapsed = time.perf_counter() - started
+                progress = min(elapsed / self.time_budget, 1.0) if self.time_budget > 0 else 1.0
+                temperature = self.START_TEMPERATURE * temperature_ratio ** progress
+                self.service._report_progress(local_search_cost=round(best, 2))
+
+            if unplaced and self.rng.random() < self.UNPLACED_PROBABILITY:
+                li = self.rng.choice(unplaced)
+            else:
+                li = self.rng.randrange(n_lessons)
+
+            if self.lessons[li][1] >= 0 and self.rng.random() < self.SWAP_PROBABILITY:
+                result = self._try_swap(li)
+            else:
+                result = self._try_move(li)
+            if result is None:
+                continue
+
+            delta, undo = result
+            is_tabu = li in tabu and current + delta >= best
+            if not is_tabu and (delta <= 0 or self.rng.random() < math.exp(-delta / temperature)):
+                accepted += 1
+                current += delta
+                tabu.append(li)
+                if undo[-1][1] < 0 and self.lessons[li][1] >= 0:
+                    # swap-pop: oxirgi element bo'shagan o'ringa ko'chiriladi
+                    pos = unplaced_pos.pop(li)
+                    last = unplaced.pop()
+                    if last != li:
+                        unplaced[pos] = last
+                        unplaced_pos[last] = pos
+                if current < best - 1e-9:
+                    best = current
+                    best_state = [tuple(lesson[1:]) for lesson in self.lessons]
+                    now = time.perf_counter() - started
+                    if now - last_history_at >= self.HISTORY_INTERVAL:
+                        history.append((round(now, 2), round(best, 2)))
+                        last_history_at = now
+            else:
+                self._undo(undo)
+
+        elapsed = time.perf_counter() - started
+        if history[-1][1] != round(best, 2):
+            history.append((round(elapsed, 2), round(best, 2)))
+
+        newly_placed = self._apply(best_state)
+        self.service.stats['local_search'] = {
+            'time_budget': self.time_budget,
+            'elapsed': round(elapsed, 2),
+            'iterations': iterations,
+            'accepted': accepted,
+            'initial_cost': history[0][1],
+            'best_cost': round(best, 2),
+            'newly_placed_pairs': newly_placed,
+            'best_cost_history': history,
+        }
+        return best
+
+    # =========================================================
+    # NATIJANI SERVISGA QAYTARISH
+    # =========================================================
+    def _apply(self, best_state):
+        """
+        Eng yaxshi holatni servis matritsalari, schedule_map, errors va
+        statistikaga yozadi. Qaytaradi: yangi joylashgan paralar soni.
+        """
+        service = self.service
+        weekdays = service.weekdays
+        timeslots = service.timeslots
+        rooms = service.rooms
+
+        # 1. O'zgargan darslarni servis bandligidan chiqarib, yangi joyga yozish.
+        # Avval hammasi bo'shatiladi, keyin yoziladi (almashtirilgan darslar bir xil katakni bo'lishadi)
+        changed = [
+            (old, new, self.streams[lesson[0]])
+            for old, new, lesson in zip(self.initial, best_state, self.lessons)
+            if old != new
+        ]
+        for (d_old, s_old, r_old), _, info in changed:
+            if d_old < 0:
+                continue
+            t_id = info['teacher_id']
+            day_id, slot_id = self.day_ids[d_old], self.slot_ids[s_old]
+            service.matrix_teacher.discard((day_id, slot_id, t_id))
+            service.matrix_room.discard((day_id, slot_id, rooms[r_old].id))
+            service._day_load_teacher[(day_id, t_id)] -= 1
+            service._mark_groups(day_id, slot_id, info['group_ids'], False)
+            for g_id in info['group_ids']:
+                service._day_load_group[(day_id, g_id)] -= 1
+        for _, (d_new, s_new, r_new), info in changed:
+            if d_new < 0:
+                continue
+            t_id = info['teacher_id']
+            day_id, slot_id = self.day_ids[d_new], self.slot_ids[s_new]
+            service.matrix_teacher.add((day_id, slot_id, t_id))
+            service.matrix_room.add((day_id, slot_id, rooms[r_new].id))
+            service._day_load_teacher[(day_id, t_id)] += 1
+            service._mark_groups(day_id, slot_id, info['group_ids'], True)
+            for g_id in info['group_ids']:
+                service._day_load_group[(day_id, g_id)] += 1
+
+        # 2. schedule_map ni qayta qurish
+        placed_count = defaultdict(int)
+        schedule_map = []
+        for (d, s, r), lesson in zip(best_state, self.lessons):
+            if d < 0:
+                continue
+            info = self.streams[lesson[0]]
+            stream = info['stream']
+            placed_count[stream.id] += 1
+            item = {'weekday': weekdays[d], 'timeslot': timeslots[s], 'room': rooms[r]}
+            schedule_map.append(service._build_entry(
+                stream, item, list(info['group_ids']), info['student_count'],
+                service.get_stream_course(stream)
+            ))
+        service._set_schedule(schedule_map)
+
+        # 3. Xatolar va statistikani yangilash
+        newly_placed = 0
+        remaining_errors = []
+        for error in service.errors:
+            stream = error.get('stream')
+            if stream is None:
+                remaining_errors.append(error)
+                continue
+            now_placed = placed_count[stream.id]
+            gained = now_placed - error['pairs_placed']
+            newly_placed += gained
+            if now_placed >= error['pairs_needed']:
+                service.stats['placed_streams'] += 1
+                service.stats['failed_streams'] -= 1
+                service.stats['per_teacher'][error['teacher']]['placed'] += 1
+                service.stats['per_teacher'][error['teacher']]['failed'] -= 1
+                for g_id in self.streams[self.stream_index[stream.id]]['group_ids']:
+                    service.stats['per_group'][g_id]['placed'] += 1
+                    service.stats['per_group'][g_id]['failed'] -= 1
+                continue
+            if gained:
+                error['pairs_placed'] = now_placed
+                error['reason'] = service._missing_detail(error['pairs_needed'] - now_placed, error['stats'])
+            remaining_errors.append(error)
+
+        service.errors = remaining_errors
+        service.stats['total_pairs_placed'] += newly_placed
+        return newly_placed
@@ -0,0 +1,164 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from education.services.local_search import LocalSearchOptimizer
+from education.services.snapshot import build_snapshot
+
+PROGRESS_WAIT = 5       # workerlarni kutishda progress necha soniyada bir yangilanadi
+
+
+def _init_worker(settings_module):
+    """spawn qilingan worker: Django ilovalarini yuklaydi (DB ulanishi ochilmaydi)."""
+    import django
+
+    if settings_module:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def run_single_generation(snapshot, options):
+    """
+    Worker: snapshot asosida bitta generatsiya (DB ga murojaat qilmaydi).
+    Natija ixcham, faqat ID lardan iborat — ota jarayonga pickle orqali qaytadi.
+    """
+    from education.services.generator import ScheduleGeneratorService
+
+    service = ScheduleGeneratorService.from_snapshot(snapshot, **options)
+    schedule_map, errors = service.generate(dry_run=True)
+
+    stats = dict(service.stats)
+    stats['fail_reasons'] = dict(stats['fail_reasons'])
+    stats['per_teacher'] = {k: dict(v) for k, v in stats['per_teacher'].items()}
+    stats['per_group'] = {k: dict(v) for k, v in stats['per_group'].items()}
+
+    return {
+        'seed': options.get('seed'),
+        'placements': [
+            (e['stream'].id, e['weekday_id'], e['timeslot_id'], e['room_id'])
+            for e in schedule_map
+        ],
+        'errors': [
+            (e['stream'].id, e['pairs_needed'], e['pairs_placed'], e['stats'])
+            for e in errors
+        ],
+        'failed_pairs': sum(e['pairs_needed'] - e['pairs_placed'] for e in errors),
+        'cost': round(LocalSearchOptimizer(service, time_budget=0).total_cost(), 2),
+        'stats': stats,
+    }
+
+
+class MultiStartRunner:
+    """
+    #12: N ta mustaqil generatsiyani ProcessPoolExecutor da parallel bajaradi.
+
+    0-urinish — oddiy (silkitilmagan) greedy, qolganlari priority tartibi va
+    teng holatlar seed bo'yicha tasodifiy silkitilgan variantlar. Eng kam
+    joylashmagan para, so'ng eng past narx (LocalSearchOptimizer.total_cost)
+    bo'yicha eng yaxshisi tanlanadi va ota servis holatiga yoziladi.
+    DB ga faqat ota jarayon yozadi (_save_to_db).
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    def _run_options(self):
+        service = self.service
+        base_seed = service.seed or 0
+        return [
+            {
+                'backend': service.backend,
+                'engine': service.engine,
+                'time_budget': service.time_budget,
+                'seed': base_seed + i,
+                'perturb': i > 0,
+                'room_assignment': service.room_assignment,
+            }
+            for i in range(service.runs)
+        ]
+
+    def run(self):
+        service = self.service
+        streams = service.fetch_streams()
+        snapshot = build_snapshot(service, streams)
+        options = self._run_options()
+
+        workers = min(service.workers or os.cpu_count() or 1, len(options))
+        if workers > 1:
+            # Servis odatda ko'p oqimli web jarayonning worker oqimida ishlaydi: fork boshqa
+            # oqimlar ushlab turgan qulflarni (logging, DB drayveri, availability keshi)
+            # bolaga ko'chirib, uni osib qo'yishi mumkin. Shuning uchun spawn — snapshot
+            # ORM'siz va pickle qilinadi, worker esa Django ni o'zi yuklaydi.
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(os.environ.get('DJANGO_SETTINGS_MODULE'),)) as pool:
+                futures = [pool.submit(run_single_generation, snapshot, o) for o in options]
+                # Kutish davomida ham progress (va u orqali vazifa heartbeat i) yangilanib turadi
+                pending = set(futures)
+                try:
+                    while pending:
+                        _, pending = wait(pending, timeout=PROGRESS_WAIT)
+                        service._report_progress(multi_start_done=len(futures) - len(pending))
+                except BaseException:
+                    # JobCancelled (yoki boshqa xato): with-blok chiqishidagi shutdown(wait=True)
+                    # workerlar tugashini kutib qolmasin — navbatdagilar bekor, ishlayotganlari tashlanadi
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+                results = [f.result() for f in futures]
+        else:
+            results = [run_single_generation(snapshot, o) for o in options]
+
+        best = min(results, key=lambda r: (r['failed_pairs'], r['cost']))
+        self._apply(best, streams)
+
+        service.stats['multi_start'] = {
+            'runs': len(results),
+            'workers': workers,
+            'best_seed': best['seed'],
+            'results': [
+                {'seed': r['seed'], 'failed_pairs': r['failed_pairs'], 'cost': r['cost']}
+                for r in results
+            ],
+        }
+        return best
+
+    def _apply(self, result, streams):
+        """Worker natijasini ORM obyektlari bilan servis holatiga yozadi."""
+        service = self.service
+        streams_by_id = {s.id: s for s in streams}
+        days = {d.id: d for d in service.weekdays}
+        slots = {s.id: s for s in service.timeslots}
+        rooms = {r.id: r for r in service.rooms}
+
+        service._set_schedule([])
+        service.errors = []
+
+        for stream_id, day_id, slot_id, room_id in result['placements']:
+            stream = streams_by_id[stream_id]
+            groups = service.get_stream_groups(stream)
+            group_ids = [g.id for g in groups]
+            service._occupy(day_id, slot_id, stream.teacher.id, room_id, group_ids)
+            item = {'weekday': days[day_id], 'timeslot': slots[slot_id], 'room': rooms[room_id]}
+            service._add_entry(service._build_entry(
+                stream, item, group_ids, service.get_stream_meta(stream).student_count,
+                service.get_stream_course(stream)
+            ))
+
+        for stream_id, pairs_needed, pairs_placed, reasons in result['errors']:
+            stream = streams_by_id[stream_id]
+            service.errors.append(service._build_error(
+                stream, service.get_stream_groups(stream), reasons, pairs_needed, pairs_placed
+            ))
+
+        stats = result['stats']
+        for key in ('total_streams', 'placed_streams', 'failed_streams', 'backtrack_attempts',
+                    'backtrack_successes', 'total_pairs_placed', 'total_pairs_needed'):
+            service.stats[key] = stats[key]
+        service.stats['fail_reasons'].update(stats['fail_reasons'])
+        for name, counts in stats['per_teacher'].items():
+            service.stats['per_teacher'][name].update(counts)
+        for g_id, counts in stats['per_group'].items():
+            service.stats['per_group'][g_id].update(counts)
+        for key in ('local_search', 'room_assignment', 'phases'):
+            if key in stats:
+                service.stats[key] = stats[key]
@@ -0,0 +1,147 @@
+import numpy as np
+
+
+class OccupancyTensor:
+    """
+    Bandlik matritsasi: [entity, day, slot] o'lchamli zich bool massiv.
+
+    `set` bilan bir xil interfeysga ega (`add`, `discard`, `in`), shuning uchun
+    generatorning `matrix_teacher` / `matrix_group` / `matrix_room` o'rnida
+    ishlatiladi. Kalit ham o'sha: (day_id, slot_id, entity_id).
+    Qo'shimcha ravishda bir kun uchun barcha slotlarni bitta vektor
+    amal bilan tekshirish imkonini beradi.
+    """
+
+    def __init__(self, day_ids, slot_ids, entity_ids=()):
+        self.day_index = {d_id: i for i, d_id in enumerate(day_ids)}
+        self.slot_index = {s_id: i for i, s_id in enumerate(slot_ids)}
+        self.entity_index = {}
+        self.data = np.zeros((max(len(entity_ids), 8), len(self.day_index), len(self.slot_index)), dtype=bool)
+        for e_id in entity_ids:
+            self.register(e_id)
+
+    def register(self, entity_id):
+        """Entity uchun qator indeksini qaytaradi (kerak bo'lsa yangisini ochadi)."""
+        idx = self.entity_index.get(entity_id)
+        if idx is not None:
+            return idx
+
+        idx = len(self.entity_index)
+        if idx >= self.data.shape[0]:
+            grown = np.zeros((self.data.shape[0] * 2,) + self.data.shape[1:], dtype=bool)
+            grown[:self.data.shape[0]] = self.data
+            self.data = grown
+        self.entity_index[entity_id] = idx
+        return idx
+
+    # --- set protokoli ---
+    def add(self, key):
+        day_id, slot_id, entity_id = key
+        # Indeks avval olinadi: register() massivni kattalashtirib, self.data ni almashtirishi mumkin
+        idx = self.register(entity_id)
+        self.data[idx, self.day_index[day_id], self.slot_index[slot_id]] = True
+
+    def discard(self, key):
+        day_id, slot_id, entity_id = key
+        idx = self.entity_index.get(entity_id)
+        if idx is None:
+            return
+        self.data[idx, self.day_index[day_id], self.slot_index[slot_id]] = False
+
+    def __contains__(self, key):
+        day_id, slot_id, entity_id = key
+        idx = self.entity_index.get(entity_id)
+        if idx is None:
+            return False
+        d_idx = self.day_index.get(day_id)
+        s_idx = self.slot_index.get(slot_id)
+        if d_idx is None or s_idx is None:
+            return False
+        return bool(self.data[idx, d_idx, s_idx])
+
+    def __len__(self):
+        return int(self.data.sum())
+
+    def __iter__(self):
+        day_ids = list(self.day_index)
+        slot_ids = list(self.slot_index)
+        entity_ids = list(self.entity_index)
+        for e_idx, d_idx, s_idx in zip(*np.nonzero(self.data[:len(entity_ids)])):
+            yield (day_ids[d_idx], slot_ids[s_idx], entity_ids[e_idx])
+
+    # --- vektor amallar ---
+    def busy_any(self, entity_ids, day_id, slot_idx):
+        """
+        Berilgan entitylardan birortasi band bo'lgan slotlar maskasi.
+        slot_idx — tekshiriladigan slot indekslari massivi.
+        """
+        rows = [self.entity_index[e_id] for e_id in entity_ids if e_id in self.entity_index]
+        if not rows:
+            return np.zeros(len(slot_idx), dtype=bool)
+        d_idx = self.day_index[day_id]
+        return self.data[rows, d_idx][:, slot_idx].any(axis=0)
+
+    def day_matrix(self, day_id, slot_idx, n_entities):
+        """Birinchi n_entities ta entity uchun [entity, slot] bandlik matritsasi."""
+        return self.data[:n_entities, self.day_index[day_id]][:, slot_idx]
+
+
+class SlotMaskIndex:
+    """
+    #26: Bandlik (kun, entity) -> band slotlar bitmaskasi ko'rinishida.
+
+    `set` protokoli va kaliti ((day_id, slot_id, entity_id)) saqlanadi, shuning
+    uchun `set` backendda `matrix_teacher` o'rnida ishlatiladi; day_mask()
+    esa kunning barcha slotlarini bitta butun son amali bilan tekshirishga
+    imkon beradi. Bit tartibi — slot_ids tartibi. Noma'lum slotlar (masalan,
+    boshqa shakl jadvalidagi eski para) alohida to'plamda saqlanadi.
+    """
+
+    def __init__(self, slot_ids):
+        self.slot_ids = list(slot_ids)
+        self.slot_pos = {s_id: i for i, s_id in enumerate(self.slot_ids)}
+        self.masks = {}         # (day_id, entity_id) -> bitmaska
+        self.extra = set()
+
+    def day_mask(self, day_id, entity_id):
+        return self.masks.get((day_id, entity_id), 0)
+
+    # --- set protokoli ---
+    def add(self, key):
+        day_id, slot_id, entity_id = key
+        pos = self.slot_pos.get(slot_id)
+        if pos is None:
+            self.extra.add(key)
+            return
+        self.masks[(day_id, entity_id)] = self.masks.get((day_id, entity_id), 0) | 1 << pos
+
+    def discard(self, key):
+        day_id, slot_id, entity_id = key
+        pos = self.slot_pos.get(slot_id)
+        if pos is None:
+            self.extra.discard(key)
+            return
+        bits = self.masks.get((day_id, entity_id), 0) & ~(1 << pos)
+        if bits:
+            self.masks[(day_id, entity_id)] = bits
+        else:
+            self.masks.pop((day_id, entity_id), None)
+
+    def __contains__(self, key):
+        day_id, slot_id, entity_id = key
+        pos = self.slot_pos.get(slot_id)
+        if pos is None:
+            return key in self.extra
+        return bool(self.masks.get((day_id, entity_id), 0) >> pos & 1)
+
+    def __len__(self):
+        return sum(bin(mask).count('1') for mask in self.masks.values()) + len(self.extra)
+
+    def __iter__(self):
+        slot_ids = self.slot_ids
+        for (day_id, entity_id), mask in list(self.masks.items()):
+            while mask:
+                low = mask & -mask
+                yield (day_id, slot_ids[low.bit_length() - 1], entity_id)
+                mask ^= low
+        yield from list(self.extra)
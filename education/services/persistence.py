@@ -0,0 +1,87 @@
+from django.db import transaction
+
+from education.models import TimeTable
+
+
+# TimeTable qatorining tabiiy kaliti va o'zgarishi mumkin bo'lgan maydonlari
+NATURAL_KEY = ('stream_id', 'group_id', 'weekday_id', 'timeslot_id')
+VALUE_FIELDS = ('room_id', 'teacher_id', 'subject_id')
+
+
+def sync_timetable(year_id, season, education_form, desired, dry_run=False, batch_size=500,
+                   prune_manual=False):
+    """
+    TimeTable ni kerakli holatga minimal o'zgarish bilan keltiradi.
+
+    desired: {(stream_id, group_id, weekday_id, timeslot_id): {'room_id', 'teacher_id', 'subject_id'}}
+    Faqat stream ga bog'langan qatorlar solishtiriladi; qo'lda kiritilganlarga
+    (stream yo'q) prune_manual=True bo'lgandagina tegiladi — ular o'chiriladi.
+    O'zgarmagan qatorlar ID si saqlanadi — LessonLog.timetable bog'lanishlari buzilmaydi.
+
+    Qaytaradi: {'inserted', 'updated', 'deleted', 'unchanged'}
+    """
+    existing = {}
+    duplicates = []
+    rows = TimeTable.objects.filter(
+        academic_year_id=year_id,
+        semester=season,
+        education_form=education_form,
+        stream__isnull=False,
+    ).values_list('id', *NATURAL_KEY, *VALUE_FIELDS)
+    for row in rows:
+        key = row[1:5]
+        if key in existing:
+            duplicates.append(row[0])
+            continue
+        existing[key] = (row[0], dict(zip(VALUE_FIELDS, row[5:])))
+
+    to_create, to_update, to_delete = [], [], list(duplicates)
+    unchanged = 0
+    for key, values in desired.items():
+        current = existing.get(key)
+        if current is None:
+            to_create.append(TimeTable(
+                academic_year_id=year_id,
+                semester=season,
+                education_form=education_form,
+                **dict(zip(NATURAL_KEY, key)),
+                **values
+            ))
+            continue
+        row_id, current_values = current
+        if all(current_values[f] == values[f] for f in VALUE_FIELDS):
+            unchanged += 1
+            continue
+        to_update.append(TimeTable(id=row_id, **values))
+
+    for key, (row_id, _) in existing.items():
+        if key not in desired:
+            to_delete.append(row_id)
+    if prune_manual:
+        to_delete.extend(TimeTable.objects.filter(
+            academic_year_id=year_id,
+            semester=season,
+            education_form=education_form,
+            stream__isnull=True,
+        ).values_list('id', flat=True))
+
+    summary = {
+        'inserted': len(to_create),
+        'updated': len(to_update),
+        'deleted': len(to_delete),
+        'unchanged': unchanged,
+    }
+    if dry_run:
+        return summary
+
+    with transaction.atomic():
+        # Avval o'chirish: bo'shagan (o'qituvchi, slot) lar unique_teacher_slot_v2 ga xalaqit bermasin
+        for i in range(0, len(to_delete), batch_size):
+            TimeTable.objects.filter(id__in=to_delete[i:i + batch_size]).delete()
+        if to_update:
+            TimeTable.objects.bulk_update(to_update, list(VALUE_FIELDS), batch_size=batch_size)
+        if to_create:
+            TimeTable.objects.bulk_create(to_create, batch_size=batch_size)
+
+    return summary
+
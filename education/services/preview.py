@@ -0,0 +1,159 @@
+"""
+Simulyatsiya natijasini qayta generatsiyasiz saqlash.
+
+Preview vazifasi natijasiga jadvalning ixcham nusxasi (stream, kun, slot,
+xona, guruhlar) va kirish ma'lumotlarining barmoq izi (fingerprint) yoziladi.
+"Saqlash" shu nusxani to'g'ridan-to'g'ri (farq bo'yicha) yozadi — faqat
+barmoq izi o'zgarmagan bo'lsa. Aks holda qaysi ma'lumotlar o'zgargani aytiladi va
+saqlash rad etiladi (ko'rilgan jadval endi haqiqiy holatga mos emas).
+"""
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count
+
+from education.models import (
+    Room, ScheduleError, ScheduleJob, SessionPeriod, Stream, SubGroup, TimeTable, Workload,
+)
+from education.services.diagnostics import build_schedule_errors
+from education.services.persistence import sync_timetable
+from kadrlar.models import TeacherAvailability, TimeSlot, Weekday
+from students.models import Student
+
+# Barmoq izi qismlari va ularning foydalanuvchiga ko'rsatiladigan nomi
+FINGERPRINT_PARTS = {
+    'streams': "Streamlar (o'qituvchi, dars turi, guruhlar)",
+    'plan': "O'quv reja soatlari",
+    'students': "Talabalar soni",
+    'rooms': "Xonalar",
+    'calendar': "Hafta kunlari, paralar va sessiya davrlari",
+    'availability': "O'qituvchilarning bo'sh vaqtlari",
+    'other_forms': "Boshqa ta'lim shakli jadvali",
+}
+
+
+class PreviewOutdated(ValueError):
+    """Simulyatsiyadan keyin kirish ma'lumotlari o'zgargan."""
+
+    def __init__(self, changed):
+        self.changed = changed
+        labels = ', '.join(FINGERPRINT_PARTS[name] for name in changed)
+        super().__init__(
+            f"Simulyatsiyadan keyin ma'lumotlar o'zgargan ({labels}). "
+            f"Jadvalni qayta simulyatsiya qiling."
+        )
+
+
+def _digest(rows):
+    return hashlib.sha256(repr(list(rows)).encode()).hexdigest()[:16]
+
+
+def input_fingerprint(year_id, season, education_form):
+    """
+    Generator natijasiga ta'sir qiluvchi ma'lumotlarning qismlar bo'yicha xeshi:
+    {qism_nomi: xesh}. ScheduleGeneratorService.fetch_streams bilan bir xil doira.
+    """
+    semesters = [1, 3, 5, 7, 9] if season == 'autumn' else [2, 4, 6, 8, 10]
+    streams = Stream.objects.filter(
+        workload__plan_subjects__education_plan__academic_year_id=year_id,
+        workload__plan_subjects__semester__in=semesters,
+        workload__plan_subjects__education_plan__education_form=education_form,
+        teacher__isnull=False
+    ).distinct()
+    stream_rows = list(streams.order_by('id').values_list(
+        'id', 'teacher_id', 'employment_type', 'lesson_type', 'workload_id', 'workload__subject_id'
+    ))
+    stream_ids = [row[0] for row in stream_rows]
+    workload_ids = {row[4] for row in stream_rows}
+    teacher_ids = {row[1] for row in stream_rows}
+
+    stream_groups = list(Stream.groups.through.objects.filter(stream_id__in=stream_ids).order_by(
+        'stream_id', 'group_id').values_list('stream_id', 'group_id'))
+    stream_sub_groups = list(Stream.sub_groups.through.objects.filter(stream_id__in=stream_ids).order_by(
+        'stream_id', 'subgroup_id').values_list('stream_id', 'subgroup_id'))
+    group_ids = {g_id for _, g_id in stream_groups}
+    group_ids.update(SubGroup.objects.filter(
+        id__in=[sg_id for _, sg_id in stream_sub_groups]).values_list('group_id', flat=True))
+
+    plan_rows = Workload.plan_subjects.through.objects.filter(workload_id__in=workload_ids).order_by(
+        'workload_id', 'plansubject_id').values_list(
+        'workload_id', 'plansubject_id', 'plansubject__semester', 'plansubject__education_plan__course',
+        'plansubject__lecture_hours', 'plansubject__practice_hours', 'plansubject__lab_hours',
+        'plansubject__seminar_hours',
+    )
+    student_rows = Student.objects.filter(group_id__in=group_ids, status='active').values(
+        'group_id').annotate(n=Count('id')).order_by('group_id').values_list('group_id', 'n')
+    subgroup_rows = SubGroup.objects.filter(group_id__in=group_ids).values(
+        'group_id').annotate(n=Count('id')).order_by('group_id').values_list('group_id', 'n')
+
+    return {
+        'streams': _digest(stream_rows + stream_groups + stream_sub_groups),
+        'plan': _digest(plan_rows),
+        'students': _digest(list(student_rows) + list(subgroup_rows)),
+        'rooms': _digest(Room.objects.filter(is_active=True).order_by('id').values_list(
+            'id', 'capacity', 'room_type')),
+        'calendar': _digest(
+            list(Weekday.objects.order_by('order').values_list('id', 'order'))
+            + list(TimeSlot.objects.order_by('start_time').values_list('id', 'start_time'))
+            + list(SessionPeriod.objects.filter(
+                academic_year_id=year_id, semester=season, education_form=education_form
+            ).order_by('course').values_list('course', 'weeks_count'))
+        ),
+        'availability': _digest(TeacherAvailability.timeslots.through.objects.filter(
+            teacheravailability__teacher_id__in=teacher_ids
+        ).order_by('teacheravailability__teacher_id', 'teacheravailability__weekday_id', 'timeslot_id').values_list(
+            'teacheravailability__teacher_id', 'teacheravailability__weekday_id', 'timeslot_id')),
+        'other_forms': _digest(TimeTable.objects.filter(
+            academic_year_id=year_id, semester=season
+        ).exclude(education_form=education_form).order_by('id').values_list(
+            'weekday_id', 'timeslot_id', 'teacher_id', 'room_id')),
+    }
+
+
+def build_snapshot(schedule_map):
+    """Jadvalning ixcham nusxasi: [stream_id, subject_id, teacher_id, kun, slot, xona, [guruhlar]]."""
+    return [
+        [
+            item['stream'].id, item['stream'].workload.subject.id, item['stream'].teacher.id,
+            item['weekday_id'], item['timeslot_id'], item['room_id'], list(item['group_ids']),
+        ]
+        for item in schedule_map
+    ]
+
+
+def commit_preview(job):
+    """
+    Preview vazifasi natijasini DB ga yozadi (generatsiyasiz).
+    Kirish ma'lumotlari o'zgargan bo'lsa PreviewOutdated ko'tariladi.
+    Qaytaradi: o'zgarishlar xulosasi {'inserted', 'updated', 'deleted', 'unchanged'}.
+    """
+    if job.kind != 'preview' or job.status != 'done' or not (job.result or {}).get('snapshot'):
+        raise ValueError("Saqlash uchun tugallangan simulyatsiya natijasi topilmadi.")
+
+    params = job.params
+    year_id, season, education_form = params['year_id'], params['season'], params.get('education_form', 'kunduzgi')
+    with transaction.atomic():
+        current = input_fingerprint(year_id, season, education_form)
+        stored = job.result['fingerprint']
+        changed = [name for name in FINGERPRINT_PARTS if current.get(name) != stored.get(name)]
+        if changed:
+            raise PreviewOutdated(changed)
+
+        desired = {}
+        for stream_id, subject_id, teacher_id, day_id, slot_id, room_id, group_ids in job.result['snapshot']:
+            for group_id in group_ids:
+                desired[(stream_id, group_id, day_id, slot_id)] = {
+                    'room_id': room_id, 'teacher_id': teacher_id, 'subject_id': subject_id,
+                }
+        summary = sync_timetable(year_id, season, education_form, desired, prune_manual=True)
+        ScheduleError.objects.filter(academic_year_id=year_id, education_form=education_form).delete()
+        ScheduleError.objects.bulk_create(build_schedule_errors(year_id, job.result.get('errors', [])))
+    return summary
+
+
+def get_preview_job(token):
+    """Token (ScheduleJob ID) bo'yicha preview vazifasi yoki None."""
+    try:
+        return ScheduleJob.objects.filter(pk=int(token), kind='preview').first()
+    except (TypeError, ValueError):
+        return None
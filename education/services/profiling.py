@@ -0,0 +1,77 @@
+"""
+#23: Jadval generatori uchun ixtiyoriy profillash.
+
+profile=True bo'lsa servis instansiyasidagi "issiq" metodlar o'lchovchi
+o'ram bilan almashtiriladi (chaqiruvlar soni va umumiy vaqt) va DB
+so'rovlari connection.execute_wrapper orqali bosqichlar bo'yicha sanaladi.
+profile=False bo'lsa hech narsa o'ralmaydi — qo'shimcha xarajat yo'q.
+Vaqtlar inklyuziv: ichki chaqiruvlar (masalan, backtracking ichidagi
+find_best_slot) tashqi metod vaqtiga ham kiradi.
+"""
+import functools
+import time
+from collections import defaultdict
+
+# O'lchanadigan servis metodlari
+PROFILED_METHODS = (
+    'fetch_streams',
+    'find_best_slot',
+    '_gap_penalties',
+    '_lookup_room',
+    '_check_slots_vectorized',
+    '_try_backtrack',
+)
+
+
+class GeneratorProfiler:
+    """Metod taymerlari, chaqiruv hisoblagichlari va bosqichlar bo'yicha SQL so'rovlar."""
+
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self.queries = 0
+        self.phase_queries = defaultdict(int)
+
+    def instrument(self, service, names=PROFILED_METHODS):
+        """Servis instansiyasidagi metodlarni o'lchovchi o'ram bilan almashtiradi."""
+        for name in names:
+            setattr(service, name, self._wrap(name, getattr(service, name)))
+
+    def _wrap(self, name, func):
+        calls, seconds = self.calls, self.seconds
+        clock = time.perf_counter
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds[name] += clock() - start
+                calls[name] += 1
+        return wrapper
+
+    def count_query(self, execute, sql, params, many, context):
+        """connection.execute_wrapper uchun: har bir SQL so'rovni sanaydi."""
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def report(self):
+        """stats['profile'] ko'rinishi."""
+        return {
+            'methods': {
+                name: {'calls': self.calls[name], 'seconds': round(self.seconds[name], 4)}
+                for name in sorted(self.calls, key=lambda n: -self.seconds[n])
+            },
+            'queries': self.queries,
+            'phase_queries': dict(self.phase_queries),
+        }
+
+    def log(self, logger, label, phases):
+        """Profilni logger ga yozadi (bir nechta INFO qatori)."""
+        report = self.report()
+        logger.info("%s: %d SQL so'rov, bosqichlar: %s", label, report['queries'], ', '.join(
+            f"{name}={seconds:.3f}s/{report['phase_queries'].get(name, 0)}q" for name, seconds in phases.items()
+        ))
+        for name, values in report['methods'].items():
+            logger.info("  %-26s %9d chaqiruv %10.4f s", name, values['calls'], values['seconds'])
@@ -0,0 +1,216 @@
+"""
+#22: Dars jadvali sifatini baholash.
+
+Jadval bitta jadvalga — har bir guruh darsi uchun (guruh, kun, slot,
+o'qituvchi, xona, talabalar) qatoriga — keltiriladi. Undan [obyekt, kun, slot]
+bandlik tensorlari quriladi va barcha ko'rsatkichlar NumPy amallari bilan
+bir yo'la hisoblanadi: guruh va o'qituvchi "oyna"lari, kunlik yuklama
+dispersiyasi, kechki slotlar, xonalardagi bo'sh o'rinlar va o'qituvchining
+kunlik para chegarasi (MAX_PAIRS_PER_DAY_TEACHER).
+Manba — yangi generatsiya (ScheduleGeneratorService) yoki DB dagi TimeTable.
+"""
+import numpy as np
+from django.db.models import Count
+
+from education.models import Stream, TimeTable
+from students.models import Student
+
+# Qator ustunlari
+GROUP, DAY, SLOT, TEACHER, ROOM, STUDENTS = range(6)
+
+
+def _positions(values, ordered_ids):
+    """values dagi ID larning ordered_ids dagi o'rni (topilmasa -1)."""
+    ordered = np.asarray(ordered_ids, dtype=np.int64)
+    if not len(ordered):
+        return np.full(len(values), -1, dtype=np.int64)
+    order = np.argsort(ordered, kind='stable')
+    sorted_ids = ordered[order]
+    pos = np.clip(np.searchsorted(sorted_ids, values), 0, len(sorted_ids) - 1)
+    return np.where(sorted_ids[pos] == values, order[pos], -1)
+
+
+def _windows(occupancy):
+    """
+    [obyekt, kun, slot] bandlikdagi "oyna"lar: birinchi va oxirgi dars orasidagi
+    bo'sh slotlar. Qaytaradi: (jami oynalar, oynasi bor (obyekt, kun) lar soni).
+    """
+    slots = occupancy.shape[2]
+    counts = occupancy.sum(axis=2)
+    first = occupancy.argmax(axis=2)
+    last = slots - 1 - occupancy[:, :, ::-1].argmax(axis=2)
+    gaps = np.where(counts > 0, last - first + 1 - counts, 0)
+    return int(gaps.sum()), int((gaps > 0).sum())
+
+
+def _day_load_variance(occupancy):
+    """Har bir obyektning kunlik paralar dispersiyasi (o'rtachasi, faqat darsi bor obyektlar)."""
+    loads = occupancy.sum(axis=2)
+    active = loads.sum(axis=1) > 0
+    if not active.any():
+        return 0.0
+    return round(float(loads[active].var(axis=1).mean()), 3)
+
+
+class ScheduleQuality:
+    """
+    Jadval sifati hisoboti. score() ko'rsatkichlar lug'atini va ularning
+    og'irlikli yig'indisini ('penalty', kichigi yaxshi) qaytaradi.
+    """
+
+    LATE_SLOT_INDEX = 4     # 5-paradan boshlab "kechki" slot
+    WEIGHTS = {
+        'group_gaps': 10,
+        'teacher_gaps': 3,
+        'group_day_load_variance': 5,
+        'late_pairs': 1,
+        'wasted_seat_ratio': 100,
+        'over_capacity': 20,
+        'teacher_day_excess': 20,
+    }
+
+    def __init__(self, rows, day_ids, slot_ids, room_capacities, max_pairs_per_day_teacher=4):
+        """
+        rows: (n, 6) int massiv — guruh, kun, slot, o'qituvchi, xona (0 — xonasiz), talabalar.
+        Bitta darsning talabalari xona bandligida (o'qituvchi, kun, slot, xona) bo'yicha yig'iladi.
+        room_capacities: {room_id: sig'im}.
+        """
+        self.rows = np.asarray(rows, dtype=np.int64).reshape(-1, 6)
+        self.day_ids = list(day_ids)
+        self.slot_ids = list(slot_ids)
+        self.room_capacities = room_capacities
+        self.max_pairs_per_day_teacher = max_pairs_per_day_teacher
+
+    @classmethod
+    def from_service(cls, service):
+        """Generatsiya natijasi (service.schedule_map) bo'yicha."""
+        # Stream talabalari birinchi guruh qatoriga yoziladi (dars bo'yicha yig'indi to'g'ri chiqadi)
+        rows = [
+            (group_id, item['weekday_id'], item['timeslot_id'], item['stream'].teacher.id,
+             item['room_id'] or 0, item['student_count'] if i == 0 else 0)
+            for item in service.schedule_map
+            for i, group_id in enumerate(item['group_ids'])
+        ]
+        return cls(
+            rows,
+            [d.id for d in service.weekdays],
+            [s.id for s in service.timeslots],
+            {r.id: r.capacity for r in service.rooms},
+            service.MAX_PAIRS_PER_DAY_TEACHER,
+        )
+
+    @classmethod
+    def from_timetable(cls, year_id, season, education_forms=('kunduzgi',), max_pairs_per_day_teacher=None):
+        """
+        DB dagi TimeTable bo'yicha. Talabalar soni from_service dagi bilan bir xil
+        hisoblanadi: stream darsi uchun get_stream_student_count (kichik guruh —
+        guruh ulushi), streamsiz qator uchun guruhning aktiv talabalari.
+        """
+        from education.services.generator import ScheduleGeneratorService
+
+        if isinstance(education_forms, str):
+            education_forms = (education_forms,)
+        service = ScheduleGeneratorService(year_id, season, education_forms=education_forms)
+
+        # None (guruhsiz / xonasiz / streamsiz) float massivda NaN bo'ladi -> 0
+        data = np.array(list(TimeTable.objects.filter(
+            academic_year_id=year_id, semester=season, education_form__in=education_forms,
+        ).values_list('group_id', 'weekday_id', 'timeslot_id', 'teacher_id', 'room_id', 'stream_id')), dtype=float)
+        data = np.nan_to_num(data.reshape(-1, 6)).astype(np.int64)
+        data, stream_col = data[:, :5], data[:, 5]
+
+        streams = list(Stream.objects.filter(id__in=np.unique(stream_col[stream_col > 0]).tolist())
+                       .prefetch_related('groups', 'sub_groups'))
+        service._preload_student_counts(streams)
+        stream_counts = {s.id: service.get_stream_student_count(s) for s in streams}
+
+        loose = set(data[(stream_col == 0) & (data[:, GROUP] > 0), GROUP].tolist())
+        missing = loose - service._student_count_cache.keys()
+        if missing:
+            found = dict(
+                Student.objects.filter(group_id__in=missing, status='active')
+                .values_list('group_id').annotate(n=Count('id')).values_list('group_id', 'n')
+            )
+            service._student_count_cache.update({g_id: found.get(g_id, 0) for g_id in missing})
+        group_counts = {g_id: service._student_count_cache[g_id] for g_id in loose}
+
+        def lookup(values, counts):
+            ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            totals = np.append(np.fromiter(counts.values(), dtype=np.int64, count=len(counts)), 0)
+            return totals[_positions(values, ids)]
+
+        row_students = np.where(stream_col > 0, lookup(stream_col, stream_counts), lookup(data[:, GROUP], group_counts))
+        # Bitta dars (stream yoki streamsiz guruh, kun, slot, o'qituvchi) talabalari bir marta olinadi
+        lesson_group = np.where(stream_col > 0, 0, data[:, GROUP])
+        _, first = np.unique(np.column_stack([stream_col, lesson_group, data[:, [DAY, SLOT, TEACHER]]]),
+                             axis=0, return_index=True)
+        students = np.zeros(len(data), dtype=np.int64)
+        students[first] = row_students[first]
+
+        return cls(
+            np.column_stack([data, students]),
+            [d.id for d in service.weekdays],
+            [s.id for s in service.timeslots],
+            {r.id: r.capacity for r in service.rooms},
+            max_pairs_per_day_teacher or service.MAX_PAIRS_PER_DAY_TEACHER,
+        )
+
+    def _occupancy(self, entity_ids, day_idx, slot_idx):
+        """[obyekt, kun, slot] bool tensor."""
+        _, entity_idx = np.unique(entity_ids, return_inverse=True)
+        size = int(entity_idx.max()) + 1 if len(entity_idx) else 0
+        occupancy = np.zeros((size, len(self.day_ids), len(self.slot_ids)), dtype=bool)
+        occupancy[entity_idx, day_idx, slot_idx] = True
+        return occupancy
+
+    def score(self):
+        day_idx = _positions(self.rows[:, DAY], self.day_ids)
+        slot_idx = _positions(self.rows[:, SLOT], self.slot_ids)
+        known = (day_idx >= 0) & (slot_idx >= 0)
+        rows, day_idx, slot_idx = self.rows[known], day_idx[known], slot_idx[known]
+
+        # --- Guruhlar ---
+        has_group = rows[:, GROUP] > 0
+        groups = self._occupancy(rows[has_group, GROUP], day_idx[has_group], slot_idx[has_group])
+        group_gaps, group_gap_days = _windows(groups)
+        group_pairs = int(groups.sum())
+        late_pairs = int(groups[:, :, self.LATE_SLOT_INDEX:].sum())
+
+        # --- Darslar: (o'qituvchi, kun, slot, xona) bo'yicha, talabalar yig'indisi ---
+        keys = np.column_stack([rows[:, TEACHER], day_idx, slot_idx, rows[:, ROOM]])
+        lessons, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        lesson_students = np.bincount(inverse, weights=rows[:, STUDENTS], minlength=len(lessons))
+
+        teachers = self._occupancy(lessons[:, 0], lessons[:, 1], lessons[:, 2])
+        teacher_gaps, teacher_gap_days = _windows(teachers)
+        excess = np.clip(teachers.sum(axis=2) - self.max_pairs_per_day_teacher, 0, None)
+
+        # --- Xonalar ---
+        room_ids = np.fromiter(self.room_capacities.keys(), dtype=np.int64, count=len(self.room_capacities))
+        capacities = np.fromiter(self.room_capacities.values(), dtype=np.int64, count=len(self.room_capacities))
+        room_pos = _positions(lessons[:, 3], room_ids)
+        in_room = room_pos >= 0
+        seats = capacities[room_pos[in_room]]
+        students = lesson_students[in_room]
+        wasted = np.clip(seats - students, 0, None)
+
+        metrics = {
+            'lessons': int(len(lessons)),
+            'group_pairs': group_pairs,
+            'group_gaps': group_gaps,
+            'group_days_with_gaps': group_gap_days,
+            'teacher_gaps': teacher_gaps,
+            'teacher_days_with_gaps': teacher_gap_days,
+            'group_day_load_variance': _day_load_variance(groups),
+            'teacher_day_load_variance': _day_load_variance(teachers),
+            'late_pairs': late_pairs,
+            'late_share': round(late_pairs / group_pairs, 3) if group_pairs else 0.0,
+            'wasted_seats': int(wasted.sum()),
+            'wasted_seat_ratio': round(float(wasted.sum() / seats.sum()), 3) if seats.sum() else 0.0,
+            'over_capacity': int((students > seats).sum()),
+            'teacher_day_overloads': int((excess > 0).sum()),
+            'teacher_day_excess': int(excess.sum()),
+        }
+        metrics['penalty'] = round(sum(weight * metrics[name] for name, weight in self.WEIGHTS.items()), 2)
+        return metrics
@@ -0,0 +1,214 @@
+import time
+from collections import defaultdict
+
+from django.db import transaction
+
+from education.models import TimeTable, Room, ScheduleError
+from education.services.diagnostics import build_schedule_errors
+from education.services.persistence import sync_timetable
+
+
+class ScheduleRepairer:
+    """
+    #13: Mavjud jadvalni to'liq qayta generatsiya qilmasdan "tuzatish".
+
+    Joriy TimeTable o'zgarmas bandlik sifatida yuklanadi. Faqat o'zgarish
+    ta'sir qilgan joylashuvlar (stream, kun, slot) chiqarib tashlanadi:
+    - stream endi mavjud emas / o'qituvchisi yoki guruhlari o'zgargan;
+    - xona o'chirilgan, aktiv emas, turi yoki sig'imi mos emas;
+    - soatbay o'qituvchi uchun slot TeacherAvailability dan chiqib ketgan;
+    - stream_ids da ko'rsatilgan streamlar (majburiy qayta joylash);
+    - o'quv reja soati kamaygan streamning calculate_pairs dan ortiq paralari.
+    So'ng yetishmayotgan paralar oddiy find_best_slot bilan joylanadi va
+    DB ga faqat farq (insert/update/delete) yoziladi — qolgan qatorlar ID si saqlanadi.
+    Shu tranzaksiyada (yil, shakl) bo'yicha ScheduleError yozuvlari yangi holat
+    bilan almashtiriladi (_save_to_db va commit_preview kabi).
+
+    teacher_ids / room_ids / stream_ids berilsa, tekshiruv faqat shularga
+    tegishli joylashuvlar bilan cheklanadi; hech biri berilmasa — butun jadval.
+    """
+
+    def __init__(self, service, stream_ids=None, teacher_ids=None, room_ids=None):
+        self.service = service
+        self.stream_ids = set(stream_ids or ())
+        self.teacher_ids = set(teacher_ids or ())
+        self.room_ids = set(room_ids or ())
+        self.scoped = bool(self.stream_ids or self.teacher_ids or self.room_ids)
+
+    def _in_scope(self, stream_id, teacher_id, room_id):
+        if not self.scoped:
+            return True
+        return (
+            stream_id in self.stream_ids
+            or teacher_id in self.teacher_ids
+            or room_id in self.room_ids
+        )
+
+    def _load_rows(self):
+        service = self.service
+        return list(TimeTable.objects.filter(
+            academic_year_id=service.year_id,
+            semester=service.season,
+            education_form=service.education_form,
+        ).values_list(
+            'stream_id', 'group_id', 'weekday_id', 'timeslot_id',
+            'room_id', 'teacher_id', 'subject_id'
+        ))
+
+    def _is_affected(self, stream, room, rows, day_id, slot_id):
+        """Joylashuv hozirgi ma'lumotlarga zid bo'lsa True."""
+        service = self.service
+        # Bunday holatlar har doim tuzatiladi: joylashuvni umuman saqlab bo'lmaydi
+        if stream is None or room is None or not room.is_active:
+            return True
+
+        teacher_id = rows[0][5]
+        if not self._in_scope(stream.id, teacher_id, room.id):
+            return False
+        if stream.id in self.stream_ids:
+            return True
+
+        if any(row[5] != stream.teacher_id for row in rows):
+            return True
+        groups = service.get_stream_groups(stream)
+        if {row[1] for row in rows} != {g.id for g in groups}:
+            return True
+
+        allowed_room_types = service.ROOM_TYPE_MAP.get(stream.lesson_type, ['practice'])
+        if room.room_type not in allowed_room_types:
+            return True
+        if room.capacity < service.get_stream_meta(stream).student_count:
+            return True
+
+        if stream.employment_type in ('hourly', 'external_part_time'):
+            if (stream.teacher_id, day_id, slot_id) not in service.teacher_availability_cache:
+                return True
+        return False
+
+    def run(self, dry_run=True):
+        service = self.service
+        start = time.perf_counter()
+
+        streams = {s.id: s for s in service.fetch_streams()}
+        days = {d.id: d for d in service.weekdays}
+        slots = {s.id: s for s in service.timeslots}
+        rows = self._load_rows()
+        rooms = Room.objects.in_bulk({row[4] for row in rows if row[4]})
+
+        # (stream, kun, slot) -> shu joylashuvning guruh qatorlari
+        placements = defaultdict(list)
+        for row in rows:
+            stream_id, group_id, day_id, slot_id, room_id, teacher_id, _ = row
+            if stream_id is None:
+                # Qo'lda kiritilgan dars: faqat bandlik sifatida hisobga olinadi
+                service.matrix_teacher.add((day_id, slot_id, teacher_id))
+                service._mark_groups(day_id, slot_id, (group_id,), True)
+                if room_id:
+                    service.matrix_room.add((day_id, slot_id, room_id))
+                continue
+            placements[(stream_id, day_id, slot_id)].append(row)
+
+        service._set_schedule([])
+        service.errors = []
+        desired = {}
+        kept_pairs = defaultdict(int)
+        evicted = surplus = 0
+        evicted_streams = set()
+
+        # Kun va para tartibida: ortiqcha paralar haftaning oxiridan olib tashlanadi
+        day_pos = {d.id: i for i, d in enumerate(service.weekdays)}
+        ordered = sorted(placements.items(), key=lambda item: (
+            item[0][0], day_pos.get(item[0][1], len(day_pos)), service._slot_pos.get(item[0][2], len(slots))
+        ))
+        for (stream_id, day_id, slot_id), p_rows in ordered:
+            stream = streams.get(stream_id)
+            room = rooms.get(p_rows[0][4])
+            if self._is_affected(stream, room, p_rows, day_id, slot_id):
+                evicted += 1
+                evicted_streams.add(stream_id)
+                continue
+            if (kept_pairs[stream_id] >= service.calculate_pairs(stream)
+                    and self._in_scope(stream_id, p_rows[0][5], room.id)):
+                surplus += 1
+                continue
+
+            group_ids = [row[1] for row in p_rows]
+            service._occupy(day_id, slot_id, p_rows[0][5], room.id, group_ids)
+            item = {'weekday': days[day_id], 'timeslot': slots[slot_id], 'room': room}
+            service._add_entry(service._build_entry(
+                stream, item, group_ids,
+                service.get_stream_meta(stream).student_count,
+                service.get_stream_course(stream)
+            ))
+            kept_pairs[stream_id] += 1
+            for row in p_rows:
+                desired[row[:4]] = {'room_id': row[4], 'teacher_id': row[5], 'subject_id': row[6]}
+
+        # Yetishmayotgan paralarni oddiy slot qidiruvi bilan joylash (backtracking yo'q:
+        # ta'sir qilinmagan joylashuvlar surilmasligi kerak)
+        to_place = [
+            s for s in streams.values()
+            if (s.id in evicted_streams or self._in_scope(s.id, s.teacher_id, None))
+            and service.calculate_pairs(s) > kept_pairs[s.id]
+        ]
+        placed_pairs = 0
+        failed_pairs = 0
+        for stream in service.sort_streams_by_priority(to_place):
+            pairs_needed = service.calculate_pairs(stream)
+            missing = pairs_needed - kept_pairs[stream.id]
+            groups = service.get_stream_groups(stream)
+            group_ids = [g.id for g in groups]
+            student_count = service.get_stream_meta(stream).student_count
+
+            allocated, reasons = service.find_best_slot(stream, groups, missing, student_count)
+            course_level = service.get_stream_course(stream)
+            for item in allocated:
+                service._add_entry(service._build_entry(
+                    stream, item, group_ids, student_count, course_level
+                ))
+                for g_id in group_ids:
+                    desired[(stream.id, g_id, item['weekday'].id, item['timeslot'].id)] = {
+                        'room_id': item['room'].id,
+                        'teacher_id': stream.teacher_id,
+                        'subject_id': stream.workload.subject_id,
+                    }
+            placed_pairs += len(allocated)
+
+            if len(allocated) < missing:
+                failed_pairs += missing - len(allocated)
+                service.errors.append(service._build_error(
+                    stream, groups, reasons, pairs_needed, kept_pairs[stream.id] + len(allocated)
+                ))
+
+        # Qamrovdan tashqarida qolgan, hali ham to'liq joylashmagan streamlar ham xato sifatida qoladi
+        attempted = {s.id for s in to_place}
+        for stream in streams.values():
+            pairs_needed = service.calculate_pairs(stream)
+            if stream.id not in attempted and kept_pairs[stream.id] < pairs_needed:
+                service.errors.append(service._build_error(
+                    stream, service.get_stream_groups(stream), {}, pairs_needed, kept_pairs[stream.id]
+                ))
+        service._diagnose()
+
+        with transaction.atomic():
+            diff = sync_timetable(
+                service.year_id, service.season, service.education_form, desired, dry_run=dry_run
+            )
+            if not dry_run:
+                ScheduleError.objects.filter(
+                    academic_year_id=service.year_id, education_form=service.education_form
+                ).delete()
+                ScheduleError.objects.bulk_create(build_schedule_errors(
+                    service.year_id, [service.serialize_error(e) for e in service.errors]
+                ))
+
+        service.stats['repair'] = {
+            'evicted_placements': evicted,
+            'surplus_placements': surplus,
+            'kept_placements': sum(kept_pairs.values()),
+            'placed_pairs': placed_pairs,
+            'failed_pairs': failed_pairs,
+            'elapsed': round(time.perf_counter() - start, 3),
+            **diff,
+        }
+        return service.stats['repair']
@@ -0,0 +1,242 @@
+import time
+from collections import Counter, defaultdict
+
+
+# Mos kelmaydigan (xona, dars) juftligi narxi: har qanday bo'sh o'rin yig'indisidan katta
+INFEASIBLE = 10 ** 7
+
+
+def min_cost_assignment(cost):
+    """
+    To'rtburchak narx matritsasi uchun Venger algoritmi (n qator <= m ustun).
+    Qaytaradi: har bir qator uchun ustun indeksi. O(n^2 * m).
+    """
+    n = len(cost)
+    if n == 0:
+        return []
+    m = len(cost[0])
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [float('inf')] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            delta = float('inf')
+            j1 = 0
+            for j in range(1, m + 1):
+                if used[j]:
+                    continue
+                cur = row[j - 1] - u[i0] - v[j]
+                if cur < minv[j]:
+                    minv[j] = cur
+                    way[j] = j0
+                if minv[j] < delta:
+                    delta = minv[j]
+                    j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    result = [-1] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            result[p[j] - 1] = j - 1
+    return result
+
+
+class RoomAssigner:
+    """
+    #17: Ikki bosqichli generatsiyaning 2-bosqichi — vaqtlar qotirilgandan
+    keyin har bir (kun, slot) katagi uchun xonalarni qaytadan taqsimlash.
+
+    Katakdagi darslar x mos xonalar (ROOM_TYPE_MAP + sig'im) bo'yicha
+    minimal narxli tayinlash (Venger algoritmi) yechiladi: narx — bo'sh
+    qolgan o'rinlar soni. Boshqa shakl/qo'lda kiritilgan darslar band qilgan
+    xonalarga tegilmaydi. Xona topilmagan darslar jadvaldan olinib xato
+    sifatida qaytariladi.
+
+    So'ng greedy bosqichda joylashmay qolgan paralar (asosan room_busy)
+    bo'shagan katta xonalar hisobiga yana bir bor find_best_slot bilan
+    joylashtirishga urinib ko'riladi.
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    def _blocked_rooms(self):
+        """(kun, slot) -> schedule_map dan tashqari sabablar bilan band xonalar."""
+        service = self.service
+        own = Counter((e['weekday_id'], e['timeslot_id'], e['room_id']) for e in service.schedule_map)
+        blocked = defaultdict(set)
+        for day_id, slot_id, room_id in service.matrix_room:
+            if not own[(day_id, slot_id, room_id)]:
+                blocked[(day_id, slot_id)].add(room_id)
+        return blocked
+
+    def _assign_cell(self, entries, rooms):
+        """Bitta katak uchun: har bir yozuvga xona (yoki None)."""
+        service = self.service
+        # Har bir dars uchun alohida "xonasiz" ustun: n <= m har doim bajariladi
+        width = len(rooms) + len(entries)
+        cost = []
+        for entry in entries:
+            allowed = service.get_stream_meta(entry['stream']).room_types
+            row = [INFEASIBLE] * width
+            for j, room in enumerate(rooms):
+                if room.room_type in allowed and room.capacity >= entry['student_count']:
+                    row[j] = room.capacity - entry['student_count']
+            cost.append(row)
+
+        assigned = []
+        for col in min_cost_assignment(cost):
+            if col < len(rooms) and cost[len(assigned)][col] < INFEASIBLE:
+                assigned.append(rooms[col])
+            else:
+                assigned.append(None)
+        return assigned
+
+    def run(self):
+        service = self.service
+        start = time.perf_counter()
+        placed_before = len(service.schedule_map)
+
+        blocked = self._blocked_rooms()
+        cells = defaultdict(list)
+        for entry in service.schedule_map:
+            cells[(entry['weekday_id'], entry['timeslot_id'])].append(entry)
+
+        wasted_before = sum(e['room'].capacity - e['student_count'] for e in service.schedule_map)
+        reassigned = 0
+        lost = []
+
+        for (day_id, slot_id), entries in cells.items():
+            rooms = [r for r in service.rooms if r.id not in blocked[(day_id, slot_id)]]
+            assigned = self._assign_cell(entries, rooms)
+
+            for entry in entries:
+                service.matrix_room.discard((day_id, slot_id, entry['room_id']))
+            for entry, room in zip(entries, assigned):
+                if room is None:
+                    lost.append(entry)
+                    continue
+                if room.id != entry['room_id']:
+                    reassigned += 1
+                    entry['room'], entry['room_id'], entry['room_name'] = room, room.id, room.name
+                service.matrix_room.add((day_id, slot_id, room.id))
+
+        # Xona topilmagan darslarni jadvaldan chiqarish
+        lost_ids = {id(e) for e in lost}
+        for entry in lost:
+            stream = entry['stream']
+            day_id, slot_id = entry['weekday_id'], entry['timeslot_id']
+            teacher_id = stream.teacher.id
+            service.matrix_teacher.discard((day_id, slot_id, teacher_id))
+            service._day_load_teacher[(day_id, teacher_id)] -= 1
+            service._mark_groups(day_id, slot_id, entry['group_ids'], False)
+            for g_id in entry['group_ids']:
+                service._day_load_group[(day_id, g_id)] -= 1
+        if lost:
+            service._set_schedule(e for e in service.schedule_map if id(e) not in lost_ids)
+            for entry in service._placement_history:
+                entry[3][:] = [e for e in entry[3] if id(e) not in lost_ids]
+
+        wasted_after = sum(e['room'].capacity - e['student_count'] for e in service.schedule_map)
+        retried = self._retry_failed({e['stream'].id: e['stream'] for e in lost}, len(lost))
+
+        service.stats['room_assignment'] = {
+            'cells': len(cells),
+            'reassigned': reassigned,
+            'unassigned': len(lost),
+            'unassigned_placements': [
+                {'stream': str(e['stream'].name), 'weekday_id': e['weekday_id'], 'timeslot_id': e['timeslot_id']}
+                for e in lost
+            ],
+            'wasted_seats_before': wasted_before,
+            'wasted_seats_after': wasted_after,
+            'retried_pairs': retried,
+            'elapsed': round(time.perf_counter() - start, 4),
+        }
+        service.stats['total_pairs_placed'] += len(service.schedule_map) - placed_before
+        return service.stats['room_assignment']
+
+    def _retry_failed(self, lost_streams, lost_count):
+        """
+        Joylashmagan paralarni xonalar optimallashgandan keyin qayta joylash,
+        so'ng xatolar va statistikani yangi holatga moslash.
+        """
+        service = self.service
+        errors_by_stream = {e['stream'].id: e for e in service.errors if e.get('stream') is not None}
+        streams = dict(lost_streams)
+        streams.update({s_id: e['stream'] for s_id, e in errors_by_stream.items()})
+
+        placed = Counter({s_id: len(service.get_stream_entries(s_id)) for s_id in streams})
+        retried = 0
+        for stream in service.sort_streams_by_priority(list(streams.values())):
+            meta = service.get_stream_meta(stream)
+            missing = meta.pairs_needed - placed[stream.id]
+            if missing <= 0:
+                continue
+            groups = service.get_stream_groups(stream)
+            allocated, reasons = service.find_best_slot(stream, groups, missing, meta.student_count)
+            for item in allocated:
+                service._add_entry(service._build_entry(
+                    stream, item, list(meta.group_ids), meta.student_count, meta.course
+                ))
+            placed[stream.id] += len(allocated)
+            retried += len(allocated)
+
+            error = errors_by_stream.get(stream.id)
+            if error is None and placed[stream.id] < meta.pairs_needed:
+                # Oldin to'liq joylashgan stream endi xonasiz qoldi
+                self._move_stream_stats(stream, meta, to_placed=False)
+                service.errors.append(service._build_error(
+                    stream, groups, reasons or {'room_busy': lost_count}, meta.pairs_needed, placed[stream.id]
+                ))
+
+        remaining = []
+        for error in service.errors:
+            stream = error.get('stream')
+            if stream is None:
+                remaining.append(error)
+                continue
+            meta = service.get_stream_meta(stream)
+            if placed[stream.id] >= meta.pairs_needed:
+                if stream.id in errors_by_stream:
+                    self._move_stream_stats(stream, meta, to_placed=True)
+                continue
+            if error['pairs_placed'] != placed[stream.id]:
+                error['pairs_placed'] = placed[stream.id]
+                error['reason'] = service._missing_detail(meta.pairs_needed - placed[stream.id], error['stats'])
+            remaining.append(error)
+        service.errors = remaining
+        return retried
+
+    def _move_stream_stats(self, stream, meta, to_placed):
+        stats = self.service.stats
+        sign = 1 if to_placed else -1
+        teacher = str(stream.teacher)
+        stats['placed_streams'] += sign
+        stats['failed_streams'] -= sign
+        stats['per_teacher'][teacher]['placed'] += sign
+        stats['per_teacher'][teacher]['failed'] -= sign
+        for g_id in meta.group_ids:
+            stats['per_group'][g_id]['placed'] += sign
+            stats['per_group'][g_id]['failed'] -= sign
@@ -0,0 +1,98 @@
+from bisect import bisect_left
+
+
+class RoomIndex:
+    """
+    Xonalar indeksi: turi bo'yicha bitmask, sig'im bo'yicha saralangan ro'yxat
+    va har bir (kun, slot) uchun band xonalar bitmapi.
+
+    Xonalar sig'im bo'yicha saralanadi (bit i == self.rooms[i]), shuning
+    uchun "eng kichik mos bo'sh xona" — mos va bo'sh xonalar maskasining
+    eng kichik bit'i. Sig'im chegarasi bisect bilan topiladi,
+    barcha xonalar bo'ylab Python sikli yo'q.
+
+    `set` bilan bir xil interfeysga ega ((day_id, slot_id, room_id) kalitlari),
+    shuning uchun generatorning `matrix_room` o'rnida ishlatiladi. Indeksda
+    yo'q xonalar (masalan, boshqa shakl jadvalidagi nofaol xona) alohida
+    to'plamda saqlanadi.
+    """
+
+    def __init__(self, rooms):
+        # Barqaror saralash: bir xil sig'imli xonalar berilgan tartibda qoladi
+        self.rooms = sorted(rooms, key=lambda r: r.capacity)
+        self.capacities = [r.capacity for r in self.rooms]
+
+        self.position = {r.id: i for i, r in enumerate(self.rooms)}
+        self.type_mask = {}
+        for i, room in enumerate(self.rooms):
+            self.type_mask[room.room_type] = self.type_mask.get(room.room_type, 0) | (1 << i)
+
+        self.all_mask = (1 << len(self.rooms)) - 1
+        self.busy = {}          # (day_id, slot_id) -> band xonalar bitmapi
+        self.extra = set()      # indeksdan tashqari xonalar bandligi
+        self._fit_cache = {}
+
+    def fit_mask(self, student_count, room_types):
+        """Turi mos va sig'imi yetarli xonalar maskasi."""
+        key = (student_count, tuple(room_types))
+        mask = self._fit_cache.get(key)
+        if mask is None:
+            type_bits = 0
+            for room_type in room_types:
+                type_bits |= self.type_mask.get(room_type, 0)
+            first = bisect_left(self.capacities, student_count)
+            mask = type_bits & (self.all_mask >> first << first)
+            self._fit_cache[key] = mask
+        return mask
+
+    def find(self, day_id, slot_id, student_count, room_types):
+        """
+        Eng kichik mos bo'sh xona.
+        Qaytaradi: (room, None) yoki (None, 'room_busy' | 'room_capacity').
+        """
+        fit = self.fit_mask(student_count, room_types)
+        if not fit:
+            return None, 'room_capacity'
+        free = fit & ~self.busy.get((day_id, slot_id), 0)
+        if not free:
+            return None, 'room_busy'
+        return self.rooms[(free & -free).bit_length() - 1], None
+
+    # --- set protokoli ---
+    def add(self, key):
+        day_id, slot_id, room_id = key
+        pos = self.position.get(room_id)
+        if pos is None:
+            self.extra.add(key)
+            return
+        self.busy[(day_id, slot_id)] = self.busy.get((day_id, slot_id), 0) | (1 << pos)
+
+    def discard(self, key):
+        day_id, slot_id, room_id = key
+        pos = self.position.get(room_id)
+        if pos is None:
+            self.extra.discard(key)
+            return
+        bits = self.busy.get((day_id, slot_id), 0) & ~(1 << pos)
+        if bits:
+            self.busy[(day_id, slot_id)] = bits
+        else:
+            self.busy.pop((day_id, slot_id), None)
+
+    def __contains__(self, key):
+        day_id, slot_id, room_id = key
+        pos = self.position.get(room_id)
+        if pos is None:
+            return key in self.extra
+        return bool(self.busy.get((day_id, slot_id), 0) >> pos & 1)
+
+    def __len__(self):
+        return sum(bin(bits).count('1') for bits in self.busy.values()) + len(self.extra)
+
+    def __iter__(self):
+        for (day_id, slot_id), bits in self.busy.items():
+            while bits:
+                low = bits & -bits
+                yield (day_id, slot_id, self.rooms[low.bit_length() - 1].id)
+                bits ^= low
+        yield from self.extra
@@ -0,0 +1,153 @@
+"""
+#12: Generator uchun ORM'siz, pickle qilinadigan ma'lumotlar nusxasi.
+
+Multi-start workerlari DB ga murojaat qilmasligi uchun barcha kerakli
+ma'lumotlar (streamlar, xonalar, slotlar, bo'sh vaqtlar, boshqa shakl
+bandligi) ota jarayonda bir marta yig'iladi. Record obyektlari generator
+foydalanadigan ORM atributlari bilan bir xil nomlarga ega.
+"""
+
+
+class Record:
+    """__slots__ asosidagi oddiy ma'lumot obyekti."""
+    __slots__ = ()
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name))
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[:2])
+        return f"{type(self).__name__}({fields})"
+
+
+class FrozenRecord(Record):
+    """Yaratilgandan keyin o'zgartirib bo'lmaydigan Record."""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError(f"{type(self).__name__}.{name} o'zgarmas")
+        super().__setattr__(name, value)
+
+
+class DayRecord(Record):
+    __slots__ = ('id', 'name', 'order')
+
+    def __str__(self):
+        return self.name
+
+
+class SlotRecord(Record):
+    __slots__ = ('id', 'index', 'start_time', 'end_time')
+
+
+class RoomRecord(Record):
+    __slots__ = ('id', 'name', 'capacity', 'room_type')
+
+
+class GroupRecord(Record):
+    __slots__ = ('id', 'name')
+
+
+class TeacherRecord(Record):
+    __slots__ = ('id', 'name')
+
+    def __str__(self):
+        return self.name
+
+
+class SubjectRecord(Record):
+    __slots__ = ('id', 'name')
+
+
+class WorkloadRecord(Record):
+    __slots__ = ('id', 'subject')
+
+
+class StreamRecord(Record):
+    __slots__ = (
+        'id', 'name', 'teacher', 'teacher_id', 'employment_type', 'lesson_type', 'lesson_type_display',
+        'group_count', 'workload', 'groups', 'course', 'pairs_needed', 'student_count', 'education_form',
+    )
+
+    def get_lesson_type_display(self):
+        return self.lesson_type_display
+
+
+class StreamMeta(FrozenRecord):
+    """
+    #14: Generatsiya davomida kerak bo'ladigan stream ma'lumotlari (bir marta hisoblanadi).
+    Slotlar self.timeslots dagi butun indekslar, guruh/o'qituvchi — ID lar.
+    """
+    __slots__ = (
+        'stream_id', 'teacher_id', 'employment_type', 'is_hourly', 'course', 'pairs_needed',
+        'group_ids', 'student_count', 'slots', 'slot_indices', 'room_types', 'priority',
+    )
+
+
+class ScheduleSnapshot(Record):
+    __slots__ = (
+        'year_id', 'season', 'education_form', 'education_forms', 'shift1_levels', 'shift2_levels', 'params',
+        'weekdays', 'timeslots', 'rooms', 'availability', 'session_weeks', 'student_counts',
+        'teacher_busy', 'room_busy', 'streams',
+    )
+
+
+# Worker servisiga ko'chiriladigan (instansiyada o'zgartirilishi mumkin bo'lgan) parametrlar
+SNAPSHOT_PARAMS = (
+    'HOURS_PER_PAIR', 'MAX_PAIRS_PER_DAY_TEACHER', 'MAX_BACKTRACK_ATTEMPTS', 'BACKTRACK_WINDOW', 'BACKTRACK_DEPTH',
+)
+
+
+def build_snapshot(service, streams):
+    """
+    Servis holati (generatsiyadan oldin) va streamlardan ScheduleSnapshot yasaydi.
+    Bu yerda DB so'rovlari bo'lishi mumkin — faqat ota jarayonda chaqiriladi.
+    """
+    records = []
+    for stream in streams:
+        groups = service.get_stream_groups(stream)
+        service.get_student_count(groups)  # Keshni to'ldirish
+        subject = stream.workload.subject
+        records.append(StreamRecord(
+            id=stream.id,
+            name=stream.name,
+            teacher=TeacherRecord(id=stream.teacher.id, name=str(stream.teacher)),
+            teacher_id=stream.teacher.id,
+            employment_type=stream.employment_type,
+            lesson_type=stream.lesson_type,
+            lesson_type_display=stream.get_lesson_type_display(),
+            group_count=getattr(stream, 'group_count', len(groups)),
+            workload=WorkloadRecord(id=stream.workload_id, subject=SubjectRecord(id=subject.id, name=subject.name)),
+            groups=tuple(GroupRecord(id=g.id, name=g.name) for g in groups),
+            course=service.get_stream_course(stream),
+            pairs_needed=service.calculate_pairs(stream),
+            student_count=service.get_stream_student_count(stream),
+            education_form=service.get_stream_form(stream),
+        ))
+
+    return ScheduleSnapshot(
+        year_id=service.year_id,
+        season=service.season,
+        education_form=service.education_form,
+        education_forms=tuple(service.education_forms),
+        shift1_levels=list(service.shift1_levels),
+        shift2_levels=list(service.shift2_levels),
+        params={name: getattr(service, name) for name in SNAPSHOT_PARAMS},
+        weekdays=tuple(DayRecord(id=d.id, name=d.name, order=d.order) for d in service.weekdays),
+        timeslots=tuple(
+            SlotRecord(id=s.id, index=s.index, start_time=s.start_time, end_time=s.end_time)
+            for s in service.timeslots
+        ),
+        rooms=tuple(
+            RoomRecord(id=r.id, name=r.name, capacity=r.capacity, room_type=r.room_type)
+            for r in service.rooms
+        ),
+        availability=service.teacher_availability_cache,
+        session_weeks=dict(service.session_weeks_cache),
+        student_counts=dict(service._student_count_cache),
+        teacher_busy=tuple(service.matrix_teacher),
+        room_busy=tuple(service.matrix_room),
+        streams=tuple(records),
+    )
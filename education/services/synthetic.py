@@ -0,0 +1,204 @@
+"""
+Benchmark va yuklama testlari uchun sintetik (soxta) ta'lim muassasasi.
+
+Bir xil `scale` va `seed` bilan har doim bir xil tuzilma yaratiladi:
+yo'nalishlar, guruhlar va talabalar, o'quv rejalar (EducationPlan /
+PlanSubject), yuklamalar (Workload), streamlar, o'qituvchilar va ularning
+bo'sh vaqtlari (TeacherAvailability), xonalar hamda hafta kunlari va
+vaqt slotlari. Barcha nomlar `SYN<seed>` prefiksi bilan boshlanadi,
+shuning uchun haqiqiy ma'lumotlar bilan to'qnashmaydi.
+"""
+import datetime
+import math
+import random
+from collections import Counter
+
+from django.db import transaction
+
+from education.models import EducationPlan, PlanSubject, Room, SessionPeriod, Stream, Workload
+from kadrlar.models import Department, Employee, Teacher, TeacherAvailability, TimeSlot, Weekday
+from students.models import AcademicYear, Group, Specialty, Student, Subject
+
+
+# Masshtab: yo'nalishlar soni, har bir kurs uchun guruhlar, semestrdagi fanlar
+SCALES = {
+    'tiny': {'specialties': 1, 'groups_per_course': 2, 'subjects_per_semester': 2, 'courses': 2},
+    'small': {'specialties': 2, 'groups_per_course': 2, 'subjects_per_semester': 3, 'courses': 4},
+    'medium': {'specialties': 5, 'groups_per_course': 3, 'subjects_per_semester': 4, 'courses': 4},
+    'large': {'specialties': 12, 'groups_per_course': 3, 'subjects_per_semester': 5, 'courses': 4},
+}
+
+WEEKDAY_NAMES = ['Dushanba', 'Seshanba', 'Chorshanba', 'Payshanba', 'Juma', 'Shanba']
+TIMESLOT_TIMES = [
+    ('08:00', '09:20'), ('09:30', '10:50'), ('11:00', '12:20'),
+    ('13:00', '14:20'), ('14:30', '15:50'), ('16:00', '17:20'),
+]
+
+WEEKS_COUNT = 15
+STREAMS_PER_TEACHER = 6         # O'qituvchiga o'rtacha nechta stream
+HOURLY_TEACHER_SHARE = 0.2      # Soatbay o'qituvchilar ulushi
+LAB_SHARE = 0.3                 # Laboratoriyasi bor fanlar ulushi
+PAIRS_PER_ROOM = 20             # Bitta xonaga haftasiga mo'ljallangan paralar
+
+
+def _ensure_calendar():
+    """Hafta kunlari va vaqt slotlari (mavjud bo'lsa o'zgartirilmaydi)."""
+    for order, name in enumerate(WEEKDAY_NAMES, start=1):
+        Weekday.objects.get_or_create(order=order, defaults={'name': name})
+    for index, (start, end) in enumerate(TIMESLOT_TIMES, start=1):
+        TimeSlot.objects.get_or_create(index=index, defaults={'start_time': start, 'end_time': end})
+    return list(Weekday.objects.order_by('order')), list(TimeSlot.objects.filter(is_active=True).order_by('index'))
+
+
+@transaction.atomic
+def build_synthetic_dataset(scale='small', seed=0, education_form='kunduzgi', education_forms=None, factor=1):
+    """
+    Sintetik muassasani yaratadi va qisqa hisobot qaytaradi:
+    {'prefix', 'year_id', 'counts': {model_nomi: soni}}.
+    education_forms berilsa har bir shakl uchun alohida yo'nalishlar yaratiladi,
+    o'qituvchilar va xonalar esa umumiy bo'ladi. factor — yo'nalishlar soni
+    (demak streamlar, o'qituvchilar va xonalar ham) necha barobar ko'paytiriladi.
+    """
+    if scale not in SCALES:
+        raise ValueError(f"Noma'lum masshtab: {scale}. Mumkin: {', '.join(SCALES)}")
+    config = SCALES[scale]
+    forms = tuple(dict.fromkeys(education_forms or (education_form,)))
+    rng = random.Random(seed)
+    prefix = f"SYN{seed}"
+
+    year_name = (f"{prefix}-{scale}" + (f"x{factor}" if factor > 1 else ""))[:20]
+    if AcademicYear.objects.filter(name=year_name).exists():
+        raise ValueError(f"'{year_name}' o'quv yili allaqachon mavjud (boshqa seed tanlang)")
+
+    counts = Counter()
+    weekdays, timeslots = _ensure_calendar()
+    year = AcademicYear.objects.create(name=year_name, is_active=False)
+    department = Department.objects.create(name=f"{prefix} kafedrasi")
+    courses = range(1, config['courses'] + 1)
+
+    for education_form in forms:
+        for course in courses:
+            for season in ('autumn', 'spring'):
+                SessionPeriod.objects.create(
+                    academic_year=year, semester=season, education_form=education_form, course=course,
+                    start_date=datetime.date(2024, 9, 2) if season == 'autumn' else datetime.date(2025, 2, 3),
+                    end_date=datetime.date(2024, 12, 20) if season == 'autumn' else datetime.date(2025, 5, 23),
+                    weeks_count=WEEKS_COUNT,
+                )
+
+    # --- Yo'nalishlar, guruhlar, talabalar ---
+    plan_groups = []  # [(plan, [group, ...]), ...]
+    students = []
+    specialty_keys = [
+        # Bir nechta shakl bo'lsa nomlarga shakl harfi qo'shiladi (K1, S1, ...)
+        (education_form, f"{education_form[0].upper() if len(forms) > 1 else ''}{s_idx + 1}")
+        for education_form in forms for s_idx in range(config['specialties'] * max(int(factor), 1))
+    ]
+    for education_form, key in specialty_keys:
+        specialty = Specialty.objects.create(name=f"{prefix} Yo'nalish {key}", code=f"{prefix}-{key}")
+        counts['specialties'] += 1
+        for course in courses:
+            plan = EducationPlan.objects.create(
+                specialty=specialty, academic_year=year, education_form=education_form, course=course
+            )
+            groups = [
+                Group.objects.create(name=f"{prefix}-{key}{course}{g_idx + 1}", specialty=specialty)
+                for g_idx in range(config['groups_per_course'])
+            ]
+            for group in groups:
+                for _ in range(rng.randint(15, 30)):
+                    n = len(students) + 1
+                    students.append(Student(
+                        full_name=f"{prefix} Talaba {n}",
+                        student_hemis_id=f"{prefix}-{n}",
+                        gender='erkak' if rng.random() < 0.5 else 'ayol',
+                        phone_number=f"+998{n:09d}",
+                        passport_series_number=f"{prefix}-{n}",
+                        personal_pin=f"9{seed % 1000:03d}{n:010d}",
+                        address="Sintetik manzil",
+                        passport_issued_by="Sintetik IIB",
+                        education_form=education_form,
+                        course_year=course,
+                        group=group,
+                        status='active',
+                    ))
+            plan_groups.append((plan, groups))
+    Student.objects.bulk_create(students, batch_size=1000)
+    counts['education_plans'] = len(plan_groups)
+    counts['groups'] = sum(len(groups) for _, groups in plan_groups)
+    counts['students'] = len(students)
+
+    # --- O'quv reja fanlari va streamlar (o'qituvchisiz) ---
+    stream_specs = []  # [(workload, name, lesson_type, groups, semester), ...]
+    for plan, groups in plan_groups:
+        for semester in (plan.course * 2 - 1, plan.course * 2):
+            for _ in range(config['subjects_per_semester']):
+                counts['subjects'] += 1
+                subject = Subject.objects.create(name=f"{prefix} Fan {counts['subjects']}")
+                lab_hours = 30 if rng.random() < LAB_SHARE else 0
+                plan_subject = PlanSubject.objects.create(
+                    education_plan=plan, subject=subject, semester=semester, credit=rng.choice([4, 5, 6]),
+                    lecture_hours=30, practice_hours=rng.choice([30, 60]), lab_hours=lab_hours,
+                )
+                workload = Workload.objects.create(subject=subject)
+                workload.plan_subjects.add(plan_subject)
+                workload.groups.add(*groups)
+                counts['plan_subjects'] += 1
+
+                stream_specs.append((workload, f"{subject.name} ma'ruza", 'lecture', groups, semester))
+                for group in groups:
+                    stream_specs.append((workload, f"{subject.name} {group.name}", 'practice', [group], semester))
+                    if lab_hours:
+                        stream_specs.append((workload, f"{subject.name} {group.name} lab", 'lab', [group], semester))
+    counts['workloads'] = counts['plan_subjects']
+
+    # --- O'qituvchilar va bo'sh vaqtlari ---
+    teacher_count = max(2, math.ceil(len(stream_specs) / STREAMS_PER_TEACHER))
+    teachers = []
+    hourly = set()
+    for t_idx in range(teacher_count):
+        is_hourly = rng.random() < HOURLY_TEACHER_SHARE
+        employee = Employee.objects.create(
+            first_name=f"O'qituvchi {t_idx + 1}", last_name=prefix, gender='male',
+            passport_info=f"{prefix}-{t_idx + 1}"[:20], pid=f"{prefix}-PID-{t_idx + 1}",
+            department=department, status='active',
+        )
+        teacher = Teacher.objects.create(
+            employee=employee, work_type_permanent=not is_hourly, work_type_hourly=is_hourly
+        )
+        teachers.append(teacher)
+        if is_hourly:
+            hourly.add(teacher.id)
+            for weekday in rng.sample(weekdays, min(3, len(weekdays))):
+                availability = TeacherAvailability.objects.create(teacher=teacher, weekday=weekday)
+                availability.timeslots.set(rng.sample(timeslots, min(4, len(timeslots))))
+                counts['teacher_availabilities'] += 1
+    counts['teachers'] = len(teachers)
+
+    pairs = Counter()
+    for workload, name, lesson_type, groups, semester in stream_specs:
+        teacher = rng.choice(teachers)
+        stream = Stream.objects.create(
+            workload=workload, name=name[:255], teacher=teacher, lesson_type=lesson_type,
+            employment_type='hourly' if teacher.id in hourly else 'permanent',
+        )
+        stream.groups.set(groups)
+        if semester % 2:
+            pairs[lesson_type] += 1
+    counts['streams'] = len(stream_specs)
+
+    # --- Xonalar (bitta semestr yuklamasiga mos) ---
+    max_lecture = config['groups_per_course'] * 30
+    room_plan = [
+        ('lecture', pairs['lecture'], lambda: rng.choice([max_lecture, max_lecture + 30])),
+        ('practice', pairs['practice'] * 1.5, lambda: rng.randint(30, 40)),
+        ('lab', pairs['lab'], lambda: rng.choice([30, 35])),
+    ]
+    rooms = []
+    for room_type, weekly_pairs, capacity in room_plan:
+        for r_idx in range(math.ceil(weekly_pairs / PAIRS_PER_ROOM) + 1):
+            rooms.append(Room(name=f"{prefix}-{room_type}-{r_idx + 1}", capacity=capacity(), room_type=room_type))
+    Room.objects.bulk_create(rooms)
+    counts['rooms'] = len(rooms)
+
+    return {'prefix': prefix, 'year_id': year.id, 'counts': dict(counts)}
@@ -0,0 +1,52 @@
+class UndoTrail:
+    """
+    Trail asosidagi bekor qilish jurnali.
+
+    Har bir o'zgarish o'zining teskari amali bilan yoziladi; checkpoint()
+    jurnal uzunligini belgilaydi, rollback(to) esa shu belgigacha bo'lgan
+    amallarni teskari tartibda bajaradi — narxi faqat o'zgarishlar soniga
+    bog'liq. Jurnal faqat ochiq checkpoint bo'lgandagina yoziladi, shuning
+    uchun oddiy (backtracking'siz) joylashtirishda qo'shimcha xarajat yo'q.
+    """
+
+    def __init__(self):
+        self._ops = []
+        self._marks = []
+
+    @property
+    def active(self):
+        return bool(self._marks)
+
+    def record(self, undo, *args):
+        if self._marks:
+            self._ops.append((undo, args))
+
+    def checkpoint(self):
+        mark = len(self._ops)
+        self._marks.append(mark)
+        return mark
+
+    def rollback(self, to):
+        """`to` belgisidan keyingi barcha o'zgarishlarni bekor qiladi va checkpointni yopadi."""
+        ops = self._ops
+        while len(ops) > to:
+            undo, args = ops.pop()
+            undo(*args)
+        self._close(to)
+
+    def commit(self, to):
+        """O'zgarishlarni saqlab checkpointni yopadi (tashqi checkpoint uchun jurnal qoladi)."""
+        self._close(to)
+        if not self._marks:
+            self._ops.clear()
+
+    def _close(self, to):
+        # Ichki (yopilmay qolgan) checkpointlar ham yopiladi; bir xil belgili
+        # tashqi checkpoint saqlanib qoladi
+        while self._marks and self._marks[-1] > to:
+            self._marks.pop()
+        if self._marks and self._marks[-1] == to:
+            self._marks.pop()
+
+    def __len__(self):
+        return len(self._ops)
@@ -0,0 +1,19 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from education.services.availability import invalidate_teacher_availability
+from kadrlar.models import TeacherAvailability
+
+
+@receiver(post_save, sender=TeacherAvailability)
+@receiver(post_delete, sender=TeacherAvailability)
+def teacher_availability_changed(sender, **kwargs):
+    """#26: O'qituvchi bo'sh vaqti o'zgarsa bitset keshini bekor qilish."""
+    invalidate_teacher_availability()
+
+
+@receiver(m2m_changed, sender=TeacherAvailability.timeslots.through)
+def teacher_availability_slots_changed(sender, action, **kwargs):
+    """#26: Bo'sh vaqt paralari qo'shilsa/olib tashlansa bitset keshini bekor qilish."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_teacher_availability()
@@ -3,6 +3,7 @@ education app uchun Unit testlari.
 Testlar: EducationPlan, PlanSubject, Room, Workload, SessionPeriod modellari.
 """
 import datetime
+from collections import defaultdict
 
 from django.test import TestCase
 from django.core.exceptions import ValidationError
@@ -265,11 +266,13 @@ class SessionPeriodModelTest(EducationBaseSetup):
 # 🧠 SCHEDULE GENERATOR SERVICE TESTLARI
 # =============================================================================
 from django.contrib.auth import get_user_model
+from django.urls import reverse
 from kadrlar.models import (
     Department, Employee, Position, Teacher,
     Weekday, TimeSlot, TeacherAvailability,
 )
-from education.models import Stream, TimeTable
+from education.models import ScheduleError, Stream, TimeTable
+from education.services.availability import get_teacher_availability, invalidate_teacher_availability
 from education.services.generator import ScheduleGeneratorService
 from students.models import Student
 
@@ -418,7 +421,7 @@ class ScheduleGeneratorBaseSetup(TestCase):
 
         return workload, stream
 
-    def _create_service(self):
+    def _create_service(self, **kwargs):
         """Yangi generator service yaratish."""
         return ScheduleGeneratorService(
             year_id=self.academic_year.id,
@@ -426,8 +429,13 @@ class ScheduleGeneratorBaseSetup(TestCase):
             shift1_levels=[1, 4],
             shift2_levels=[2, 3],
             education_form='kunduzgi',
+            **kwargs
         )
 
+    def tearDown(self):
+        # #26: Test tranzaksiyasi bekor qilinganda signal yuborilmaydi — bo'sh vaqt keshi tozalanadi
+        invalidate_teacher_availability()
+
 
 class CalculatePairsTest(ScheduleGeneratorBaseSetup):
     """#7: calculate_pairs metodi testlari."""
@@ -579,7 +587,7 @@ class GapPenaltyTest(ScheduleGeneratorBaseSetup):
         """Ketma-ket darslar uchun gap penalty 0 bo'lishi kerak."""
         service = self._create_service()
         # slot1 band (index 0)
-        service.matrix_group.add((self.mon.id, self.slot1.id, self.group1.id))
+        service._mark_groups(self.mon.id, self.slot1.id, [self.group1.id], True)
         # slot2 ni qo'shsak (index 1) — ketma-ket, gap yo'q
         penalty = service._calculate_gap_penalty(
             self.mon.id, self.slot2, [self.group1.id]
@@ -590,7 +598,7 @@ class GapPenaltyTest(ScheduleGeneratorBaseSetup):
         """Oraliqda bo'shliq bo'lsa penalty > 0."""
         service = self._create_service()
         # slot1 band (index 0)
-        service.matrix_group.add((self.mon.id, self.slot1.id, self.group1.id))
+        service._mark_groups(self.mon.id, self.slot1.id, [self.group1.id], True)
         # slot3 ni qo'shsak (index 2) — slot2 bo'sh, 1 gap
         penalty = service._calculate_gap_penalty(
             self.mon.id, self.slot3, [self.group1.id]
@@ -691,3 +699,1495 @@ class FullGenerationTest(ScheduleGeneratorBaseSetup):
         service.MAX_PAIRS_PER_DAY_TEACHER = 6
         self.assertEqual(service.MAX_PAIRS_PER_DAY_TEACHER, 6)
 
+
+
+class OccupancyBackendTest(ScheduleGeneratorBaseSetup):
+    """#10: 'set' va 'numpy' bandlik backendlari bir xil natija berishi kerak."""
+
+    def _create_streams(self):
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1, self.group2],
+            self.teacher1, 'lecture',
+        )
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1],
+            self.teacher2, 'practice',
+        )
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group2],
+            self.teacher1, 'practice',
+        )
+        hourly = Teacher.objects.create(
+            employee=Employee.objects.create(
+                first_name="Soat", last_name="Bayev", gender='male',
+                passport_info="CC3333333", pid="33333333333333",
+                department=self.department, status='active',
+            ),
+            work_type_hourly=True,
+        )
+        availability = TeacherAvailability.objects.create(teacher=hourly, weekday=self.wed)
+        availability.timeslots.add(self.slot2, self.slot3)
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1],
+            hourly, 'practice', employment_type='hourly',
+        )
+
+    @staticmethod
+    def _signature(schedule_map):
+        return sorted(
+            (item['stream'].id, item['weekday_id'], item['timeslot_id'], item['room_id'])
+            for item in schedule_map
+        )
+
+    def test_unknown_backend_rejected(self):
+        with self.assertRaises(ValueError):
+            self._create_service(backend='gpu')
+
+    def test_same_placements(self):
+        self._create_streams()
+        set_service = self._create_service(backend='set')
+        set_schedule, set_errors = set_service.generate(dry_run=True)
+        np_service = self._create_service(backend='numpy')
+        np_schedule, np_errors = np_service.generate(dry_run=True)
+
+        self.assertGreater(len(set_schedule), 0)
+        self.assertEqual(self._signature(set_schedule), self._signature(np_schedule))
+        self.assertEqual(len(set_errors), len(np_errors))
+        self.assertEqual(set_service.get_stats_summary(), np_service.get_stats_summary())
+
+    def test_numpy_best_fit_skips_busy_room(self):
+        service = self._create_service(backend='numpy')
+        service.matrix_room.add((self.mon.id, self.slot1.id, self.room_small.id))
+        self.assertIn((self.mon.id, self.slot1.id, self.room_small.id), service.matrix_room)
+        room = service._find_best_fit_room(self.mon.id, self.slot1.id, 25, ['practice'])
+        self.assertEqual(room.id, self.room_medium.id)
+
+    def test_numpy_loads_cross_form_conflicts(self):
+        TimeTable.objects.create(
+            academic_year=self.academic_year, semester='autumn', education_form='sirtqi',
+            weekday=self.mon, timeslot=self.slot1, subject=self.subject1,
+            teacher=self.teacher1, group=self.group1,
+        )
+        service = self._create_service(backend='numpy')
+        self.assertIn((self.mon.id, self.slot1.id, self.teacher1.id), service.matrix_teacher)
+        self.assertNotIn((self.mon.id, self.slot2.id, self.teacher1.id), service.matrix_teacher)
+
+    def test_tensor_growth_keeps_new_entity(self):
+        from education.services.occupancy import OccupancyTensor
+
+        tensor = OccupancyTensor([self.mon.id], [self.slot1.id])
+        for entity_id in range(1, 20):
+            tensor.add((self.mon.id, self.slot1.id, entity_id))
+        self.assertEqual(len(tensor), 19)
+        self.assertIn((self.mon.id, self.slot1.id, 9), tensor)
+
+
+class LocalSearchTest(ScheduleGeneratorBaseSetup):
+    """#11: Lokal qidiruv (Simulated Annealing + tabu) testlari."""
+
+    def setUp(self):
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1, self.group2],
+            self.teacher1, 'lecture',
+        )
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1],
+            self.teacher2, 'practice',
+        )
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group2],
+            self.teacher1, 'practice',
+        )
+
+    def test_unknown_engine_rejected(self):
+        with self.assertRaises(ValueError):
+            self._create_service(engine='genetic')
+
+    def test_cost_not_worse_and_no_conflicts(self):
+        service = self._create_service(engine='local_search', time_budget=0.3, seed=1)
+        schedule, errors = service.generate(dry_run=True)
+        summary = service.get_stats_summary()
+
+        ls = summary['local_search']
+        self.assertLessEqual(ls['best_cost'], ls['initial_cost'])
+        self.assertGreater(ls['iterations'], 0)
+        self.assertEqual(ls['best_cost_history'][0][1], ls['initial_cost'])
+        self.assertEqual(len(schedule), summary['total_pairs_placed'])
+
+        teacher_slots = [(e['weekday_id'], e['timeslot_id'], e['stream'].teacher_id) for e in schedule]
+        room_slots = [(e['weekday_id'], e['timeslot_id'], e['room_id']) for e in schedule]
+        group_slots = [(e['weekday_id'], e['timeslot_id'], g) for e in schedule for g in e['group_ids']]
+        self.assertEqual(len(teacher_slots), len(set(teacher_slots)))
+        self.assertEqual(len(room_slots), len(set(room_slots)))
+        self.assertEqual(len(group_slots), len(set(group_slots)))
+
+    def test_incremental_cost_matches_full_recompute(self):
+        """Delta bilan hisoblangan eng yaxshi narx to'liq qayta hisobga teng bo'lishi kerak."""
+        from education.services.local_search import LocalSearchOptimizer
+
+        service = self._create_service(backend='numpy')
+        service.generate(dry_run=True)
+        best = LocalSearchOptimizer(service, time_budget=0.3, seed=7).run()
+
+        recomputed = LocalSearchOptimizer(service, time_budget=0).total_cost()
+        self.assertAlmostEqual(best, recomputed, places=6)
+        for e in service.schedule_map:
+            self.assertIn((e['weekday_id'], e['timeslot_id'], e['room_id']), service.matrix_room)
+
+
+class MultiStartTest(ScheduleGeneratorBaseSetup):
+    """#12: Multi-start (parallel) generatsiya testlari."""
+
+    def setUp(self):
+        # Bir guruhli streamlar: unique_teacher_slot_v2 bir o'qituvchi-slotga bitta qator ruxsat beradi
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1],
+            self.teacher1, 'lecture',
+        )
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1],
+            self.teacher2, 'practice',
+        )
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group2],
+            self.teacher1, 'practice',
+        )
+
+    def test_snapshot_service_does_not_touch_db(self):
+        from education.services.snapshot import build_snapshot
+
+        service = self._create_service()
+        snapshot = build_snapshot(service, service.fetch_streams())
+        with self.assertNumQueries(0):
+            worker = ScheduleGeneratorService.from_snapshot(snapshot, seed=3, perturb=True)
+            schedule, _ = worker.generate(dry_run=True)
+        self.assertGreater(len(schedule), 0)
+
+    def test_unperturbed_snapshot_matches_greedy(self):
+        from education.services.snapshot import build_snapshot
+
+        service = self._create_service()
+        snapshot = build_snapshot(service, service.fetch_streams())
+        schedule, _ = self._create_service().generate(dry_run=True)
+        worker_schedule, _ = ScheduleGeneratorService.from_snapshot(snapshot).generate(dry_run=True)
+        self.assertEqual(
+            sorted((e['stream'].id, e['weekday_id'], e['timeslot_id'], e['room_id']) for e in schedule),
+            sorted((e['stream'].id, e['weekday_id'], e['timeslot_id'], e['room_id']) for e in worker_schedule),
+        )
+
+    def test_best_run_not_worse_than_greedy(self):
+        greedy = self._create_service()
+        greedy.generate(dry_run=True)
+
+        service = self._create_service(runs=3, workers=2)
+        schedule, errors = service.generate(dry_run=True)
+        summary = service.get_stats_summary()
+
+        self.assertEqual(summary['multi_start']['runs'], 3)
+        self.assertLessEqual(summary['total_pairs_placed'] - len(schedule), 0)
+        self.assertGreaterEqual(summary['total_pairs_placed'], greedy.get_stats_summary()['total_pairs_placed'])
+        self.assertTrue(all(isinstance(e['stream'], Stream) for e in schedule))
+
+    def test_parent_saves_best_schedule(self):
+        service = self._create_service(runs=2, workers=1)
+        schedule, _ = service.generate(dry_run=False)
+        expected = sum(len(e['group_ids']) for e in schedule)
+        self.assertEqual(TimeTable.objects.filter(education_form='kunduzgi').count(), expected)
+
+    def test_cancel_shuts_pool_down_without_waiting(self):
+        from unittest import mock
+        from concurrent.futures import ProcessPoolExecutor
+        from education.services.jobs import JobCancelled
+
+        service = self._create_service(runs=2, workers=2)
+        shutdown = ProcessPoolExecutor.shutdown
+        calls = []
+
+        def record_shutdown(pool, wait=True, **kwargs):
+            calls.append((wait, kwargs.get('cancel_futures', False)))
+            return shutdown(pool, wait=wait, **kwargs)
+
+        def report_progress(**progress):
+            if 'multi_start_done' in progress:
+                raise JobCancelled()
+
+        with mock.patch.object(service, '_report_progress', side_effect=report_progress), \
+                mock.patch.object(ProcessPoolExecutor, 'shutdown', record_shutdown):
+            with self.assertRaises(JobCancelled):
+                service.generate(dry_run=True)
+        self.assertEqual(calls[0], (False, True))
+
+
+class RepairModeTest(ScheduleGeneratorBaseSetup):
+    """#13: Tuzatish (repair) rejimi testlari."""
+
+    def setUp(self):
+        _, self.lecture = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1],
+            self.teacher1, 'lecture',
+        )
+        _, self.practice1 = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1],
+            self.teacher2, 'practice',
+        )
+        _, self.practice2 = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group2],
+            self.teacher1, 'practice',
+        )
+        self._create_service().generate(dry_run=False)
+
+    def _rows(self):
+        return {
+            (r.stream_id, r.group_id, r.weekday_id, r.timeslot_id): (r.id, r.room_id)
+            for r in TimeTable.objects.filter(education_form='kunduzgi')
+        }
+
+    def test_no_change_writes_nothing(self):
+        before = self._rows()
+        service = self._create_service()
+        service.repair(dry_run=False)
+        summary = service.get_stats_summary()['repair']
+
+        self.assertEqual(summary['evicted_placements'], 0)
+        self.assertEqual((summary['inserted'], summary['updated'], summary['deleted']), (0, 0, 0))
+        self.assertEqual(self._rows(), before)
+
+    def test_deactivated_room_moves_only_its_lessons(self):
+        before = self._rows()
+        moved_room = TimeTable.objects.get(stream=self.practice1).room
+        moved_room.is_active = False
+        moved_room.save()
+
+        schedule, errors = self._create_service().repair(dry_run=False)
+        after = self._rows()
+
+        self.assertEqual(errors, [])
+        self.assertFalse(TimeTable.objects.filter(room=moved_room).exists())
+        self.assertEqual(len(after), len(before))
+        for key, (row_id, room_id) in before.items():
+            if room_id != moved_room.id:
+                self.assertEqual(after[key][0], row_id)
+
+    def test_scoped_stream_is_replaced(self):
+        before = self._rows()
+        service = self._create_service()
+        service.repair(stream_ids=[self.practice2.id], dry_run=False)
+        after = self._rows()
+
+        self.assertEqual(service.stats['repair']['evicted_placements'], 1)
+        self.assertEqual(service.stats['repair']['placed_pairs'], 1)
+        for key, value in before.items():
+            if key[0] != self.practice2.id:
+                self.assertEqual(after[key], value)
+        self.assertTrue(TimeTable.objects.filter(stream=self.practice2).exists())
+
+    def test_surplus_pairs_dropped_and_errors_refreshed(self):
+        # Eski generatsiyadan qolgan xato yozuvi tuzatishdan keyin yangi holat bilan almashadi
+        ScheduleError.objects.create(
+            academic_year=self.academic_year, semester=1, education_form='kunduzgi',
+            workload=self.lecture.workload, stream=self.lecture, pairs_needed=2, pairs_placed=0,
+        )
+        placed = TimeTable.objects.filter(stream=self.lecture).count()
+        self.plan_subject1.lecture_hours = 0
+        self.plan_subject1.save()
+
+        service = self._create_service()
+        needed = service.calculate_pairs(self.lecture)
+        service.repair(dry_run=False)
+
+        self.assertLess(needed, placed)
+        self.assertEqual(service.stats['repair']['surplus_placements'], placed - needed)
+        self.assertEqual(TimeTable.objects.filter(stream=self.lecture).count(), needed)
+        self.assertEqual(ScheduleError.objects.filter(education_form='kunduzgi').count(), len(service.errors))
+        self.assertFalse(ScheduleError.objects.filter(stream=self.lecture, pairs_placed=0).exists())
+
+
+class StreamMetaTest(ScheduleGeneratorBaseSetup):
+    """#14: StreamMeta (oldindan hisoblangan stream ma'lumotlari) testlari."""
+
+    def setUp(self):
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1, self.group2],
+            self.teacher1, 'lecture',
+        )
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1],
+            self.teacher2, 'practice',
+        )
+
+    def test_meta_is_immutable(self):
+        service = self._create_service()
+        meta = service.get_stream_meta(service.fetch_streams()[0])
+        with self.assertRaises(AttributeError):
+            meta.pairs_needed = 99
+
+    def test_meta_values(self):
+        service = self._create_service()
+        stream = next(s for s in service.fetch_streams() if s.lesson_type == 'lecture')
+        meta = service.get_stream_meta(stream)
+
+        self.assertEqual(meta.course, 1)
+        self.assertEqual(meta.pairs_needed, service._calculate_pairs(stream))
+        self.assertEqual(set(meta.group_ids), {self.group1.id, self.group2.id})
+        self.assertEqual(meta.student_count, 40)
+        self.assertEqual(meta.slot_indices, (0, 1, 2, 3))
+        self.assertEqual(meta.room_types, ('lecture',))
+
+    def test_placement_runs_without_queries(self):
+        service = self._create_service()
+        streams = service.fetch_streams()
+        for stream in streams:
+            service.get_stream_meta(stream)
+
+        with self.assertNumQueries(0):
+            for stream in service.sort_streams_by_priority(streams):
+                meta = service.get_stream_meta(stream)
+                service.find_best_slot(
+                    stream, service.get_stream_groups(stream), meta.pairs_needed, meta.student_count
+                )
+
+
+class StudentCountPreloadTest(ScheduleGeneratorBaseSetup):
+    """#15: Talabalar sonini oldindan yuklash va kichik guruh hisobi."""
+
+    def setUp(self):
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1, self.group2],
+            self.teacher1, 'lecture',
+        )
+        _, self.lab = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1],
+            self.teacher2, 'lab',
+        )
+        self.half1 = SubGroup.objects.create(group=self.group1, name="1-yarim")
+        SubGroup.objects.create(group=self.group1, name="2-yarim")
+
+    def test_counts_loaded_with_streams(self):
+        service = self._create_service()
+        streams = service.fetch_streams()
+        with self.assertNumQueries(0):
+            counts = {s.id: service.get_stream_student_count(s) for s in streams}
+        self.assertEqual(counts[self.lab.id], 25)
+        self.assertEqual(service.get_student_count([self.group1, self.group2]), 40)
+
+    def test_subgroup_stream_uses_share_of_group(self):
+        self.lab.sub_groups.add(self.half1)
+        service = self._create_service()
+        lab = next(s for s in service.fetch_streams() if s.id == self.lab.id)
+
+        self.assertEqual(service.get_stream_student_count(lab), 13)
+        self.assertEqual(service.get_stream_meta(lab).student_count, 13)
+
+
+class RoomIndexTest(ScheduleGeneratorBaseSetup):
+    """#16: RoomIndex — bisect + bitmap asosidagi best-fit xona qidiruvi."""
+
+    def setUp(self):
+        from education.services.room_index import RoomIndex
+        self.index = RoomIndex(Room.objects.filter(is_active=True).order_by('capacity'))
+
+    def test_smallest_fitting_room(self):
+        room, reason = self.index.find(self.mon.id, self.slot1.id, 25, ['practice', 'lecture'])
+        self.assertEqual((room, reason), (self.room_small, None))
+
+        room, _ = self.index.find(self.mon.id, self.slot1.id, 31, ['practice', 'lecture'])
+        self.assertEqual(room, self.room_medium)
+
+    def test_busy_room_skipped_and_released(self):
+        self.index.add((self.mon.id, self.slot1.id, self.room_small.id))
+        self.assertIn((self.mon.id, self.slot1.id, self.room_small.id), self.index)
+        room, _ = self.index.find(self.mon.id, self.slot1.id, 20, ['practice'])
+        self.assertEqual(room, self.room_medium)
+
+        self.index.discard((self.mon.id, self.slot1.id, self.room_small.id))
+        room, _ = self.index.find(self.mon.id, self.slot1.id, 20, ['practice'])
+        self.assertEqual(room, self.room_small)
+        self.assertEqual(len(self.index), 0)
+
+    def test_fail_reasons(self):
+        _, reason = self.index.find(self.mon.id, self.slot1.id, 200, ['lecture'])
+        self.assertEqual(reason, 'room_capacity')
+
+        self.index.add((self.mon.id, self.slot1.id, self.room_large.id))
+        _, reason = self.index.find(self.mon.id, self.slot1.id, 100, ['lecture'])
+        self.assertEqual(reason, 'room_busy')
+
+    def test_unknown_room_kept_as_plain_key(self):
+        key = (self.mon.id, self.slot1.id, 9999)
+        self.index.add(key)
+        self.assertIn(key, self.index)
+        self.assertIn(key, list(self.index))
+
+
+class RoomAssignmentTest(ScheduleGeneratorBaseSetup):
+    """#17: Ikki bosqichli rejim — xonalarni min-cost tayinlash."""
+
+    def setUp(self):
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1, self.group2],
+            self.teacher1, 'lecture',
+        )
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1],
+            self.teacher2, 'practice',
+        )
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group2],
+            self.teacher1, 'practice',
+        )
+
+    def test_hungarian_matches_brute_force(self):
+        import itertools
+        import random
+        from education.services.room_assignment import min_cost_assignment
+
+        rng = random.Random(7)
+        for _ in range(30):
+            n, m = rng.randint(1, 4), rng.randint(4, 6)
+            cost = [[rng.randint(0, 20) for _ in range(m)] for _ in range(n)]
+            result = min_cost_assignment(cost)
+            best = min(
+                sum(cost[i][c] for i, c in enumerate(cols))
+                for cols in itertools.permutations(range(m), n)
+            )
+            self.assertEqual(len(set(result)), n)
+            self.assertEqual(sum(cost[i][c] for i, c in enumerate(result)), best)
+
+    def test_wasteful_room_is_replaced(self):
+        from education.services.room_assignment import RoomAssigner
+
+        service = self._create_service()
+        service.generate(dry_run=True)
+        entry = next(e for e in service.schedule_map if e['room_id'] == self.room_small.id)
+        cell = (entry['weekday_id'], entry['timeslot_id'])
+
+        # Amaliyotni ataylab katta zalga o'tkazamiz
+        service.matrix_room.discard(cell + (self.room_small.id,))
+        service.matrix_room.add(cell + (self.room_large.id,))
+        entry['room'], entry['room_id'] = self.room_large, self.room_large.id
+
+        result = RoomAssigner(service).run()
+        self.assertEqual(entry['room_id'], self.room_small.id)
+        self.assertEqual(result['reassigned'], 1)
+        self.assertLess(result['wasted_seats_after'], result['wasted_seats_before'])
+        self.assertIn(cell + (self.room_small.id,), service.matrix_room)
+        self.assertNotIn(cell + (self.room_large.id,), service.matrix_room)
+
+    def test_matching_mode_keeps_rooms_valid(self):
+        greedy = self._create_service()
+        greedy.generate(dry_run=True)
+
+        service = self._create_service(room_assignment='matching')
+        schedule, errors = service.generate(dry_run=True)
+        summary = service.get_stats_summary()
+
+        self.assertIn('room_assignment', summary)
+        self.assertLessEqual(len(errors), len(greedy.errors))
+        cells = [(e['weekday_id'], e['timeslot_id'], e['room_id']) for e in schedule]
+        self.assertEqual(len(cells), len(set(cells)))
+        for e in schedule:
+            self.assertGreaterEqual(e['room'].capacity, e['student_count'])
+
+    def test_unknown_mode_rejected(self):
+        with self.assertRaises(ValueError):
+            self._create_service(room_assignment='random')
+
+
+class UndoTrailTest(ScheduleGeneratorBaseSetup):
+    """#18: checkpoint/rollback va undo jurnali asosidagi backtracking."""
+
+    def _hourly_stream(self, n, groups, lesson_type, slots):
+        teacher = Teacher.objects.create(
+            employee=Employee.objects.create(
+                first_name=f"Soat{n}", last_name="Bayev", gender='male',
+                passport_info=f"HT{n:07d}", pid=f"{n:014d}",
+                department=self.department, status='active',
+            ),
+            work_type_hourly=True,
+        )
+        availability = TeacherAvailability.objects.create(teacher=teacher, weekday=self.mon)
+        availability.timeslots.add(*slots)
+        _, stream = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, groups, teacher, lesson_type, employment_type='hourly',
+        )
+        return stream
+
+    def _create_chain(self):
+        # Priority: h0 (3 guruh) > h1 (2 guruh) > h2 (1 guruh); h2 faqat 1-parada bo'sh
+        self.h0 = self._hourly_stream(1, [self.group1, self.group2, self.group3], 'lecture', [self.slot2, self.slot3])
+        self.h1 = self._hourly_stream(2, [self.group1, self.group2], 'lecture', [self.slot1, self.slot2])
+        self.h2 = self._hourly_stream(3, [self.group1], 'practice', [self.slot1])
+
+    @staticmethod
+    def _state(service):
+        return (
+            set(service.matrix_teacher), set(service.matrix_group), set(service.matrix_room),
+            {k: v for k, v in service._day_load_teacher.items() if v},
+            {k: v for k, v in service._day_load_group.items() if v},
+            [id(e) for e in service.schedule_map],
+            list(service._placement_history),
+            dict(service._entry_pos),
+        )
+
+    def _assert_occupancy_matches_schedule(self, service):
+        teachers = {(e['weekday_id'], e['timeslot_id'], e['stream'].teacher.id) for e in service.schedule_map}
+        rooms = {(e['weekday_id'], e['timeslot_id'], e['room_id']) for e in service.schedule_map}
+        groups = {
+            (e['weekday_id'], e['timeslot_id'], g_id)
+            for e in service.schedule_map for g_id in e['group_ids']
+        }
+        self.assertEqual(set(service.matrix_teacher), teachers)
+        self.assertEqual(set(service.matrix_room), rooms)
+        self.assertEqual(set(service.matrix_group), groups)
+        self.assertEqual(sum(service._day_load_teacher.values()), len(service.schedule_map))
+
+    def test_rollback_restores_state(self):
+        import random
+
+        self._create_chain()
+        service = self._create_service()
+        service.generate(dry_run=True)
+        rng = random.Random(11)
+        days = [d.id for d in service.weekdays]
+        slots = [s.id for s in service.timeslots]
+
+        for _ in range(40):
+            before = self._state(service)
+            outer = service.checkpoint()
+            for step in range(rng.randint(1, 12)):
+                op = rng.randrange(5)
+                if op == 0:
+                    service._occupy(rng.choice(days), rng.choice(slots), 900 + step,
+                                    self.room_medium.id, [self.group3.id])
+                elif op == 1 and service.schedule_map:
+                    entry = rng.choice(service.schedule_map)
+                    service._remove_entry(entry)
+                    service._release(entry['weekday_id'], entry['timeslot_id'], entry['stream'].teacher.id,
+                                     entry['room_id'], entry['group_ids'])
+                elif op == 2 and service.schedule_map:
+                    service._add_entry(dict(rng.choice(service.schedule_map)))
+                elif op == 3 and service._placement_history:
+                    service._set_history(rng.randrange(len(service._placement_history)), ('x',))
+                else:
+                    inner = service.checkpoint()
+                    service._occupy(rng.choice(days), rng.choice(slots), 999, self.room_small.id, [])
+                    if rng.random() < 0.5:
+                        service.rollback(inner)
+                    else:
+                        service.commit(inner)
+            service.rollback(outer)
+            self.assertEqual(self._state(service), before)
+            self.assertEqual(len(service._trail), 0)
+
+    def test_backtracking_depth_one(self):
+        self.h1 = self._hourly_stream(2, [self.group1, self.group2], 'lecture', [self.slot1, self.slot2])
+        self.h2 = self._hourly_stream(3, [self.group1], 'practice', [self.slot1])
+
+        service = self._create_service()
+        schedule, errors = service.generate(dry_run=True)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(service.stats['backtrack_successes'], 1)
+        self._assert_occupancy_matches_schedule(service)
+
+    def test_deeper_backtracking_resolves_chain(self):
+        self._create_chain()
+
+        shallow = self._create_service()
+        _, errors = shallow.generate(dry_run=True)
+        self.assertEqual(len(errors), 1)
+        self._assert_occupancy_matches_schedule(shallow)
+
+        deep = self._create_service(backtrack_depth=2)
+        schedule, errors = deep.generate(dry_run=True)
+        self.assertEqual(errors, [])
+        placed = {e['stream'].id: e['timeslot_id'] for e in schedule}
+        self.assertEqual(placed, {self.h0.id: self.slot3.id, self.h1.id: self.slot2.id, self.h2.id: self.slot1.id})
+        self._assert_occupancy_matches_schedule(deep)
+
+
+class SyntheticBenchmarkTest(TestCase):
+    """#19: Sintetik ma'lumotlar takrorlanuvchanligi va benchmark natijasi."""
+
+    def tearDown(self):
+        invalidate_teacher_availability()
+
+    @staticmethod
+    def _signature():
+        from education.models import Room
+
+        return (
+            sorted(Group.objects.values_list('name', flat=True)),
+            sorted(PlanSubject.objects.values_list('subject__name', 'semester', 'practice_hours', 'lab_hours')),
+            sorted(Stream.objects.values_list('name', 'lesson_type', 'employment_type', 'teacher__employee__first_name')),
+            sorted(Room.objects.values_list('name', 'capacity')),
+            Student.objects.count(),
+        )
+
+    def test_same_seed_same_dataset(self):
+        from django.db import transaction
+        from education.services.synthetic import build_synthetic_dataset
+
+        signatures = []
+        for _ in range(2):
+            with transaction.atomic():
+                dataset = build_synthetic_dataset('tiny', seed=5)
+                signatures.append(self._signature())
+                transaction.set_rollback(True)
+        self.assertEqual(signatures[0], signatures[1])
+        self.assertGreater(dataset['counts']['streams'], 0)
+
+        with self.assertRaises(ValueError):
+            build_synthetic_dataset('huge', seed=5)
+
+    def test_benchmark_result(self):
+        from education.services.benchmark import run_benchmark
+        from education.services.synthetic import build_synthetic_dataset
+
+        dataset = build_synthetic_dataset('tiny', seed=1)
+        result = run_benchmark(dataset['year_id'], repeat=2, dataset=dataset)
+
+        self.assertEqual(len(result['runs']), 2)
+        best = result['best']
+        self.assertIn('greedy', best['phases'])
+        self.assertEqual(best['pairs_placed'] + best['pairs_failed'], best['pairs_needed'])
+        self.assertGreater(best['pairs_placed'], 0)
+        self.assertGreater(best['peak_memory_kb'], 0)
+        self.assertGreater(best['queries'], 0)
+
+    def test_compare_backends_same_schedule(self):
+        from education.services.benchmark import compare_backends
+        from education.services.synthetic import build_synthetic_dataset
+
+        dataset = build_synthetic_dataset('tiny', seed=1)
+        result = compare_backends(dataset['year_id'], trace_memory=False)
+
+        self.assertEqual(set(result['backends']), set(ScheduleGeneratorService.BACKENDS))
+        self.assertTrue(all(result['same_as_set'].values()))
+
+    def test_scaling_multiplies_streams(self):
+        from education.services.benchmark import run_scaling
+
+        result = run_scaling('tiny', factors=(1, 2), seed=1)
+
+        single, double = result['runs']
+        self.assertEqual((single['factor'], double['factor']), (1, 2))
+        self.assertGreater(double['streams'], 1.5 * single['streams'])
+        self.assertFalse(Stream.objects.exists())
+
+
+class ScheduleJobTest(ScheduleGeneratorBaseSetup):
+    """#20: Generatsiya fon vazifasi — progress, saqlangan natija, bekor qilish."""
+
+    def setUp(self):
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture',
+        )
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group2], self.teacher2, 'practice',
+        )
+        self.params = {
+            'year_id': self.academic_year.id, 'season': 'autumn', 'education_form': 'kunduzgi',
+            'shift1_levels': [1, 4], 'shift2_levels': [2, 3],
+        }
+
+    def test_preview_job_stores_result(self):
+        from education.models import ScheduleJob
+        from education.services.jobs import run_job, submit_job
+
+        job = submit_job('preview', self.params)
+        self.assertEqual(job.status, 'pending')
+        job = run_job(job.pk)
+
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(len(job.result['lessons']), 2)
+        self.assertEqual(job.result['errors'], [])
+        self.assertEqual(job.result['total_streams'], 2)
+        self.assertEqual(job.progress['streams_processed'], 2)
+        self.assertEqual(job.progress['pairs_placed'], 2)
+        # Ikkinchi marta olinmaydi
+        self.assertIsNone(run_job(job.pk))
+        self.assertEqual(TimeTable.objects.count(), 0)
+        self.assertEqual(ScheduleJob.objects.get(pk=job.pk).status, 'done')
+
+    def test_cancel(self):
+        from education.models import ScheduleJob
+        from education.services.jobs import cancel_job, run_job
+
+        pending = ScheduleJob.objects.create(kind='preview', params=self.params)
+        self.assertTrue(cancel_job(pending.pk))
+        self.assertIsNone(run_job(pending.pk))
+        self.assertEqual(ScheduleJob.objects.get(pk=pending.pk).status, 'cancelled')
+
+        # Worker olgandan keyin kelgan bekor qilish so'rovi: birinchi progress yangilanishida to'xtaydi
+        running = ScheduleJob.objects.create(kind='save', params=self.params, cancel_requested=True)
+        job = run_job(running.pk)
+        self.assertEqual(job.status, 'cancelled')
+        self.assertIsNone(job.result)
+        self.assertEqual(TimeTable.objects.count(), 0)
+
+    def test_stale_running_job_failed_by_command(self):
+        import datetime
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from education.models import ScheduleJob
+
+        long_ago = timezone.now() - datetime.timedelta(minutes=30)
+        stale = ScheduleJob.objects.create(kind='preview', params=self.params, status='running',
+                                           started_at=long_ago, heartbeat_at=long_ago)
+        alive = ScheduleJob.objects.create(kind='preview', params=self.params, status='running',
+                                           started_at=long_ago, heartbeat_at=timezone.now())
+        # Jarayon o'lib, on_commit dan oldin yo'qolgan navbatdagi vazifa
+        lost = ScheduleJob.objects.create(kind='preview', params=self.params)
+
+        call_command('run_schedule_jobs', stdout=StringIO())
+
+        self.assertEqual(ScheduleJob.objects.get(pk=stale.pk).status, 'failed')
+        self.assertEqual(ScheduleJob.objects.get(pk=alive.pk).status, 'running')
+        lost = ScheduleJob.objects.get(pk=lost.pk)
+        self.assertEqual(lost.status, 'done')
+        self.assertIsNotNone(lost.heartbeat_at)
+
+    def test_admin_flow(self):
+        from education.models import ScheduleJob
+        from education.services.jobs import run_job
+
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        self.client.force_login(admin_user)
+
+        response = self.client.post(reverse('admin:education_timetable_generate'), {
+            'action': 'preview', 'academic_year': self.academic_year.id, 'season': 'autumn',
+            'education_form': 'kunduzgi', 'shift1_levels': ['1', '4'], 'shift2_levels': ['2', '3'],
+        })
+        job = ScheduleJob.objects.get()
+        self.assertRedirects(response, reverse('admin:education_timetable_generate_job', args=[job.pk]))
+        self.assertEqual(job.params['shift1_levels'], [1, 4])
+
+        status_url = reverse('admin:education_timetable_generate_job_status', args=[job.pk])
+        self.assertEqual(self.client.get(status_url).json()['status'], 'pending')
+
+        run_job(job.pk)
+        self.assertTrue(self.client.get(status_url).json()['finished'])
+        response = self.client.get(reverse('admin:education_timetable_generate_job', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['preview_mode'])
+        self.assertEqual(len(response.context['grouped_schedules']), 2)
+
+
+class PreviewCommitTest(ScheduleGeneratorBaseSetup):
+    """Simulyatsiya natijasini qayta generatsiyasiz saqlash (barmoq izi bilan)."""
+
+    def setUp(self):
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture',
+        )
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group2], self.teacher2, 'practice',
+        )
+        from education.services.jobs import run_job, submit_job
+
+        self.job = run_job(submit_job('preview', {
+            'year_id': self.academic_year.id, 'season': 'autumn', 'education_form': 'kunduzgi',
+        }).pk)
+
+    def test_commit_writes_reviewed_schedule(self):
+        from education.services.preview import commit_preview
+
+        self.assertEqual(commit_preview(self.job)['inserted'], 2)
+        saved = sorted(TimeTable.objects.values_list('stream_id', 'weekday_id', 'timeslot_id', 'room_id'))
+        reviewed = sorted(
+            (l['stream_id'], l['weekday_id'], l['timeslot_id'], l['room_id']) for l in self.job.result['lessons']
+        )
+        self.assertEqual(saved, reviewed)
+
+    def test_changed_inputs_refused(self):
+        from education.services.preview import PreviewOutdated, commit_preview
+
+        self.room_small.capacity = 10
+        self.room_small.save()
+        Student.objects.filter(group=self.group2).first().delete()
+
+        with self.assertRaises(PreviewOutdated) as ctx:
+            commit_preview(self.job)
+        self.assertEqual(ctx.exception.changed, ['students', 'rooms'])
+        self.assertIn("Xonalar", str(ctx.exception))
+        self.assertEqual(TimeTable.objects.count(), 0)
+
+    def test_admin_save_uses_preview(self):
+        from education.models import ScheduleJob
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        response = self.client.post(reverse('admin:education_timetable_generate'), {
+            'action': 'save', 'preview_job': self.job.pk,
+        })
+        self.assertRedirects(response, reverse('admin:education_timetable_changelist'))
+        self.assertEqual(TimeTable.objects.count(), 2)
+        # Yangi generatsiya vazifasi yaratilmadi
+        self.assertEqual(ScheduleJob.objects.count(), 1)
+
+
+class DiffPersistenceTest(ScheduleGeneratorBaseSetup):
+    """Jadvalni saqlash: faqat farq yoziladi, o'zgarmagan darslar ID si saqlanadi."""
+
+    def setUp(self):
+        _, self.lecture = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture',
+        )
+        _, self.practice = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group2], self.teacher2, 'practice',
+        )
+
+    @staticmethod
+    def _rows():
+        return {
+            (r.stream_id, r.group_id, r.weekday_id, r.timeslot_id): (r.id, r.room_id, r.teacher_id)
+            for r in TimeTable.objects.all()
+        }
+
+    def test_resave_keeps_ids(self):
+        first = self._create_service()
+        first.generate(dry_run=False)
+        self.assertEqual(first.stats['persistence']['inserted'], 2)
+        before = self._rows()
+
+        again = self._create_service()
+        again.generate(dry_run=False)
+        self.assertEqual(again.get_stats_summary()['persistence'],
+                         {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 2})
+        self.assertEqual(self._rows(), before)
+
+    def test_only_changed_rows_written(self):
+        self._create_service().generate(dry_run=False)
+        before = self._rows()
+        manual = TimeTable.objects.create(
+            academic_year=self.academic_year, semester='autumn', education_form='kunduzgi',
+            weekday=self.sat, timeslot=self.slot6, subject=self.subject2,
+            teacher=self.teacher2, group=self.group3,
+        )
+        # Amaliyot xonasini o'zgartirish: faqat bitta qator yangilanadi
+        key = next(k for k in before if k[0] == self.practice.id)
+        TimeTable.objects.filter(id=before[key][0]).update(room=self.room_large)
+
+        service = self._create_service()
+        service.generate(dry_run=False)
+
+        self.assertEqual(service.stats['persistence'], {'inserted': 0, 'updated': 1, 'deleted': 1, 'unchanged': 1})
+        self.assertEqual(self._rows(), before)
+        self.assertFalse(TimeTable.objects.filter(id=manual.id).exists())
+
+
+class JointGenerationTest(ScheduleGeneratorBaseSetup):
+    """#21: Kunduzgi va sirtqi shakllar umumiy bandlikda birgalikda generatsiya qilinadi."""
+
+    def setUp(self):
+        _, self.day_stream = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture',
+        )
+        part_time_plan = EducationPlan.objects.create(
+            specialty=self.specialty2, academic_year=self.academic_year, education_form='sirtqi', course=1,
+        )
+        plan_subject = PlanSubject.objects.create(
+            education_plan=part_time_plan, subject=self.subject2, semester=1, credit=4,
+            lecture_hours=30, practice_hours=0, lab_hours=0, seminar_hours=0,
+        )
+        SessionPeriod.objects.create(
+            academic_year=self.academic_year, semester='autumn', education_form='sirtqi', course=1,
+            start_date=datetime.date(2024, 11, 4), end_date=datetime.date(2024, 11, 30), weeks_count=4,
+        )
+        # Ikkala shaklda ham bitta o'qituvchi
+        _, self.part_time_stream = self._create_workload_with_stream(
+            self.subject2, plan_subject, [self.group3], self.teacher1, 'lecture',
+        )
+
+    def _create_joint_service(self, **kwargs):
+        return self._create_service(education_forms=['kunduzgi', 'sirtqi'], **kwargs)
+
+    def test_per_form_rules(self):
+        service = self._create_joint_service()
+        streams = {s.id: s for s in service.fetch_streams()}
+
+        self.assertEqual(set(streams), {self.day_stream.id, self.part_time_stream.id})
+        day, part_time = streams[self.day_stream.id], streams[self.part_time_stream.id]
+        self.assertEqual(service.get_stream_form(part_time), 'sirtqi')
+        self.assertEqual(len(service.get_allowed_slots_for_stream(day)), 4)
+        self.assertEqual(len(service.get_allowed_slots_for_stream(part_time)), 6)
+        self.assertEqual(service.get_weeks_duration(day), 15)
+        self.assertEqual(service.get_weeks_duration(part_time), 4)
+
+    def test_shared_teacher_and_rows_per_form(self):
+        # Eski sirtqi jadval bandlik sifatida yuklanmaydi — u qayta yoziladi
+        TimeTable.objects.create(
+            academic_year=self.academic_year, semester='autumn', education_form='sirtqi',
+            weekday=self.mon, timeslot=self.slot1, subject=self.subject3, teacher=self.teacher1, group=self.group3,
+        )
+        service = self._create_joint_service()
+        self.assertNotIn((self.mon.id, self.slot1.id, self.teacher1.id), service.matrix_teacher)
+
+        _, errors = service.generate(dry_run=False)
+
+        self.assertEqual(errors, [])
+        rows = list(TimeTable.objects.values_list('education_form', 'stream_id', 'weekday_id', 'timeslot_id'))
+        self.assertEqual({(form, stream_id) for form, stream_id, _, _ in rows},
+                         {('kunduzgi', self.day_stream.id), ('sirtqi', self.part_time_stream.id)})
+        slots = [(day_id, slot_id) for _, _, day_id, slot_id in rows]
+        self.assertEqual(len(slots), len(set(slots)))
+
+        persistence = service.stats['persistence']
+        self.assertEqual(set(persistence['forms']), {'kunduzgi', 'sirtqi'})
+        self.assertEqual(persistence['deleted'], 1)
+        self.assertEqual(persistence['inserted'], len(rows))
+
+    def test_joint_multi_start_and_invalid_options(self):
+        service = self._create_joint_service(runs=2, workers=1)
+        schedule, errors = service.generate(dry_run=True)
+        self.assertEqual(errors, [])
+        self.assertEqual({item['stream'].id for item in schedule}, {self.day_stream.id, self.part_time_stream.id})
+
+        with self.assertRaises(ValueError):
+            service.repair()
+        with self.assertRaises(ValueError):
+            self._create_service(education_forms=['kechki'])
+
+
+class ScheduleQualityTest(ScheduleGeneratorBaseSetup):
+    """#22: Jadval sifati ko'rsatkichlari (NumPy bandlik tensorlari bo'yicha)."""
+
+    def _quality(self, rows, max_pairs=4):
+        from education.services.quality import ScheduleQuality
+
+        days = [d.id for d in (self.mon, self.tue, self.wed, self.thu, self.fri, self.sat)]
+        slots = [s.id for s in (self.slot1, self.slot2, self.slot3, self.slot4, self.slot5, self.slot6)]
+        capacities = {self.room_small.id: 30, self.room_large.id: 120}
+        return ScheduleQuality(rows, days, slots, capacities, max_pairs).score()
+
+    def test_metrics_on_known_schedule(self):
+        g1, g2, t1, t2 = self.group1.id, self.group2.id, self.teacher1.id, self.teacher2.id
+        room = self.room_small.id
+        rows = [
+            # group1: dushanba 1- va 3-para (1 oyna); o'qituvchi1 ham shu darslarda
+            (g1, self.mon.id, self.slot1.id, t1, room, 25),
+            (g1, self.mon.id, self.slot3.id, t1, room, 25),
+            # group2: seshanba 1..5-paralar o'qituvchi2 bilan (limit 4 dan 1 ta ortiq, 5-para kechki)
+        ] + [
+            (g2, self.tue.id, slot.id, t2, room, 35)
+            for slot in (self.slot1, self.slot2, self.slot3, self.slot4, self.slot5)
+        ]
+        quality = self._quality(rows)
+
+        self.assertEqual(quality['lessons'], 7)
+        self.assertEqual(quality['group_gaps'], 1)
+        self.assertEqual(quality['teacher_gaps'], 1)
+        self.assertEqual(quality['late_pairs'], 1)
+        self.assertEqual(quality['teacher_day_overloads'], 1)
+        self.assertEqual(quality['teacher_day_excess'], 1)
+        self.assertEqual(quality['over_capacity'], 5)
+        self.assertEqual(quality['wasted_seats'], 10)
+        self.assertGreater(quality['penalty'], 0)
+        self.assertEqual(self._quality([])['penalty'], 0)
+
+    def test_generated_and_saved_schedule_match(self):
+        from education.services.quality import ScheduleQuality
+
+        self._create_workload_with_stream(self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture')
+        self._create_workload_with_stream(self.subject2, self.plan_subject1, [self.group2], self.teacher2, 'practice')
+        service = self._create_service()
+        service.generate(dry_run=False)
+
+        generated = service.get_quality_report()
+        self.assertEqual(generated['lessons'], 2)
+        self.assertEqual(ScheduleQuality.from_timetable(self.academic_year.id, 'autumn').score(), generated)
+
+    def test_saved_subgroup_lesson_uses_subgroup_share(self):
+        from education.services.quality import ScheduleQuality
+
+        _, stream = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher2, 'practice',
+        )
+        half = SubGroup.objects.create(group=self.group1, name="1-yarim")
+        SubGroup.objects.create(group=self.group1, name="2-yarim")
+        stream.sub_groups.add(half)
+        service = self._create_service()
+        service.generate(dry_run=False)
+
+        generated = service.get_quality_report()
+        self.assertEqual(generated['lessons'], 1)
+        saved = ScheduleQuality.from_timetable(self.academic_year.id, 'autumn').score()
+        self.assertEqual(saved['wasted_seats'], generated['wasted_seats'])
+        self.assertEqual(saved, generated)
+
+
+class GeneratorProfilingTest(ScheduleGeneratorBaseSetup):
+    """#23: profile=True — metod taymerlari, chaqiruvlar va SQL so'rovlar soni."""
+
+    def setUp(self):
+        self._create_workload_with_stream(self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture')
+
+    def test_profile_collected_and_logged(self):
+        service = self._create_service(profile=True)
+        with self.assertLogs('talababase', level='INFO') as logs:
+            service.generate(dry_run=True)
+
+        profile = service.get_stats_summary()['profile']
+        self.assertEqual(profile['methods']['fetch_streams']['calls'], 1)
+        self.assertGreater(profile['methods']['find_best_slot']['calls'], 0)
+        self.assertGreater(profile['methods']['_gap_penalties']['calls'], 0)
+        self.assertGreater(profile['phase_queries']['fetch'], 0)
+        self.assertEqual(profile['queries'], sum(profile['phase_queries'].values()))
+        self.assertIn('find_best_slot', '\n'.join(logs.output))
+
+    def test_disabled_by_default(self):
+        service = self._create_service()
+        service.generate(dry_run=True)
+
+        self.assertNotIn('find_best_slot', vars(service))
+        self.assertNotIn('profile', service.stats)
+
+
+class GroupSlotMaskTest(ScheduleGeneratorBaseSetup):
+    """#24: (kun, guruh) bitmaskalari matrix_group bilan doim mos bo'lishi kerak."""
+
+    def _assert_masks_match(self, service):
+        expected = defaultdict(int)
+        for day_id, slot_id, g_id in service.matrix_group:
+            expected[(day_id, g_id)] |= 1 << service._slot_pos[slot_id]
+        actual = {key: mask for key, mask in service._group_day_mask.items() if mask}
+        self.assertEqual(actual, dict(expected))
+
+    def test_masks_follow_place_and_undo(self):
+        service = self._create_service()
+        mark = service.checkpoint()
+        service._occupy(self.mon.id, self.slot1.id, self.teacher1.id, self.room_small.id, [self.group1.id])
+        service._occupy(self.mon.id, self.slot4.id, self.teacher1.id, self.room_small.id, [self.group1.id])
+        self.assertEqual(service._group_day_mask[(self.mon.id, self.group1.id)], 0b1001)
+        # 1- va 4-paralar band: 2- yoki 3-para bitta oyna qoldiradi; bo'sh kunda — slot indeksi
+        self.assertEqual(service._gap_penalties(self.mon.id, (1, 2), [self.group1.id]), [1, 1])
+        self.assertEqual(service._gap_penalties(self.tue.id, (1, 2), [self.group1.id]), [1, 2])
+
+        service.rollback(mark)
+        self.assertEqual(service._group_day_mask[(self.mon.id, self.group1.id)], 0)
+
+    def test_masks_after_local_search_and_matching(self):
+        self._create_workload_with_stream(self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture')
+        self._create_workload_with_stream(self.subject2, self.plan_subject1, [self.group1], self.teacher2, 'practice')
+        self._create_workload_with_stream(self.subject3, self.plan_subject1, [self.group2], self.teacher1, 'practice')
+        for backend in ScheduleGeneratorService.BACKENDS:
+            service = self._create_service(
+                backend=backend, engine='local_search', time_budget=0.2, seed=3, room_assignment='matching'
+            )
+            service.generate(dry_run=True)
+            self._assert_masks_match(service)
+
+
+class StreamIndexTest(ScheduleGeneratorBaseSetup):
+    """#25: Stream bo'yicha indeks schedule_map bilan doim mos bo'lishi kerak."""
+
+    def _assert_index_matches(self, service):
+        expected_days = defaultdict(lambda: defaultdict(int))
+        for entry in service.schedule_map:
+            expected_days[entry['stream'].id][entry['weekday_id']] += 1
+        for stream_id, days in expected_days.items():
+            self.assertEqual(dict(service._stream_days[stream_id]), dict(days))
+            self.assertEqual(
+                sorted(map(id, service.get_stream_entries(stream_id))),
+                sorted(id(e) for e in service.schedule_map if e['stream'].id == stream_id),
+            )
+        self.assertFalse({s_id for s_id, days in service._stream_days.items() if days} - set(expected_days))
+
+    def test_index_follows_engines_and_rollback(self):
+        self._create_workload_with_stream(self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture')
+        self._create_workload_with_stream(self.subject2, self.plan_subject1, [self.group1], self.teacher2, 'practice')
+        self._create_workload_with_stream(self.subject3, self.plan_subject1, [self.group2], self.teacher1, 'practice')
+        for engine in ScheduleGeneratorService.ENGINES:
+            service = self._create_service(engine=engine, time_budget=0.2, seed=3, room_assignment='matching')
+            service.generate(dry_run=True)
+            self._assert_index_matches(service)
+
+            stream_ids = {entry['stream'].id for entry in service.schedule_map}
+            self.assertTrue(stream_ids)
+            mark = service.checkpoint()
+            for entry in list(service.schedule_map):
+                service._remove_entry(entry)
+            self.assertEqual([service.get_stream_entries(s_id) for s_id in stream_ids], [[]] * len(stream_ids))
+            service.rollback(mark)
+            self._assert_index_matches(service)
+
+
+class TeacherAvailabilityCacheTest(ScheduleGeneratorBaseSetup):
+    """#26: Bo'sh vaqt bitsetlari jarayon keshida, signallar bilan yangilanadi."""
+
+    def setUp(self):
+        self.slot_ids = [s.id for s in TimeSlot.objects.order_by('start_time')]
+        self.availability = TeacherAvailability.objects.create(teacher=self.teacher2, weekday=self.mon)
+        self.availability.timeslots.add(self.slot2)
+
+    def test_shared_between_services(self):
+        first = self._create_service()
+        with self.assertNumQueries(0):
+            bitsets = get_teacher_availability(self.slot_ids)
+        self.assertIs(first.teacher_availability_cache, bitsets)
+        self.assertIs(self._create_service().teacher_availability_cache, bitsets)
+
+        self.assertEqual(bitsets.mask(self.teacher2.id, self.mon.id), 0b10)
+        self.assertIn((self.teacher2.id, self.mon.id, self.slot2.id), bitsets)
+        self.assertNotIn((self.teacher2.id, self.mon.id, self.slot1.id), bitsets)
+        self.assertEqual(list(bitsets), [(self.teacher2.id, self.mon.id, self.slot2.id)])
+
+    def test_invalidated_by_signals(self):
+        cached = get_teacher_availability(self.slot_ids)
+
+        self.availability.timeslots.add(self.slot3)
+        bitsets = get_teacher_availability(self.slot_ids)
+        self.assertIsNot(bitsets, cached)
+        self.assertEqual(bitsets.mask(self.teacher2.id, self.mon.id), 0b110)
+
+        self.availability.timeslots.remove(self.slot2)
+        self.assertEqual(get_teacher_availability(self.slot_ids).mask(self.teacher2.id, self.mon.id), 0b100)
+
+        self.availability.weekday = self.tue
+        self.availability.save()
+        self.assertEqual(get_teacher_availability(self.slot_ids).mask(self.teacher2.id, self.tue.id), 0b100)
+
+        self.availability.delete()
+        self.assertEqual(len(get_teacher_availability(self.slot_ids)), 0)
+
+    def test_hourly_teacher_follows_availability_change(self):
+        self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher2, 'practice', employment_type='hourly',
+        )
+        for backend in ScheduleGeneratorService.BACKENDS:
+            service = self._create_service(backend=backend)
+            service.generate(dry_run=True)
+            self.assertEqual(
+                {(e['weekday_id'], e['timeslot_id']) for e in service.schedule_map}, {(self.mon.id, self.slot2.id)}
+            )
+
+        self.availability.timeslots.set([self.slot3])
+        for backend in ScheduleGeneratorService.BACKENDS:
+            service = self._create_service(backend=backend)
+            service.generate(dry_run=True)
+            self.assertEqual(
+                {(e['weekday_id'], e['timeslot_id']) for e in service.schedule_map}, {(self.mon.id, self.slot3.id)}
+            )
+
+
+class ScheduleDiagnosticsTest(ScheduleGeneratorBaseSetup):
+    """#27: Joylashmagan stream uchun yumshatilishi kerak bo'lgan bitta cheklov."""
+
+    def test_missing_room_type(self):
+        Room.objects.filter(pk=self.room_large.pk).update(is_active=False)
+        _, lecture = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture',
+        )
+        service = self._create_service()
+        _, errors = service.generate(dry_run=True)
+
+        diagnosis = errors[0]['diagnosis']
+        self.assertEqual(diagnosis['constraint'], 'room')
+        self.assertFalse(diagnosis['room_exists'])
+        self.assertEqual((diagnosis['room_types'], diagnosis['student_count']), (['lecture'], 25))
+        self.assertIn('diagnostics', service.stats['phases'])
+
+    def test_group_conflict_names_stream(self):
+        from education.services.diagnostics import ScheduleDiagnostics
+
+        _, blocker = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'practice',
+        )
+        _, hourly = self._create_workload_with_stream(
+            self.subject2, self.plan_subject1, [self.group1], self.teacher2, 'practice', employment_type='hourly',
+        )
+        availability = TeacherAvailability.objects.create(teacher=self.teacher2, weekday=self.mon)
+        availability.timeslots.add(self.slot1)
+
+        service = self._create_service()
+        service._occupy(self.mon.id, self.slot1.id, self.teacher1.id, self.room_small.id, [self.group1.id])
+        service._add_entry(service._build_entry(
+            blocker, {'weekday': self.mon, 'timeslot': self.slot1, 'room': self.room_small}, [self.group1.id], 25, 1
+        ))
+        diagnosis = ScheduleDiagnostics(service).diagnose(hourly, 1)
+
+        self.assertEqual(diagnosis['open_days'], 0)
+        self.assertEqual(diagnosis['constraint'], 'teacher_availability')
+        conflicts = [r for r in diagnosis['relaxations'] if r['constraint'] == 'group_conflict']
+        self.assertEqual([(r['stream_id'], r['days']) for r in conflicts], [(blocker.id, 1)])
+
+    def test_saved_as_schedule_error(self):
+        _, hourly = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher2, 'practice', employment_type='hourly',
+        )
+        self._create_service().generate(dry_run=False)
+
+        error = ScheduleError.objects.get()
+        self.assertEqual(
+            (error.stream_id, error.constraint, error.education_form, error.semester, error.pairs_needed),
+            (hourly.id, 'teacher_availability', 'kunduzgi', 1, 1),
+        )
+        self.assertEqual(error.details['relaxations'][0]['days'], 6)
+        self.assertIn("bo'sh vaqtini", error.message)
+
+
+class LessonLogGenerationTest(ScheduleGeneratorBaseSetup):
+    """Dars jurnalini ommaviy yaratish: mavjudlar tashlab ketiladi, (guruh, fan) soat limiti saqlanadi."""
+
+    def setUp(self):
+        _, self.stream = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture',
+        )
+        self.timetables = [
+            TimeTable.objects.create(
+                academic_year=self.academic_year, semester='autumn', education_form='kunduzgi',
+                weekday=weekday, timeslot=self.slot1, group=self.group1, stream=self.stream,
+                subject=self.subject1, teacher=self.teacher1, room=self.room_large,
+            )
+            for weekday in (self.mon, self.wed)
+        ]
+        # 2024-09-02 — dushanba; 20 hafta = 40 ta nomzod dars
+        self.start, self.end = datetime.date(2024, 9, 2), datetime.date(2025, 1, 19)
+
+    def _generate(self):
+        from education.services.main import generate_semester_logs
+        return generate_semester_logs(self.start, self.end, self.academic_year.id, 'autumn')
+
+    def test_plan_hours_limit_and_idempotency(self):
+        from education.models import LessonLog
+
+        # Reja: 30 + 30 soat = 30 ta para
+        self.assertEqual(self._generate(), 30)
+        logs = LessonLog.objects.order_by('date')
+        self.assertEqual(logs.last().date, datetime.date(2024, 12, 11))
+        first = logs.first()
+        self.assertEqual(
+            (first.timetable_id, first.actual_teacher_id, first.employment_type, first.lesson_type, first.status),
+            (self.timetables[0].id, self.teacher1.id, 'permanent', 'lecture', 'scheduled'),
+        )
+        self.assertEqual(self._generate(), 0)
+
+    def test_existing_logs_skipped(self):
+        from education.models import LessonLog
+
+        LessonLog.objects.create(
+            timetable=self.timetables[1], date=datetime.date(2024, 9, 4), group=self.group1,
+            subject=self.subject1, planned_teacher=self.teacher1, hours=2,
+        )
+        self.assertEqual(self._generate(), 29)
+        self.assertEqual(LessonLog.objects.filter(date=datetime.date(2024, 9, 4)).count(), 1)
+
+    def test_conflicting_rows_not_counted_as_created(self):
+        from unittest import mock
+        from education.models import LessonLog
+        from education.services.lesson_logs import LessonLogGenerator
+
+        generator = LessonLogGenerator(self.academic_year.id, 'autumn')
+        logs = generator.build(self.start, self.end)
+        # build dan keyin parallel jarayon ikkita qatorni yozib ulgurgan
+        for log in logs[:2]:
+            LessonLog.objects.create(
+                timetable=log.timetable, date=log.date, group_id=log.group_id,
+                subject_id=log.subject_id, planned_teacher_id=log.planned_teacher_id, hours=2,
+            )
+        with mock.patch.object(generator, 'build', return_value=logs):
+            self.assertEqual(generator.run(self.start, self.end), 28)
+        self.assertEqual((generator.stats['attempted'], generator.stats['created']), (30, 28))
+        self.assertEqual(LessonLog.objects.count(), 30)
+
+    def test_query_count_independent_of_timetable_size(self):
+        from education.services.lesson_logs import LessonLogGenerator
+
+        # Jadval, reja soatlari, mavjud soatlar, mavjud kalitlar, kalendar kunlari, sessiyalar
+        generator = LessonLogGenerator(self.academic_year.id, 'autumn')
+        with self.assertNumQueries(6):
+            self.assertEqual(len(generator.build(self.start, self.end)), 30)
+
+        plan_subject2 = PlanSubject.objects.create(
+            education_plan=self.plan, subject=self.subject2, semester=1, credit=2,
+            lecture_hours=0, practice_hours=20, lab_hours=0, seminar_hours=0,
+        )
+        _, stream2 = self._create_workload_with_stream(
+            self.subject2, plan_subject2, [self.group2], self.teacher2, 'practice',
+        )
+        for weekday in (self.tue, self.thu):
+            TimeTable.objects.create(
+                academic_year=self.academic_year, semester='autumn', education_form='kunduzgi',
+                weekday=weekday, timeslot=self.slot2, group=self.group2, stream=stream2,
+                subject=self.subject2, teacher=self.teacher2, room=self.room_small,
+            )
+        with self.assertNumQueries(6):
+            self.assertEqual(len(generator.build(self.start, self.end)), 40)
+
+
+class AcademicCalendarTest(ScheduleGeneratorBaseSetup):
+    """Jurnal faqat haqiqiy dars kunlariga: bayram, ko'chirilgan ish kuni va sessiya oynalari."""
+
+    def setUp(self):
+        _, self.stream = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture',
+        )
+        self.start, self.end = datetime.date(2024, 9, 2), datetime.date(2024, 9, 30)
+
+    def _timetable(self, weekday, education_form='kunduzgi'):
+        return TimeTable.objects.create(
+            academic_year=self.academic_year, semester='autumn', education_form=education_form,
+            weekday=weekday, timeslot=self.slot1, group=self.group1, stream=self.stream,
+            subject=self.subject1, teacher=self.teacher1, room=self.room_large,
+        )
+
+    def _dates(self, education_form='kunduzgi'):
+        from education.services.lesson_logs import LessonLogGenerator
+        logs = LessonLogGenerator(self.academic_year.id, 'autumn', education_form).build(self.start, self.end)
+        return [log.date for log in logs]
+
+    def test_schedule_days(self):
+        from education.models import AcademicCalendarDay
+        from education.services.academic_calendar import AcademicCalendar
+
+        AcademicCalendarDay.objects.create(academic_year=self.academic_year, date=datetime.date(2024, 9, 3))
+        AcademicCalendarDay.objects.create(
+            academic_year=self.academic_year, date=datetime.date(2024, 9, 8), day_type='transfer', weekday=self.tue,
+        )
+        calendar = AcademicCalendar(self.academic_year.id, 'autumn', self.start, datetime.date(2024, 9, 8))
+        self.assertEqual(calendar.schedule_days('kunduzgi', 1).tolist(), [1, 0, 3, 4, 5, 6, 2])
+        # Sessiyasi yo'q sirtqi kurs — dars kuni yo'q
+        self.assertFalse(calendar.teaching_mask('sirtqi', 1).any())
+
+    def test_holiday_and_transfer_day(self):
+        from education.models import AcademicCalendarDay
+
+        self._timetable(self.mon)
+        AcademicCalendarDay.objects.create(academic_year=self.academic_year, date=datetime.date(2024, 9, 2))
+        AcademicCalendarDay.objects.create(
+            academic_year=self.academic_year, date=datetime.date(2024, 9, 7), day_type='transfer', weekday=self.mon,
+        )
+        self.assertEqual(self._dates(), [
+            datetime.date(2024, 9, 7), datetime.date(2024, 9, 9), datetime.date(2024, 9, 16),
+            datetime.date(2024, 9, 23), datetime.date(2024, 9, 30),
+        ])
+
+    def test_part_time_only_inside_session(self):
+        self._timetable(self.mon, 'sirtqi')
+        self.assertEqual(self._dates('sirtqi'), [])
+
+        SessionPeriod.objects.create(
+            academic_year=self.academic_year, semester='autumn', education_form='sirtqi', course=1,
+            start_date=datetime.date(2024, 9, 10), end_date=datetime.date(2024, 9, 24), weeks_count=2,
+        )
+        self.assertEqual(self._dates('sirtqi'), [datetime.date(2024, 9, 16), datetime.date(2024, 9, 23)])
+
+
+class IncrementalLogGenerationTest(ScheduleGeneratorBaseSetup):
+    """Jurnal belgidan ufqqacha to'ldiriladi, takroriy ishga tushish bo'sh."""
+
+    def setUp(self):
+        _, stream = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture',
+        )
+        TimeTable.objects.create(
+            academic_year=self.academic_year, semester='autumn', education_form='kunduzgi',
+            weekday=self.mon, timeslot=self.slot1, group=self.group1, stream=stream,
+            subject=self.subject1, teacher=self.teacher1, room=self.room_large,
+        )
+
+    def _run(self, today):
+        from education.services.incremental_logs import run_incremental
+        return run_incremental(today=today, horizon_days=14, year_ids=[self.academic_year.id], parallel=False)
+
+    def test_watermark_advances(self):
+        from education.models import LessonLog, LessonLogWatermark
+
+        # 2024-09-02 (sessiya boshi) .. 2024-09-16: uchta dushanba
+        [result] = self._run(datetime.date(2024, 9, 2))
+        self.assertEqual((result['start'], result['end'], result['created']),
+                         (datetime.date(2024, 9, 2), datetime.date(2024, 9, 16), 3))
+        mark = LessonLogWatermark.objects.get(academic_year=self.academic_year, semester='autumn')
+        self.assertEqual(mark.generated_until, datetime.date(2024, 9, 16))
+
+        self.assertEqual(self._run(datetime.date(2024, 9, 2)), [])
+
+        [result] = self._run(datetime.date(2024, 9, 9))
+        self.assertEqual((result['start'], result['created']), (datetime.date(2024, 9, 17), 1))
+        self.assertEqual(LessonLog.objects.count(), 4)
+
+    def test_stale_target_rechecks_locked_watermark(self):
+        from unittest import mock
+        from education.models import LessonLog, LessonLogWatermark
+        from education.services.incremental_logs import find_targets, run_target
+
+        [target] = find_targets(datetime.date(2024, 9, 2), year_ids=[self.academic_year.id])
+        # Boshqa jarayon nishon tanlangandan keyin belgini surib ulgurgan
+        self.assertEqual(run_target(target)['created'], 3)
+        self.assertEqual(run_target(target)['created'], 0)
+        self.assertEqual(LessonLog.objects.count(), 3)
+
+        # Yiqilgan birinchi ishga tushish yaratilgan belgini ham qaytarib oladi
+        LessonLogWatermark.objects.all().delete()
+        with mock.patch('education.services.incremental_logs.LessonLogGenerator.run', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                run_target(target)
+        self.assertFalse(LessonLogWatermark.objects.exists())
+
+    def test_command_dry_run(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from education.models import LessonLog, LessonLogWatermark
+
+        out = StringIO()
+        call_command('generate_lesson_logs', date='2024-09-02', years=[self.academic_year.id],
+                     sequential=True, dry_run=True, stdout=out)
+        self.assertIn('3 ta yozuv', out.getvalue())
+        self.assertFalse(LessonLog.objects.exists())
+        self.assertFalse(LessonLogWatermark.objects.exists())
+
+
+class DailyBatchLogsSaveTest(ScheduleGeneratorBaseSetup):
+    """Kunlik jurnal formasi: oldindan yuklash, bulk yozish, o'zgarmaganlar tashlab ketiladi."""
+
+    def setUp(self):
+        _, stream = self._create_workload_with_stream(
+            self.subject1, self.plan_subject1, [self.group1], self.teacher1, 'lecture',
+        )
+        self.timetables = [
+            TimeTable.objects.create(
+                academic_year=self.academic_year, semester='autumn', education_form='kunduzgi',
+                weekday=self.mon, timeslot=slot, group=self.group1, stream=stream,
+                subject=self.subject1, teacher=self.teacher1, room=self.room_large,
+            )
+            for slot in (self.slot1, self.slot2)
+        ]
+        self.day = datetime.date(2024, 9, 2)
+
+    def _entries(self, status='held', teacher=None, topic='Kirish'):
+        return [
+            {'timetable_id': str(tt.id), 'status': status,
+             'actual_teacher_id': str(teacher.id) if teacher else '', 'topic': topic}
+            for tt in self.timetables
+        ]
+
+    def test_create_update_and_skip_unchanged(self):
+        from education.models import LessonLog
+        from education.services.lesson_logs import save_daily_logs
+
+        with self.assertNumQueries(5):     # jadval, yozuvlar, SAVEPOINT, INSERT, RELEASE
+            self.assertEqual(save_daily_logs(self.day, self._entries()),
+                             {'created': 2, 'updated': 0, 'unchanged': 0})
+        log = LessonLog.objects.get(timetable=self.timetables[0], date=self.day)
+        self.assertEqual((log.status, log.actual_teacher_id, log.topic, log.employment_type),
+                         ('held', self.teacher1.id, 'Kirish', 'permanent'))
+
+        self.assertEqual(save_daily_logs(self.day, self._entries()), {'created': 0, 'updated': 0, 'unchanged': 2})
+
+        # Boshqa o'qituvchi o'tgan 'held' dars — 'replaced'
+        self.assertEqual(save_daily_logs(self.day, self._entries(teacher=self.teacher2)),
+                         {'created': 0, 'updated': 2, 'unchanged': 0})
+        log.refresh_from_db()
+        self.assertEqual((log.status, log.actual_teacher_id), ('replaced', self.teacher2.id))
+
+    def test_admin_view_saves(self):
+        from education.models import LessonLog
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        data = {'timetable_id': [tt.id for tt in self.timetables]}
+        for tt in self.timetables:
+            data.update({f'status_{tt.id}': 'canceled', f'actual_teacher_{tt.id}': '', f'topic_{tt.id}': ''})
+        response = self.client.post(reverse('admin:lessonlog_daily_batch') + '?date=2024-09-02', data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(LessonLog.objects.values_list('status', flat=True)), ['canceled', 'canceled'])